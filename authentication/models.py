@@ -14,6 +14,7 @@ from authentication.thirdpartydrivers import (
     BaseThirdPartyDriver,
     BrightIDConnectionDriver,
 )
+from core.constraints import invalidate_constraint_verdicts
 from core.models import NetworkTypes
 
 
@@ -150,6 +151,15 @@ class Wallet(SafeDeleteModel):
     def __str__(self):
         return f"{self.wallet_type} Wallet for {self.user_profile.username}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_constraint_verdicts(self.user_profile_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_constraint_verdicts(self.user_profile_id)
+        return result
+
 
 class BaseThirdPartyConnection(models.Model):
     title = "BaseThirdPartyConnection"
@@ -16,7 +16,7 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.conf.beat_schedule = {
     "process-pending-claims": {
         "task": "faucet.tasks.process_pending_claims",
-        "schedule": 3,
+        "schedule": 60,
     },
     "process-pending-batches": {
         "task": "faucet.tasks.process_pending_batches",
@@ -26,6 +26,14 @@ app.conf.beat_schedule = {
         "task": "faucet.tasks.update_pending_batches_with_tx_hash_status",
         "schedule": 3,
     },
+    "reconcile-wallet-nonces": {
+        "task": "faucet.tasks.reconcile_wallet_nonces",
+        "schedule": 60,
+    },
+    "reconcile-claim-counters": {
+        "task": "faucet.tasks.reconcile_claim_counters",
+        "schedule": 3600,
+    },
     "update-needs-funding": {
         "task": "faucet.tasks.update_needs_funding_status",
         "schedule": 120,
@@ -46,13 +54,26 @@ app.conf.beat_schedule = {
         "task": "faucet.tasks.update_donation_receipt_pending_status",
         "schedule": 180,
     },
+    "rebuild-leaderboard": {
+        "task": "faucet.tasks.rebuild_leaderboard",
+        "schedule": 3600,
+    },
     "request-random-words-for-raffles": {
         "task": "prizetap.tasks.request_random_words_for_expired_raffles",
         "schedule": 120,
     },
-    "set-raffle-random-words": {"task": "prizetap.tasks.set_raffle_random_words", "schedule": 120},
-    "set-raffle-winners": {"task": "prizetap.tasks.set_raffle_winners", "schedule": 300},
-    "get-raffle-winners": {"task": "prizetap.tasks.get_raffle_winners", "schedule": 300},
+    "set-raffle-random-words": {
+        "task": "prizetap.tasks.set_raffle_random_words",
+        "schedule": 120,
+    },
+    "set-raffle-winners": {
+        "task": "prizetap.tasks.set_raffle_winners",
+        "schedule": 300,
+    },
+    "get-raffle-winners": {
+        "task": "prizetap.tasks.get_raffle_winners",
+        "schedule": 300,
+    },
     "set-raffle-ids": {"task": "prizetap.tasks.set_raffle_ids", "schedule": 300},
 }
 
@@ -71,6 +71,11 @@ MEMCACHED_URL = os.environ.get("MEMCACHEDCLOUD_SERVERS")
 MEMCACHED_USERNAME = os.environ.get("MEMCACHEDCLOUD_USERNAME")
 MEMCACHED_PASSWORD = os.environ.get("MEMCACHEDCLOUD_PASSWORD")
 DEPLOYMENT_ENV = os.environ.get("DEPLOYMENT_ENV")
+# seconds a fetched gas price is reused before asking the rpc again
+GAS_PRICE_FRESHNESS = float(os.environ.get("GAS_PRICE_FRESHNESS", 5))
+# threads of a process that check the constraints of raffles and token
+# distributions, each of them may hold a database connection
+CONSTRAINT_EVALUATION_WORKERS = int(os.environ.get("CONSTRAINT_EVALUATION_WORKERS", 16))
 
 assert DEPLOYMENT_ENV in ["dev", "main"]
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Chain, TokenPrice, WalletAccount
+from .models import AllowList, Chain, TokenPrice, WalletAccount
 
 
 class UserConstraintBaseAdmin(admin.ModelAdmin):
@@ -30,6 +30,12 @@ class TokenPriceAdmin(admin.ModelAdmin):
     list_filter = ["symbol"]
 
 
+class AllowListAdmin(admin.ModelAdmin):
+    list_display = ["pk", "file_path", "created_at"]
+    search_fields = ["file_path"]
+
+
 admin.site.register(WalletAccount, WalletAccountAdmin)
 admin.site.register(Chain, ChainAdmin)
 admin.site.register(TokenPrice, TokenPriceAdmin)
+admin.site.register(AllowList, AllowListAdmin)
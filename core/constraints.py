@@ -1,14 +1,23 @@
 import copy
-import csv
+import hashlib
 import importlib
+import json
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
 
 import rest_framework.exceptions
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.db.models.functions import Lower
+from rest_framework.exceptions import PermissionDenied
 
-from core.utils import InvalidAddressException, NFTClient, TokenClient
+from core.utils import InvalidAddressException, MulticallBalanceReader
 
 
 class ConstraintParam(Enum):
@@ -26,9 +35,36 @@ class ConstraintParam(Enum):
         return [(key.value, key.name) for key in cls]
 
 
+def get_wallets_version_key(user_profile_id):
+    return f"constraint_wallets_version_{user_profile_id}"
+
+
+def get_wallets_version(user_profile_id):
+    key = get_wallets_version_key(user_profile_id)
+    version = cache.get(key)
+    if version is None:
+        # a lost version must not bring back the verdicts cached under it
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_constraint_verdicts(user_profile_id):
+    """
+    call it when the wallets of the user change, the cached verdicts of the
+    user stop being read
+    """
+    cache.set(get_wallets_version_key(user_profile_id), time.time_ns(), None)
+
+
 class ConstraintVerification(ABC):
     _param_keys = []
     __response_text = ""
+    # seconds a verdict is reused for, None for constraints that are cheap
+    # enough to check every time
+    _cache_timeout = None
+    # set by ConstraintEvaluator, shared by the constraints of a request
+    balance_reader = None
 
     def __init__(self, user_profile) -> None:
         self.user_profile = user_profile
@@ -64,6 +100,43 @@ class ConstraintVerification(ABC):
         if valid_keys != observed_keys:
             raise KeyError("Some param keys were not observed")
 
+    def get_cache_key(self) -> str:
+        params = json.dumps(
+            sorted((str(key), value) for key, value in self._param_values.items()),
+            default=str,
+        )
+        label = (
+            f"{self.__class__.__module__}.{self.__class__.__name__}"
+            f":{self.user_profile.pk}"
+            f":{get_wallets_version(self.user_profile.pk)}:{params}"
+        )
+        return f"constraint_verdict_{hashlib.sha256(label.encode()).hexdigest()}"
+
+    def get_cached_verdict(self):
+        if not self._cache_timeout:
+            return None
+        return cache.get(self.get_cache_key())
+
+    def is_observed_cached(self, *args, **kwargs) -> bool:
+        """
+        is_observed, reused for _cache_timeout seconds. errors are raised and
+        never cached
+        """
+        if not self._cache_timeout:
+            return self.is_observed(*args, **kwargs)
+        verdict = self.get_cached_verdict()
+        if verdict is None:
+            verdict = bool(self.is_observed(*args, **kwargs))
+            cache.set(self.get_cache_key(), verdict, self._cache_timeout)
+        return verdict
+
+    def request_balances(self, reader: MulticallBalanceReader):
+        """
+        requests the balances is_observed reads, so the balances of all the
+        constraints of a request are read together
+        """
+        pass
+
     @property
     def response(self) -> str:
         return (
@@ -85,87 +158,96 @@ class BrightIDAuraVerification(ConstraintVerification):
         return self.user_profile.is_aura_verified
 
 
-class HasNFTVerification(ConstraintVerification):
+class WalletBalanceVerification(ConstraintVerification):
+    """
+    sums a token balance over the user's wallets of the token's chain, the
+    balances are read with the multicall of the request when there is one
+    """
+
+    _token = None
+
+    @abstractmethod
+    def get_token(self):
+        """
+        returns (chain, token address), None for the native token
+        """
+        pass
+
+    def get_token_cached(self):
+        if self._token is None:
+            self._token = self.get_token()
+        return self._token
+
+    def get_addresses(self, chain) -> list:
+        return list(
+            self.user_profile.wallets.filter(wallet_type=chain.chain_type).values_list(
+                "address", flat=True
+            )
+        )
+
+    def request_balances(self, reader: MulticallBalanceReader):
+        chain, token = self.get_token_cached()
+        for address in self.get_addresses(chain):
+            reader.request(chain, token, address)
+
+    def get_total_balance(self) -> int:
+        chain, token = self.get_token_cached()
+        reader = self.balance_reader or MulticallBalanceReader()
+        addresses = self.get_addresses(chain)
+        for address in addresses:
+            reader.request(chain, token, address)
+        try:
+            return sum(reader.get_balance(chain, token, a) for a in addresses)
+        except InvalidAddressException as e:
+            raise rest_framework.exceptions.ValidationError(e)
+
+
+class HasNFTVerification(WalletBalanceVerification):
     _param_keys = [
         ConstraintParam.CHAIN,
         ConstraintParam.ADDRESS,
         ConstraintParam.MINIMUM,
     ]
+    _cache_timeout = 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
 
-    def is_observed(self, *args, **kwargs):
+    def get_token(self):
         from core.models import Chain
 
         chain_pk = self._param_values[ConstraintParam.CHAIN.name]
         collection_address = self._param_values[ConstraintParam.ADDRESS.name]
-        minimum = self._param_values[ConstraintParam.MINIMUM.name]
+        return Chain.objects.get(pk=chain_pk), collection_address
 
-        chain = Chain.objects.get(pk=chain_pk)
-        nft_client = NFTClient(chain=chain, contract=collection_address)
-
-        user_wallets = self.user_profile.wallets.filter(wallet_type=chain.chain_type)
-
-        token_count = 0
-        try:
-            for wallet in user_wallets:
-                token_count += nft_client.get_number_of_tokens(
-                    nft_client.to_checksum_address(wallet.address)
-                )
-        except InvalidAddressException as e:
-            raise rest_framework.exceptions.ValidationError(e)
-
-        return token_count >= int(minimum)
+    def is_observed(self, *args, **kwargs):
+        minimum = self._param_values[ConstraintParam.MINIMUM.name]
+        return self.get_total_balance() >= int(minimum)
 
 
-class HasTokenVerification(ConstraintVerification):
+class HasTokenVerification(WalletBalanceVerification):
     _param_keys = [
         ConstraintParam.CHAIN,
         ConstraintParam.ADDRESS,
         ConstraintParam.MINIMUM,
     ]
+    _cache_timeout = 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
 
-    def is_observed(self, *args, **kwargs):
+    def get_token(self):
         from core.models import Chain
 
         chain_pk = self._param_values[ConstraintParam.CHAIN.name]
         token_address = self._param_values[ConstraintParam.ADDRESS.name]
-        minimum = self._param_values[ConstraintParam.MINIMUM.name]
-        is_native_token = False
-
         if token_address[:4] == "0x00":
             token_address = None
-            is_native_token = True
-
-        chain = Chain.objects.get(pk=chain_pk)
+        return Chain.objects.get(pk=chain_pk), token_address
 
-        user_wallets = self.user_profile.wallets.filter(wallet_type=chain.chain_type)
-
-        token_client = TokenClient(chain=chain, contract=token_address)
-
-        token_count = 0
-        if is_native_token:
-            try:
-                for wallet in user_wallets:
-                    token_count += token_client.get_native_token_balance(
-                        token_client.to_checksum_address(wallet.address)
-                    )
-            except InvalidAddressException as e:
-                raise rest_framework.exceptions.ValidationError(e)
-        else:
-            try:
-                for wallet in user_wallets:
-                    token_count += token_client.get_non_native_token_balance(
-                        token_client.to_checksum_address(wallet.address)
-                    )
-            except InvalidAddressException as e:
-                raise rest_framework.exceptions.ValidationError(e)
-
-        return token_count >= int(minimum)
+    def is_observed(self, *args, **kwargs):
+        minimum = self._param_values[ConstraintParam.MINIMUM.name]
+        return self.get_total_balance() >= int(minimum)
 
 
 class AllowListVerification(ConstraintVerification):
@@ -175,19 +257,14 @@ class AllowListVerification(ConstraintVerification):
         super().__init__(user_profile)
 
     def is_observed(self, *args, **kwargs):
+        from core.models import AllowList
+
         file_path = self._param_values[ConstraintParam.CSV_FILE.name]
-        self.allow_list = []
-        with open(file_path, newline="") as f:
-            reader = csv.reader(f)
-            data = list(reader)
-            self.allow_list = [a[0].lower() for a in data]
-            user_wallets = self.user_profile.wallets.values_list(
-                Lower("address"), flat=True
-            )
-            for wallet in user_wallets:
-                if wallet in self.allow_list:
-                    return True
-            return False
+        allow_list = AllowList.get_or_ingest(file_path)
+        user_wallets = self.user_profile.wallets.values_list(
+            Lower("address"), flat=True
+        )
+        return allow_list.addresses.filter(address__in=user_wallets).exists()
 
 
 def get_constraint(constraint_label: str) -> ConstraintVerification:
@@ -201,3 +278,137 @@ def get_constraint(constraint_label: str) -> ConstraintVerification:
         raise ImproperlyConfigured(
             f"Constraint '{constraint_name}' not found in any app."
         )
+
+
+class ConstraintEvaluator:
+    """
+    checks the constraints of a raffle or a token distribution concurrently,
+    so a request waits for the slowest constraint instead of all of them.
+    a constraint that has not answered by the deadline counts as violated
+    """
+
+    DEADLINE = 20  # seconds for all the constraints of a request
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        user_profile,
+        constraints,
+        param_values: dict,
+        reversed_constraints: list,
+        deadline=None,
+    ) -> None:
+        self.user_profile = user_profile
+        self.constraints = list(constraints)
+        self.param_values = param_values
+        self.reversed_constraints = reversed_constraints
+        self.deadline = deadline or self.DEADLINE
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        # shared by the requests of the process, a constraint that times out
+        # keeps its worker until it returns instead of blocking the request
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.CONSTRAINT_EVALUATION_WORKERS,
+                    thread_name_prefix="constraints",
+                )
+        return cls._executor
+
+    def is_reversed(self, constraint) -> bool:
+        return str(constraint.pk) in self.reversed_constraints
+
+    def get_verification(self, constraint) -> ConstraintVerification:
+        verification: ConstraintVerification = get_constraint(constraint.name)(
+            self.user_profile
+        )
+        verification.response = constraint.response
+        try:
+            verification.param_values = self.param_values[constraint.name]
+        except KeyError:
+            pass
+        return verification
+
+    def read_balances(self, verifications):
+        reader = MulticallBalanceReader()
+        for verification in verifications:
+            if verification.get_cached_verdict() is not None:
+                continue
+            try:
+                verification.request_balances(reader)
+            except Exception:
+                # is_observed raises it again in its turn
+                continue
+            verification.balance_reader = reader
+        try:
+            reader.execute()
+        except Exception as e:
+            # the balances that were not read are read again by the
+            # constraint that needs them, which fails on its own
+            logging.warning(f"Balance read failed: {e!r}")
+
+    def run(self, verification, **kwargs) -> bool:
+        try:
+            return verification.is_observed_cached(**kwargs)
+        finally:
+            # the worker may not run a constraint again for a long time, its
+            # connection is not left open until then
+            connection.close()
+
+    def evaluate(self, stop_on_failure=False, **kwargs) -> dict:
+        """
+        returns {constraint pk: is_verified}, reversed constraints are already
+        inverted. with stop_on_failure the first violated constraint raises
+        PermissionDenied without waiting for the others
+        """
+        verifications = {c.pk: self.get_verification(c) for c in self.constraints}
+        self.read_balances(verifications.values())
+        results = {}
+
+        def record(constraint, is_verified):
+            results[constraint.pk] = is_verified
+            if stop_on_failure and not is_verified:
+                raise PermissionDenied(verifications[constraint.pk].response)
+
+        # workers have their own connections and can't see rows written in
+        # the caller's open transaction, those are checked in place
+        if len(self.constraints) < 2 or connection.in_atomic_block:
+            for c in self.constraints:
+                is_observed = verifications[c.pk].is_observed_cached(**kwargs)
+                record(c, bool(is_observed) != self.is_reversed(c))
+            return results
+
+        executor = self.get_executor()
+        futures = {
+            executor.submit(self.run, verifications[c.pk], **kwargs): c
+            for c in self.constraints
+        }
+        ends_at = time.monotonic() + self.deadline
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=max(ends_at - time.monotonic(), 0),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for future in done:
+                    c = futures[future]
+                    record(c, bool(future.result()) != self.is_reversed(c))
+        finally:
+            for future in pending:
+                future.cancel()
+        for future in pending:
+            record(futures[future], False)
+        return results
+
+    def check(self, **kwargs):
+        """
+        raises PermissionDenied on the first violated constraint
+        """
+        self.evaluate(stop_on_failure=True, **kwargs)
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_auto_20231203_0832"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chain",
+            name="block_time",
+            field=models.FloatField(default=12),
+        ),
+    ]
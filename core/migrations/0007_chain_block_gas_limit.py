@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_chain_block_time"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chain",
+            name="block_gas_limit",
+            field=models.BigIntegerField(default=30000000),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.0.4 on 2026-10-16 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_chain_block_gas_limit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AllowList",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("file_path", models.CharField(max_length=1024, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AllowListAddress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=512)),
+                (
+                    "allow_list",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="addresses",
+                        to="core.allowlist",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="allowlistaddress",
+            constraint=models.UniqueConstraint(
+                fields=("allow_list", "address"), name="unique_allow_list_address"
+            ),
+        ),
+    ]
@@ -1,9 +1,10 @@
 import binascii
+import csv
 import inspect
 import logging
 
 from bip_utils import Bip44, Bip44Coins
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from encrypted_model_fields.fields import EncryptedCharField
 from solders.keypair import Keypair
@@ -18,7 +19,7 @@ from .constraints import (
     HasNFTVerification,
     HasTokenVerification,
 )
-from .utils import SolanaWeb3Utils, Web3Utils
+from .utils import GasPriceOracle, SolanaWeb3Utils, Web3Utils
 
 
 class NetworkTypes:
@@ -170,6 +171,8 @@ class Chain(models.Model):
     rpc_url_private = models.URLField(max_length=255)
 
     poa = models.BooleanField(default=False)
+    block_time = models.FloatField(default=12)  # seconds, paces tx confirmation checks
+    block_gas_limit = models.BigIntegerField(default=30000000)
 
     wallet = models.ForeignKey(
         WalletAccount, related_name="chains", on_delete=models.PROTECT
@@ -224,7 +227,12 @@ class Chain(models.Model):
 
     @property
     def has_enough_fees(self):
-        if self.get_wallet_balance() > self.gas_price * self.enough_fee_multiplier:
+        return self.has_enough_fees_in(self.get_wallet_balance())
+
+    def has_enough_fees_in(self, wallet_balance, gas_price=None):
+        if gas_price is None:
+            gas_price = self.gas_price
+        if wallet_balance > gas_price * self.enough_fee_multiplier:
             return True
         logging.warning(f"Chain {self.chain_name} has insufficient fees in wallet")
         return False
@@ -235,7 +243,7 @@ class Chain(models.Model):
             return self.max_gas_price + 1
 
         try:
-            return Web3Utils(self.rpc_url, self.poa).get_gas_price()
+            return GasPriceOracle.get(self, rpc_url=self.rpc_url)
         except:  # noqa: E722
             logging.exception(f"Error getting gas price for {self.chain_name}")
             return self.max_gas_price + 1
@@ -261,3 +269,70 @@ class AbstractGlobalSettings(models.Model):
                 obj, _ = cls.set(index, default)
                 return obj.value
             raise e
+
+
+class AllowList(models.Model):
+    """
+    the addresses of an uploaded allowlist csv, kept in an indexed table so a
+    check doesn't read the file
+    """
+
+    BATCH_SIZE = 5000
+
+    file_path = models.CharField(max_length=1024, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.file_path
+
+    @classmethod
+    def ingest(cls, file_path: str) -> "AllowList":
+        """
+        reads the csv once, a row at a time, the first column is the address
+        """
+        with transaction.atomic():
+            allow_list, created = cls.objects.get_or_create(file_path=file_path)
+            if not created:
+                return allow_list
+            with open(file_path, newline="") as f:
+                batch = []
+                for row in csv.reader(f):
+                    if not row or not row[0].strip():
+                        continue
+                    batch.append(
+                        AllowListAddress(
+                            allow_list=allow_list, address=row[0].strip().lower()
+                        )
+                    )
+                    if len(batch) >= cls.BATCH_SIZE:
+                        AllowListAddress.objects.bulk_create(
+                            batch, ignore_conflicts=True
+                        )
+                        batch = []
+                AllowListAddress.objects.bulk_create(batch, ignore_conflicts=True)
+        return allow_list
+
+    @classmethod
+    def get_or_ingest(cls, file_path: str) -> "AllowList":
+        # allowlists uploaded before ingestion existed are read on first use
+        try:
+            return cls.objects.get(file_path=file_path)
+        except cls.DoesNotExist:
+            return cls.ingest(file_path)
+
+
+class AllowListAddress(models.Model):
+    allow_list = models.ForeignKey(
+        AllowList, on_delete=models.CASCADE, related_name="addresses"
+    )
+    address = models.CharField(max_length=512)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["allow_list", "address"], name="unique_allow_list_address"
+            ),
+        ]
+
+    def __str__(self):
+        return self.address
@@ -6,7 +6,7 @@ from rest_framework import serializers
 
 from core.constraints import ConstraintVerification, get_constraint
 
-from .models import Chain, UserConstraint
+from .models import AllowList, Chain, UserConstraint
 from .utils import UploadFileStorage
 
 
@@ -132,6 +132,7 @@ class ConstraintProviderSerializer(serializers.Serializer):
                 for file in constraint_files:
                     if constraint["CSV_FILE"] == file.name:
                         path = file_storage.save(file)
+                        AllowList.ingest(path)
                         constraint["CSV_FILE"] = path
                         file_exist = True
                         break
@@ -1,14 +1,35 @@
-from unittest.mock import PropertyMock, patch
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, PropertyMock, patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.test import APITestCase
+from web3 import Web3
 
 from authentication.models import UserProfile, Wallet
-from core.models import Chain, NetworkTypes, WalletAccount
+from core.models import AllowList, Chain, NetworkTypes, WalletAccount
+from core.utils import (
+    GasPriceOracle,
+    InvalidAddressException,
+    MulticallBalanceReader,
+    SolanaClientPool,
+    Web3BatchClient,
+    Web3Pool,
+    Web3Utils,
+)
 
 from .constraints import (
+    AllowListVerification,
     BrightIDAuraVerification,
     BrightIDMeetVerification,
+    ConstraintEvaluator,
     HasNFTVerification,
     HasTokenVerification,
 )
@@ -59,6 +80,180 @@ class ConstraintTestCase(BaseTestCase):
         )
 
 
+@patch("core.constraints.connection", MagicMock(in_atomic_block=False))
+class TestConstraintEvaluator(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.meet = SimpleNamespace(
+            pk=1, name="core.BrightIDMeetVerification", response="not met"
+        )
+        self.aura = SimpleNamespace(
+            pk=2, name="core.BrightIDAuraVerification", response="no aura"
+        )
+
+    def get_evaluator(self, reversed_constraints=None, deadline=None):
+        return ConstraintEvaluator(
+            self.user_profile,
+            [self.meet, self.aura],
+            {},
+            reversed_constraints or [],
+            deadline=deadline,
+        )
+
+    def slow(self, result, seconds=0.3):
+        def is_observed(*args, **kwargs):
+            time.sleep(seconds)
+            return result
+
+        return is_observed
+
+    def test_constraints_run_concurrently(self):
+        with patch.object(
+            BrightIDMeetVerification, "is_observed", side_effect=self.slow(True)
+        ), patch.object(
+            BrightIDAuraVerification, "is_observed", side_effect=self.slow(True)
+        ):
+            started_at = time.monotonic()
+            results = self.get_evaluator(reversed_constraints=["2"]).evaluate()
+            self.assertLess(time.monotonic() - started_at, 0.5)
+        self.assertEqual(results, {1: True, 2: False})
+
+    def test_check_stops_on_first_failure(self):
+        with patch.object(
+            BrightIDMeetVerification, "is_observed", side_effect=self.slow(True, 1)
+        ), patch.object(
+            BrightIDAuraVerification, "is_observed", side_effect=self.slow(False, 0)
+        ):
+            started_at = time.monotonic()
+            with self.assertRaisesMessage(PermissionDenied, "no aura"):
+                self.get_evaluator().check()
+            self.assertLess(time.monotonic() - started_at, 0.5)
+
+    def test_late_constraint_is_violated(self):
+        with patch.object(
+            BrightIDMeetVerification, "is_observed", side_effect=self.slow(True, 1)
+        ), patch.object(
+            BrightIDAuraVerification, "is_observed", side_effect=self.slow(True, 0)
+        ):
+            results = self.get_evaluator(deadline=0.2).evaluate()
+        self.assertEqual(results, {1: False, 2: True})
+
+
+class TestConstraintEvaluatorWorkers(TransactionTestCase):
+    def setUp(self):
+        self.user_profile = UserProfile.objects.create(
+            user=User.objects.create_user(username="test", password="1234"),
+            initial_context_id="test",
+            username="test",
+        )
+        self.constraints = [
+            SimpleNamespace(pk=1, name="core.BrightIDMeetVerification", response=""),
+            SimpleNamespace(pk=2, name="core.BrightIDAuraVerification", response=""),
+        ]
+
+    def test_constraints_read_the_database_in_workers(self):
+        threads = []
+
+        def is_observed(verification, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return UserProfile.objects.filter(pk=verification.user_profile.pk).exists()
+
+        with patch.object(
+            BrightIDMeetVerification, "is_observed", autospec=True
+        ) as meet_mock, patch.object(
+            BrightIDAuraVerification, "is_observed", autospec=True
+        ) as aura_mock:
+            meet_mock.side_effect = aura_mock.side_effect = is_observed
+            results = ConstraintEvaluator(
+                self.user_profile, self.constraints, {}, []
+            ).evaluate()
+
+        self.assertEqual(results, {1: True, 2: True})
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("constraints") for name in threads))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestConstraintVerdictCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_constraint(self, minimum=1):
+        constraint = HasNFTVerification(self.user_profile)
+        constraint.param_values = {
+            "CHAIN": 1,
+            "ADDRESS": "0x23826Fd930916718a98A21FF170088FBb4C30803",
+            "MINIMUM": minimum,
+        }
+        return constraint
+
+    @patch.object(HasNFTVerification, "is_observed", return_value=True)
+    def test_verdict_is_reused(self, is_observed_mock: MagicMock):
+        self.assertTrue(self.get_constraint().is_observed_cached())
+        self.assertTrue(self.get_constraint().is_observed_cached())
+        self.assertEqual(is_observed_mock.call_count, 1)
+
+        self.get_constraint(minimum=2).is_observed_cached()
+        self.assertEqual(is_observed_mock.call_count, 2)
+
+    @patch.object(HasNFTVerification, "is_observed", return_value=False)
+    def test_wallet_change_invalidates_verdicts(self, is_observed_mock: MagicMock):
+        self.get_constraint().is_observed_cached()
+        create_new_wallet(
+            self.user_profile,
+            "0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F4",
+            NetworkTypes.EVM,
+        )
+        self.get_constraint().is_observed_cached()
+        self.assertEqual(is_observed_mock.call_count, 2)
+
+    @patch.object(HasNFTVerification, "is_observed")
+    def test_errors_are_not_cached(self, is_observed_mock: MagicMock):
+        is_observed_mock.side_effect = [ConnectionError, True]
+        with self.assertRaises(ConnectionError):
+            self.get_constraint().is_observed_cached()
+        self.assertTrue(self.get_constraint().is_observed_cached())
+
+
+class TestAllowListConstraint(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        f.write("0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F4\n\n0xABC\n0xabc\n")
+        f.close()
+        self.file_path = f.name
+        self.addCleanup(os.remove, self.file_path)
+
+    def get_constraint(self):
+        constraint = AllowListVerification(self.user_profile)
+        constraint.param_values = {"CSV_FILE": self.file_path}
+        return constraint
+
+    def test_allow_list_is_ingested_once(self):
+        allow_list = AllowList.ingest(self.file_path)
+        self.assertEqual(
+            sorted(allow_list.addresses.values_list("address", flat=True)),
+            ["0x5a73e32a77e04fb3285608b0adeaa000b8e248f4", "0xabc"],
+        )
+        self.assertFalse(self.get_constraint().is_observed())
+
+        create_new_wallet(
+            self.user_profile,
+            "0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F4",
+            NetworkTypes.EVM,
+        )
+        with patch("builtins.open", side_effect=AssertionError):
+            self.assertTrue(self.get_constraint().is_observed())
+
+    def test_allow_list_uploaded_before_is_read_on_first_use(self):
+        create_new_wallet(self.user_profile, "0xAbc", NetworkTypes.EVM)
+        self.assertTrue(self.get_constraint().is_observed())
+        self.assertTrue(AllowList.objects.filter(file_path=self.file_path).exists())
+
+
 class TestNFTConstraint(BaseTestCase):
     def setUp(self):
         super().setUp()
@@ -90,8 +285,8 @@ class TestNFTConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 1,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 1,
     )
     def test_nft_constraint_true(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -105,8 +300,8 @@ class TestNFTConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 0,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 0,
     )
     def test_nft_constraint_false(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -120,6 +315,83 @@ class TestNFTConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
 
+class TestMulticallBalanceReader(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        create_new_wallet(
+            self.user_profile,
+            "0x23826Fd930916718a98A21FF170088FBb4C30803",
+            NetworkTypes.EVM,
+        )
+        create_new_wallet(
+            self.user_profile,
+            "0x23826Fd930916718a98A21FF170088FBb4C30804",
+            NetworkTypes.EVM,
+        )
+        self.collection_address = "0x23826Fd930916718a98A21FF170088FBb4C30803"
+        self.wallet = WalletAccount.objects.create(
+            name="Sepolia Chain Wallet",
+            private_key=test_wallet_key,
+            network_type=NetworkTypes.EVM,
+        )
+        self.chain = Chain.objects.create(
+            chain_name="Polygon",
+            wallet=self.wallet,
+            rpc_url_private="https://polygon-rpc.com/",
+            explorer_url="https://etherscan.io/",
+            native_currency_name="ETH",
+            symbol="ETH",
+            chain_id="1",
+        )
+
+    def get_constraint(self, minimum):
+        constraint = HasNFTVerification(self.user_profile)
+        constraint.param_values = {
+            "CHAIN": self.chain.pk,
+            "ADDRESS": self.collection_address,
+            "MINIMUM": minimum,
+        }
+        return constraint
+
+    def aggregate(self, chain, keys):
+        return {key: None if key[1] is None else 2 for key in keys}
+
+    def test_constraints_share_one_call_per_chain(self):
+        reader = MulticallBalanceReader()
+        constraints = [self.get_constraint(4), self.get_constraint(5)]
+        with patch.object(
+            MulticallBalanceReader, "aggregate", side_effect=self.aggregate
+        ) as aggregate_mock:
+            for constraint in constraints:
+                constraint.request_balances(reader)
+                constraint.balance_reader = reader
+            reader.execute()
+            self.assertEqual([c.is_observed() for c in constraints], [True, False])
+        aggregate_mock.assert_called_once()
+        self.assertEqual(len(aggregate_mock.call_args.args[1]), 2)
+
+    def test_failed_call_is_invalid_address(self):
+        reader = MulticallBalanceReader()
+        with patch.object(
+            MulticallBalanceReader, "aggregate", side_effect=self.aggregate
+        ):
+            with self.assertRaises(InvalidAddressException):
+                reader.get_balance(
+                    self.chain, None, "0x23826Fd930916718a98A21FF170088FBb4C30803"
+                )
+
+    @patch("core.utils.TokenClient")
+    def test_failed_multicall_reads_each_balance(self, token_client_mock: MagicMock):
+        token_client_mock.return_value.get_non_native_token_balance.return_value = 3
+        with patch.object(
+            MulticallBalanceReader, "aggregate", side_effect=ValueError("no code")
+        ):
+            self.assertTrue(self.get_constraint(6).is_observed())
+        self.assertEqual(
+            token_client_mock.return_value.get_non_native_token_balance.call_count, 2
+        )
+
+
 class TestNonNativeTokenConstraint(BaseTestCase):
     def setUp(self):
         super().setUp()
@@ -151,8 +423,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 1000000,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 1000000,
     )
     def test_non_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -166,8 +438,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 100000,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 100000,
     )
     def test_non_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -181,8 +453,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 2 * 10**18,
     )
     def test_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -196,8 +468,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.MulticallBalanceReader.get_balance",
+        lambda self, chain, token, address: 2 * 10**18,
     )
     def test_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -209,3 +481,149 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         }
 
         self.assertEqual(constraint.is_observed(), False)
+
+
+class TestWeb3Pool(APITestCase):
+    rpc_url = "http://127.0.0.1:7545"
+
+    def setUp(self):
+        Web3Pool.clear()
+        self.create_patcher = patch.object(
+            Web3Pool, "create", side_effect=lambda *args: MagicMock()
+        )
+        self.create = self.create_patcher.start()
+
+    def tearDown(self):
+        self.create_patcher.stop()
+        Web3Pool.clear()
+
+    def test_provider_is_shared(self):
+        w3 = Web3Utils(self.rpc_url).w3
+        self.assertIs(Web3Utils(self.rpc_url).w3, w3)
+        self.assertIsNot(Web3Utils(self.rpc_url, poa=True).w3, w3)
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_health_is_checked_lazily(self):
+        w3 = Web3Pool.get(self.rpc_url)
+        Web3Pool.get(self.rpc_url)
+        self.assertEqual(w3.is_connected.call_count, 1)
+
+        with patch.object(Web3Pool, "HEALTH_CHECK_INTERVAL", 0):
+            w3.is_connected.return_value = False
+            self.assertIsNot(Web3Pool.get(self.rpc_url), w3)
+
+    def test_forked_worker_gets_new_providers(self):
+        w3 = Web3Pool.get(self.rpc_url)
+        Web3Pool.clear()
+        self.assertIsNot(Web3Pool.get(self.rpc_url), w3)
+
+    def test_solana_clients_are_pooled_separately(self):
+        with patch.object(
+            SolanaClientPool, "create", side_effect=lambda *args: MagicMock()
+        ):
+            client = SolanaClientPool.get(self.rpc_url)
+            self.assertIs(SolanaClientPool.get(self.rpc_url), client)
+            self.assertIsNot(Web3Pool.get(self.rpc_url), client)
+        SolanaClientPool.clear()
+
+
+class TestWeb3BatchClient(APITestCase):
+    def setUp(self):
+        web3_utils = MagicMock()
+        web3_utils.w3 = Web3()
+        self.client = Web3BatchClient(web3_utils)
+
+    def test_lookups_share_requests_and_fail_alone(self):
+        tx_hashes = ["0x" + f"{i:064x}" for i in range(Web3BatchClient.BATCH_SIZE + 1)]
+        payloads = []
+
+        def post(payload):
+            payloads.append(payload)
+            # answers come back out of order
+            return [
+                (
+                    {"jsonrpc": "2.0", "id": call["id"], "error": {"message": "failed"}}
+                    if call["params"][0] == tx_hashes[1]
+                    else {
+                        "jsonrpc": "2.0",
+                        "id": call["id"],
+                        "result": {
+                            "status": "0x1",
+                            "transactionHash": call["params"][0],
+                        },
+                    }
+                )
+                for call in reversed(payload)
+            ]
+
+        with patch.object(self.client, "post", side_effect=post):
+            receipts = self.client.get_transaction_receipts(tx_hashes)
+
+        self.assertEqual(len(payloads), 2)
+        self.assertIsInstance(receipts[tx_hashes[1]], ValueError)
+        self.assertEqual(receipts[tx_hashes[0]].status, 1)
+        self.assertEqual(
+            Web3.to_hex(receipts[tx_hashes[-1]].transactionHash), tx_hashes[-1]
+        )
+
+    def test_rejected_batch_fails_all_items(self):
+        with patch.object(
+            self.client, "post", return_value={"error": {"message": "no batches"}}
+        ):
+            receipts = self.client.get_transaction_receipts(["0x01", "0x02"])
+        self.assertTrue(all(isinstance(r, ValueError) for r in receipts.values()))
+
+
+class TestGasPriceOracle(APITestCase):
+    def setUp(self):
+        GasPriceOracle.clear()
+        self.chain = MagicMock(pk=1, rpc_url_private="http://127.0.0.1:7545", poa=False)
+
+    def tearDown(self):
+        GasPriceOracle.clear()
+
+    @patch("core.utils.Web3Utils.get_gas_price", return_value=10)
+    def test_gas_price_is_reused_while_fresh(self, get_gas_price):
+        self.assertEqual(GasPriceOracle.get(self.chain), 10)
+        self.assertEqual(GasPriceOracle.get(self.chain), 10)
+        self.assertEqual(get_gas_price.call_count, 1)
+
+        get_gas_price.return_value = 20
+        self.assertEqual(GasPriceOracle.get(self.chain, freshness=0), 20)
+
+    def test_concurrent_callers_share_one_refresh(self):
+        def slow_gas_price(*args):
+            time.sleep(0.05)
+            return 10
+
+        with patch(
+            "core.utils.Web3Utils.get_gas_price", side_effect=slow_gas_price
+        ) as get_gas_price:
+            with ThreadPoolExecutor(5) as executor:
+                prices = list(
+                    executor.map(lambda _: GasPriceOracle.get(self.chain), range(5))
+                )
+        self.assertEqual(prices, [10] * 5)
+        self.assertEqual(get_gas_price.call_count, 1)
+
+    @patch("core.utils.Web3Utils.get_gas_price", return_value=10)
+    def test_prices_are_kept_per_rpc_url(self, get_gas_price):
+        with patch("core.utils.Web3Utils.__init__", return_value=None) as init:
+            GasPriceOracle.get(self.chain)
+            GasPriceOracle.get(self.chain, rpc_url="http://127.0.0.1:8545")
+            GasPriceOracle.get(self.chain, rpc_url="http://127.0.0.1:8545")
+        self.assertEqual(get_gas_price.call_count, 2)
+        self.assertEqual(
+            [c.args[0] for c in init.call_args_list],
+            ["http://127.0.0.1:7545", "http://127.0.0.1:8545"],
+        )
+
+    @patch("core.utils.GasPriceOracle.get", return_value=10)
+    def test_chain_gas_price_is_read_from_the_public_rpc(self, get):
+        chain = Chain(
+            pk=1,
+            rpc_url="http://127.0.0.1:8545",
+            rpc_url_private="http://127.0.0.1:7545",
+        )
+        self.assertEqual(chain.gas_price, 10)
+        get.assert_called_once_with(chain, rpc_url="http://127.0.0.1:8545")
@@ -1,25 +1,38 @@
 import datetime
+import json
 import logging
 import os
+import threading
 import time
 import uuid
 from contextlib import contextmanager
 
 import pytz
+import requests
 import web3.exceptions
 from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
 from eth_account.messages import encode_defunct
+from requests.adapters import HTTPAdapter
 from solana.rpc.api import Client
 from web3 import Account, Web3
+from web3._utils.method_formatters import get_result_formatters
+from web3._utils.request import make_post_request
+from web3._utils.rpc_abi import RPC
 from web3.contract.contract import Contract, ContractFunction
+from web3.datastructures import AttributeDict
 from web3.logs import DISCARD, IGNORE, STRICT, WARN
 from web3.middleware import geth_poa_middleware
 from web3.types import TxParams, Type
 
-from brightIDfaucet.settings import MEDIA_ROOT
-from core.constants import ERC20_READ_METHODS, ERC721_READ_METHODS
+from brightIDfaucet.settings import GAS_PRICE_FRESHNESS, MEDIA_ROOT
+from core.constants import (
+    ERC20_READ_METHODS,
+    ERC721_READ_METHODS,
+    MULTICALL3_ADDRESS,
+    MULTICALL3_METHODS,
+)
 
 
 @contextmanager
@@ -92,6 +105,142 @@ class TimeUtils:
         return first_day_of_last_month
 
 
+class RPCClientPool:
+    """
+    process wide rpc clients keyed by their connection params, each one keeps
+    its http connections alive so calls reuse them instead of new handshakes
+    """
+
+    HEALTH_CHECK_INTERVAL = 60  # seconds
+
+    _lock = threading.Lock()
+    _instances = {}  # key -> (client, last health check)
+
+    @classmethod
+    def get(cls, *key):
+        with cls._lock:
+            client, checked_at = cls._instances.get(key, (None, 0))
+        # the client is only checked once in a while, not on every call
+        if (
+            client is not None
+            and time.monotonic() - checked_at < cls.HEALTH_CHECK_INTERVAL
+        ):
+            return client
+
+        if client is None or not client.is_connected():
+            client = cls.create(*key)
+            if not client.is_connected():
+                raise Exception(f"RPC provider is not connected ({key[0]})")
+
+        with cls._lock:
+            cls._instances[key] = (client, time.monotonic())
+        return client
+
+    @classmethod
+    def create(cls, *key):
+        raise NotImplementedError
+
+    @classmethod
+    def clear(cls):
+        # a forked worker must not share the sockets of its parent
+        cls._lock = threading.Lock()
+        cls._instances = {}
+
+
+class Web3Pool(RPCClientPool):
+    POOL_SIZE = 10  # kept-alive connections per rpc
+
+    _lock = threading.Lock()
+    _instances = {}  # (rpc_url, poa) -> (web3, last health check)
+
+    @classmethod
+    def get(cls, rpc_url, poa=False) -> Web3:
+        return super().get(rpc_url, poa)
+
+    @classmethod
+    def create(cls, rpc_url, poa=False) -> Web3:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls.POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        w3 = Web3(Web3.HTTPProvider(rpc_url, session=session))
+        if poa:
+            w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        return w3
+
+
+class SolanaClientPool(RPCClientPool):
+    _lock = threading.Lock()
+    _instances = {}  # (rpc_url,) -> (client, last health check)
+
+    @classmethod
+    def get(cls, rpc_url) -> Client:
+        return super().get(rpc_url)
+
+    @classmethod
+    def create(cls, rpc_url) -> Client:
+        return Client(rpc_url)
+
+
+os.register_at_fork(after_in_child=Web3Pool.clear)
+os.register_at_fork(after_in_child=SolanaClientPool.clear)
+
+
+class GasPriceOracle:
+    """
+    gas price of each chain shared by the whole process, fetched again only
+    once it is older than the freshness window and by one caller at a time;
+    prices are kept per rpc url, the private one unless another is given
+    """
+
+    _lock = threading.Lock()
+    _prices = {}  # (chain pk, rpc url) -> (gas price, fetched at)
+    _refresh_locks = {}
+
+    @classmethod
+    def get(cls, chain, freshness=None, rpc_url=None) -> int:
+        if freshness is None:
+            freshness = GAS_PRICE_FRESHNESS
+        if rpc_url is None:
+            rpc_url = chain.rpc_url_private
+        key = (chain.pk, rpc_url)
+        price = cls._get_fresh(key, freshness)
+        if price is not None:
+            return price
+
+        with cls._get_refresh_lock(key):
+            # another caller may have refreshed it while we were waiting
+            price = cls._get_fresh(key, freshness)
+            if price is None:
+                price = Web3Utils(rpc_url, chain.poa).get_gas_price()
+                with cls._lock:
+                    cls._prices[key] = (price, time.monotonic())
+        return price
+
+    @classmethod
+    def _get_fresh(cls, key, freshness):
+        with cls._lock:
+            price, fetched_at = cls._prices.get(key, (None, 0))
+        if price is not None and time.monotonic() - fetched_at < freshness:
+            return price
+        return None
+
+    @classmethod
+    def _get_refresh_lock(cls, key):
+        with cls._lock:
+            return cls._refresh_locks.setdefault(key, threading.Lock())
+
+    @classmethod
+    def clear(cls):
+        cls._lock = threading.Lock()
+        cls._prices = {}
+        cls._refresh_locks = {}
+
+
+os.register_at_fork(after_in_child=GasPriceOracle.clear)
+
+
 class Web3Utils:
     LOG_STRICT = STRICT
     LOG_IGNORE = IGNORE
@@ -107,17 +256,9 @@ class Web3Utils:
 
     @property
     def w3(self) -> Web3:
-        if self._w3 and self._w3.is_connected():
-            return self._w3
-
-        self._w3 = Web3(Web3.HTTPProvider(self._rpc_url))
-        if self.poa:
-            self._w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
-        if self._w3.is_connected():
-            return self._w3
-
-        raise Exception(f"RPC provider is not connected ({self._rpc_url})")
+        if self._w3 is None:
+            self._w3 = Web3Pool.get(self._rpc_url, self.poa)
+        return self._w3
 
     @property
     def poa(self):
@@ -154,8 +295,9 @@ class Web3Utils:
     def get_gas_estimate(self, func: Type[ContractFunction]):
         return func.estimate_gas({"from": self.account.address})
 
-    def build_contract_txn(self, func: Type[ContractFunction], **kwargs):
-        nonce = self.w3.eth.get_transaction_count(self.account.address)
+    def build_contract_txn(self, func: Type[ContractFunction], nonce=None, **kwargs):
+        if nonce is None:
+            nonce = self.get_transaction_count(self.account.address)
         tx_data = func.build_transaction(
             {"from": self.account.address, "nonce": nonce, **kwargs}
         )
@@ -179,6 +321,9 @@ class Web3Utils:
     def get_gas_price(self):
         return self.w3.eth.gas_price
 
+    def get_transaction_count(self, address, block_identifier="latest"):
+        return self.w3.eth.get_transaction_count(address, block_identifier)
+
     def from_wei(self, value: int, unit: str = "ether"):
         return self.w3.from_wei(value, unit)
 
@@ -206,6 +351,99 @@ class Web3Utils:
         return self.w3.eth.get_balance(address)
 
 
+class Web3BatchClient:
+    """
+    sends many lookups of a chain as json-rpc batch requests instead of a
+    request each, every item succeeds or fails on its own
+    """
+
+    BATCH_SIZE = 50  # calls per http request
+
+    def __init__(self, web3_utils: Web3Utils):
+        self.web3_utils = web3_utils
+
+    @property
+    def w3(self) -> Web3:
+        return self.web3_utils.w3
+
+    def post(self, payload):
+        provider = self.w3.provider
+        response = make_post_request(
+            provider.endpoint_uri,
+            json.dumps(payload).encode(),
+            **dict(provider.get_request_kwargs()),
+        )
+        return json.loads(response)
+
+    def request(self, calls):
+        """
+        calls is a list of (method, params), returns the result of each call
+        formatted like web3 does, or the exception of the calls that failed
+        """
+        results = []
+        for start in range(0, len(calls), self.BATCH_SIZE):
+            chunk = calls[start : start + self.BATCH_SIZE]
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": method, "params": list(params)}
+                for i, (method, params) in enumerate(chunk)
+            ]
+            try:
+                responses = self.post(payload)
+                if not isinstance(responses, list):
+                    # the provider rejected the batch as a whole
+                    raise ValueError(responses.get("error", responses))
+            except Exception as e:
+                logging.warning(f"Batch request failed: {e!r}")
+                results += [e] * len(chunk)
+                continue
+
+            responses = {response.get("id"): response for response in responses}
+            for i, (method, _) in enumerate(chunk):
+                response = responses.get(i)
+                if response is None:
+                    results.append(ValueError(f"No response for {method}"))
+                elif "error" in response:
+                    results.append(ValueError(response["error"]))
+                else:
+                    result = get_result_formatters(method, self.w3.eth)(
+                        response["result"]
+                    )
+                    if isinstance(result, dict):
+                        result = AttributeDict.recursive(result)
+                    results.append(result)
+        return results
+
+    def get_transaction_receipts(self, tx_hashes):
+        """
+        {tx hash: receipt}, none for the txs that are not mined yet
+        """
+        return dict(
+            zip(
+                tx_hashes,
+                self.request([(RPC.eth_getTransactionReceipt, [h]) for h in tx_hashes]),
+            )
+        )
+
+    def get_transactions(self, tx_hashes):
+        return dict(
+            zip(
+                tx_hashes,
+                self.request([(RPC.eth_getTransactionByHash, [h]) for h in tx_hashes]),
+            )
+        )
+
+    def get_transactions_with_receipts(self, tx_hashes):
+        """
+        {tx hash: (tx, receipt)} in a single round trip
+        """
+        results = self.request(
+            [(RPC.eth_getTransactionByHash, [h]) for h in tx_hashes]
+            + [(RPC.eth_getTransactionReceipt, [h]) for h in tx_hashes]
+        )
+        count = len(tx_hashes)
+        return dict(zip(tx_hashes, zip(results[:count], results[count:])))
+
+
 class SolanaWeb3Utils:
     def __init__(self, rpc_url) -> None:
         self.rpc_url = rpc_url
@@ -214,12 +452,10 @@ class SolanaWeb3Utils:
     def w3(self) -> Client:
         assert self.rpc_url is not None
         try:
-            _w3 = Client(self.rpc_url)
-            if _w3.is_connected():
-                return _w3
+            return SolanaClientPool.get(self.rpc_url)
         except Exception as e:
             logging.error(e)
-            raise (f"Could not connect to rpc {self.rpc_url}")
+            raise Exception(f"Could not connect to rpc {self.rpc_url}")
 
 
 class InvalidAddressException(Exception):
@@ -288,6 +524,112 @@ class TokenClient:
         return self.web3_utils.w3.to_checksum_address(address)
 
 
+class MulticallBalanceReader:
+    """
+    reads the erc20/erc721 and native balances needed by a request with one
+    multicall3 eth_call per chain. balances are requested first, then read
+    with get_balance, a balance that was not requested is read on its own.
+    when the multicall fails the balances are read one by one
+    """
+
+    CHUNK_SIZE = 500  # calls per eth_call
+
+    def __init__(self) -> None:
+        self.chains = {}
+        self.requested = {}  # chain pk -> keys not read yet
+        self.balances = {}  # (chain pk, token, address) -> balance, None if failed
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(chain, token, address):
+        # token None is the native token
+        return (
+            chain.pk,
+            Web3.to_checksum_address(token) if token else None,
+            Web3.to_checksum_address(address),
+        )
+
+    def request(self, chain, token, address):
+        key = self.get_key(chain, token, address)
+        with self.lock:
+            if key not in self.balances:
+                self.chains[chain.pk] = chain
+                self.requested.setdefault(chain.pk, set()).add(key)
+
+    def execute(self):
+        with self.lock:
+            requested, self.requested = self.requested, {}
+        for chain_pk, keys in requested.items():
+            chain, keys = self.chains[chain_pk], list(keys)
+            try:
+                balances = self.aggregate(chain, keys)
+            except Exception as e:
+                # e.g. no multicall3 deployed on the chain
+                logging.warning(f"Multicall failed for {chain.chain_name}: {e!r}")
+                balances = self.read_each(chain, keys)
+            with self.lock:
+                self.balances.update(balances)
+
+    def get_balance(self, chain, token, address) -> int:
+        key = self.get_key(chain, token, address)
+        if key not in self.balances:
+            self.request(chain, token, address)
+            self.execute()
+        balance = self.balances[key]
+        if balance is None:
+            raise InvalidAddressException("Invalid contract address")
+        return balance
+
+    def read_each(self, chain, keys):
+        balances = {}
+        for _, token, address in keys:
+            token_client = TokenClient(chain=chain, contract=token)
+            try:
+                if token is None:
+                    balance = token_client.get_native_token_balance(address)
+                else:
+                    balance = token_client.get_non_native_token_balance(address)
+            except InvalidAddressException:
+                balance = None
+            balances[(chain.pk, token, address)] = balance
+        return balances
+
+    def aggregate(self, chain, keys):
+        w3 = Web3Utils(chain.rpc_url_private, chain.poa).w3
+        multicall = w3.eth.contract(
+            address=Web3.to_checksum_address(MULTICALL3_ADDRESS),
+            abi=MULTICALL3_METHODS,
+        )
+        erc20 = w3.eth.contract(abi=ERC20_READ_METHODS)
+        calls = []
+        for _, token, address in keys:
+            if token is None:
+                calls.append(
+                    (
+                        multicall.address,
+                        True,
+                        multicall.encodeABI(fn_name="getEthBalance", args=[address]),
+                    )
+                )
+            else:
+                # erc721 balanceOf has the same selector and return type
+                calls.append(
+                    (token, True, erc20.encodeABI(fn_name="balanceOf", args=[address]))
+                )
+
+        balances = {}
+        for start in range(0, len(calls), self.CHUNK_SIZE):
+            chunk = calls[start : start + self.CHUNK_SIZE]
+            results = multicall.functions.aggregate3(chunk).call()
+            for key, (success, data) in zip(keys[start:], results):
+                # a call to an address without code succeeds with no data
+                if success and len(data) == 32:
+                    balances[key] = w3.codec.decode(["uint256"], data)[0]
+                else:
+                    balances[key] = None
+        return balances
+
+
 class UploadFileStorage:
     BASE_PATH = time.strftime("%Y%m%d") + "/"
 
@@ -3,13 +3,17 @@ from safedelete.admin import SafeDeleteAdmin, SafeDeleteAdminFilter, highlight_d
 
 from .models import (
     BrightUser,
+    ClaimCounter,
+    ClaimLedger,
     ClaimReceipt,
     DonationContract,
     DonationReceipt,
     Faucet,
     GlobalSettings,
+    LeaderboardEntry,
     LightningConfig,
     TransactionBatch,
+    WalletNonce,
 )
 
 
@@ -88,6 +92,32 @@ class ClaimReceiptAdmin(admin.ModelAdmin):
             return obj.batch.tx_hash
 
 
+class ClaimLedgerAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "user_profile",
+        "chain",
+        "round_start",
+        "claims_count",
+        "claimed_amount",
+    ]
+    list_filter = ["chain", "round_start"]
+    readonly_fields = ["claims_count", "claimed_amount"]
+
+
+class ClaimCounterAdmin(admin.ModelAdmin):
+    list_display = ["pk", "faucet", "round_start", "shard", "count"]
+    list_filter = ["faucet", "round_start"]
+    readonly_fields = ["count"]
+
+
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ["pk", "faucet", "rank", "username", "sum_total_price"]
+    list_filter = ["faucet"]
+    search_fields = ["username"]
+    readonly_fields = ["rank", "sum_total_price", "interacted_chains"]
+
+
 class GlobalSettingsAdmin(admin.ModelAdmin):
     list_display = ["pk", "index", "value"]
     list_editable = ["value"]
@@ -98,6 +128,9 @@ class TransactionBatchAdmin(admin.ModelAdmin):
         "pk",
         "_status",
         "tx_hash",
+        "nonce",
+        "size_target",
+        "fill_ratio",
         "updating",
         "faucet",
         "age",
@@ -109,6 +142,11 @@ class TransactionBatchAdmin(admin.ModelAdmin):
     list_filter = ["faucet", "_status", "updating"]
 
 
+class WalletNonceAdmin(admin.ModelAdmin):
+    list_display = ["pk", "chain", "address", "next_nonce", "updated_at"]
+    list_filter = ["chain"]
+
+
 class LightningConfigAdmin(admin.ModelAdmin):
     readonly_fields = ["claimed_amount", "current_round"]
     list_display = ["pk", "period", "period_max_cap", "claimed_amount", "current_round"]
@@ -144,8 +182,12 @@ class DonationContractAdmin(SafeDeleteAdmin):
 admin.site.register(Faucet, FaucetAdmin)
 admin.site.register(BrightUser, BrightUserAdmin)
 admin.site.register(ClaimReceipt, ClaimReceiptAdmin)
+admin.site.register(ClaimLedger, ClaimLedgerAdmin)
+admin.site.register(ClaimCounter, ClaimCounterAdmin)
 admin.site.register(GlobalSettings, GlobalSettingsAdmin)
 admin.site.register(TransactionBatch, TransactionBatchAdmin)
+admin.site.register(WalletNonce, WalletNonceAdmin)
 admin.site.register(LightningConfig, LightningConfigAdmin)
 admin.site.register(DonationReceipt, DonationReceiptAdmin)
 admin.site.register(DonationContract, DonationContractAdmin)
+admin.site.register(LeaderboardEntry, LeaderboardEntryAdmin)
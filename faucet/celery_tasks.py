@@ -2,31 +2,54 @@ import decimal
 import logging
 
 import requests
-import web3.exceptions
 from django.db import transaction
-from django.db.models import F, Func
+from django.db.models import F, Func, Q
 from django.utils import timezone
 from sentry_sdk import capture_exception
 
 from authentication.models import NetworkTypes
 from core.models import TokenPrice
-from core.utils import Web3Utils
+from core.utils import Web3BatchClient, Web3Utils
 from tokenTap.models import TokenDistributionClaim
 
-from .faucet_manager.fund_manager import FundMangerException, get_fund_manager
+from .faucet_manager.balance_sweeper import BalanceSweeper
+from .faucet_manager.batch_sizer import BatchSizer
+from .faucet_manager.claim_counters import reconcile_claim_counters
+from .faucet_manager.credit_strategy import RoundCreditStrategy
+from .faucet_manager.fuel_champion import update_fuel_champions
+from .faucet_manager.fund_manager import (
+    EVMFundManager,
+    FundMangerException,
+    get_fund_manager,
+)
+from .faucet_manager.leaderboard import rebuild_leaderboard, record_donation
 from .models import (
     ClaimReceipt,
+    DirtyFaucet,
     DonationContract,
     DonationReceipt,
     Faucet,
+    FaucetBalanceSnapshot,
     TransactionBatch,
 )
 
+# chains whose pending batches are confirmed together, see
+# update_pending_batches_in_bulk
+BULK_CONFIRMED_CHAIN_TYPES = [
+    NetworkTypes.EVM,
+    NetworkTypes.NONEVMXDC,
+    NetworkTypes.SOLANA,
+]
+
+# times a batcher looks again at claims that arrived while it held the faucet
+MAX_BATCHER_ROUNDS = 5
 
-def has_pending_batch(faucet):
-    return TransactionBatch.objects.filter(
+
+def get_free_batch_slots(faucet):
+    pending_batches = TransactionBatch.objects.filter(
         faucet=faucet, _status=ClaimReceipt.PENDING
-    ).exists()
+    ).count()
+    return max(faucet.batch_pipeline_size - pending_batches, 0)
 
 
 class CeleryTasks:
@@ -44,9 +67,10 @@ class CeleryTasks:
             if not batch.should_be_processed:
                 return
             if batch.is_expired:
-                batch._status = ClaimReceipt.REJECTED
-                batch.save()
-                batch.claims.update(_status=batch._status)
+                with transaction.atomic():
+                    batch._status = ClaimReceipt.REJECTED
+                    batch.save()
+                    batch.claims.update_status(batch._status)
                 return
 
             data = [
@@ -61,8 +85,13 @@ class CeleryTasks:
 
             try:
                 manager = get_fund_manager(batch.faucet)
-                tx_hash = manager.multi_transfer(data)
+                if isinstance(manager, EVMFundManager):
+                    # the batch keeps its nonce, so batches can be in flight together
+                    tx_hash = manager.multi_transfer(data, batch=batch)
+                else:
+                    tx_hash = manager.multi_transfer(data)
                 batch.tx_hash = tx_hash
+                batch.schedule_next_check()
                 batch.save()
             except FundMangerException.GasPriceTooHigh as e:
                 logging.exception(e)
@@ -85,6 +114,7 @@ class CeleryTasks:
         try:
             if not batch.status_should_be_updated:
                 return
+            batch.checks_count += 1
             manager = get_fund_manager(batch.faucet)
 
             if manager.is_tx_verified(batch.tx_hash):
@@ -97,8 +127,68 @@ class CeleryTasks:
             capture_exception()
             logging.exception(str(e))
         finally:
-            batch.save()
-            batch.claims.update(_status=batch._status)
+            if batch._status == ClaimReceipt.PENDING:
+                batch.schedule_next_check()
+            with transaction.atomic():
+                batch.save()
+                batch.claims.update_status(batch._status)
+
+    @staticmethod
+    def update_pending_batches_in_bulk():
+        """
+        confirm the due batches of every evm and solana chain with batched
+        rpc calls, one round trip per chain instead of a task per batch,
+        returns the pks of the resolved batches
+        """
+        batches = (
+            TransactionBatch.objects.filter(
+                _status=ClaimReceipt.PENDING,
+                faucet__chain__chain_type__in=BULK_CONFIRMED_CHAIN_TYPES,
+            )
+            .filter(Q(next_check_at=None) | Q(next_check_at__lte=timezone.now()))
+            .exclude(tx_hash=None)
+            .exclude(updating=True)
+            .select_related("faucet__chain__wallet")
+        )
+        batches_by_chain = {}
+        for batch in batches:
+            batches_by_chain.setdefault(batch.faucet.chain_id, []).append(batch)
+
+        resolved = []
+        for chain_batches in batches_by_chain.values():
+            try:
+                manager = get_fund_manager(chain_batches[0].faucet)
+                verified = manager.get_verified_tx_hashes(
+                    [batch.tx_hash for batch in chain_batches]
+                )
+            except Exception as e:
+                verified = set()
+                capture_exception()
+                logging.exception(str(e))
+
+            for batch in chain_batches:
+                batch.checks_count += 1
+                if batch.tx_hash in verified:
+                    batch._status = ClaimReceipt.VERIFIED
+                elif batch.is_expired:
+                    batch._status = ClaimReceipt.REJECTED
+                else:
+                    batch.schedule_next_check()
+
+            with transaction.atomic():
+                TransactionBatch.objects.bulk_update(
+                    chain_batches, ["_status", "checks_count", "next_check_at"]
+                )
+                for status in [ClaimReceipt.VERIFIED, ClaimReceipt.REJECTED]:
+                    ClaimReceipt.objects.filter(
+                        batch__in=[b for b in chain_batches if b._status == status]
+                    ).update_status(status)
+            resolved += [
+                batch.pk
+                for batch in chain_batches
+                if batch._status != ClaimReceipt.PENDING
+            ]
+        return resolved
 
     @staticmethod
     def reject_expired_pending_claims():
@@ -107,18 +197,50 @@ class CeleryTasks:
             _status=ClaimReceipt.PENDING,
             datetime__lte=timezone.now()
             - timezone.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION),
-        ).update(_status=ClaimReceipt.REJECTED)
+        ).update_status(ClaimReceipt.REJECTED)
 
     @staticmethod
     def process_faucet_pending_claims(faucet_id):
+        """
+        form the next batches of the faucet, returns False if another
+        batcher is already working on it
+        """
+        for round_ in range(MAX_BATCHER_ROUNDS):
+            checked_at = CeleryTasks.form_faucet_batches(faucet_id)
+            if checked_at is None:
+                return round_ > 0
+            # the wake up of a claim marked while the faucet was held was
+            # skipped, the holder looks again before it lets the claim wait
+            # for the sweep
+            if not DirtyFaucet.objects.filter(
+                faucet_id=faucet_id, marked_at__gt=checked_at
+            ).exists():
+                return True
+            if not get_free_batch_slots(Faucet.objects.get(pk=faucet_id)):
+                # woken up again when one of its batches is resolved
+                return True
+        return True
+
+    @staticmethod
+    def form_faucet_batches(faucet_id):
+        """
+        returns when the pending receipts were looked at, None if another
+        batcher holds the faucet
+        """
         with transaction.atomic():
-            faucet = Faucet.objects.select_for_update().get(
-                pk=faucet_id
-            )  # lock based on chain
+            # lock based on chain, a busy faucet is skipped instead of waited on
+            faucet = (
+                Faucet.objects.select_for_update(skip_locked=True)
+                .filter(pk=faucet_id)
+                .first()
+            )
+            if faucet is None:
+                return None
+            checked_at = timezone.now()
 
-            # all pending batches must be resolved before new transactions can be made
-            if has_pending_batch(faucet):
-                return
+            # only batch_pipeline_size batches can be in flight at once
+            # the faucet stays dirty and is woken up again when a batch is resolved
+            free_slots = get_free_batch_slots(faucet)
 
             # get all pending receipts for this chain
             # pending receipts are receipts that have not been batched yet
@@ -126,37 +248,116 @@ class CeleryTasks:
                 faucet=faucet, _status=ClaimReceipt.PENDING, batch=None
             )
 
-            if receipts.count() == 0:
-                return
+            sizer = BatchSizer(faucet)
+            capacity = sizer.get_capacity()
+            queue_depth = receipts.count() if free_slots > 0 else 0
 
-            if faucet.chain.chain_type == NetworkTypes.LIGHTNING:
-                receipts = receipts.order_by("pk")[:1]
-            else:
-                receipts = receipts.order_by("pk")[:32]
+            while free_slots > 0 and queue_depth > 0:
+                batch_size = sizer.get_size(queue_depth, capacity)
+                batch = TransactionBatch.objects.create(
+                    faucet=faucet, size_target=batch_size
+                )
+                assigned = receipts.assign_batch(batch, batch_size)
+                if assigned == 0:
+                    # every receipt was taken by someone else in the meantime
+                    batch.delete()
+                    break
+                batch.fill_ratio = assigned / capacity
+                batch.save(update_fields=["fill_ratio"])
+                queue_depth -= assigned
+                free_slots -= 1
+
+            if not receipts.exists():
+                DirtyFaucet.clear(faucet.pk, checked_at)
+            return checked_at
 
-            # if there are no pending batches, create a new batch
-            batch = TransactionBatch.objects.create(faucet=faucet)
+    @staticmethod
+    def reconcile_wallet_nonces():
+        # one faucet per chain is enough, the nonce belongs to the chain wallet
+        faucets = {
+            faucet.chain_id: faucet
+            for faucet in Faucet.objects.filter(
+                is_active=True, chain__wallet_nonces__isnull=False
+            ).select_related("chain", "chain__wallet")
+        }
+        for faucet in faucets.values():
+            try:
+                get_fund_manager(faucet).nonce_manager.reconcile()
+            except Exception as e:
+                logging.exception(str(e))
+                capture_exception()
 
-            # assign the batch to the receipts
-            for receipt in receipts:
-                receipt.batch = batch
-                receipt.save()
+    @staticmethod
+    def reconcile_claim_counters():
+        # only the rounds the public stats show, older ones are left to the
+        # reconcile_claim_counters command
+        drifts = reconcile_claim_counters(
+            RoundCreditStrategy.get_start_of_previous_round()
+        )
+        for faucet_id, round_start, drift in drifts:
+            logging.warning(
+                f"Claim counter of faucet {faucet_id} for round {round_start} "
+                f"drifted by {drift}"
+            )
 
     @staticmethod
     def update_needs_funding_status_faucet(faucet_id):
-        try:
-            faucet = Faucet.objects.get(pk=faucet_id)
-            # if has enough funds and enough fees, needs_funding is False
-
-            faucet.needs_funding = True
-
-            if faucet.has_enough_funds and faucet.chain.has_enough_fees:
-                faucet.needs_funding = False
+        CeleryTasks.update_balance_snapshots(Faucet.objects.filter(pk=faucet_id))
 
-            faucet.save()
+    @staticmethod
+    def update_balance_snapshots(faucets=None):
+        """
+        read the balances of all faucets in one concurrent sweep and store
+        the snapshots and needs_funding flags in bulk
+        """
+        if faucets is None:
+            faucets = Faucet.objects.filter(is_active=True)
+        faucets = list(faucets.select_related("chain__wallet"))
+        try:
+            balances = BalanceSweeper(faucets).sweep()
         except Exception as e:
             logging.exception(str(e))
             capture_exception()
+            return
+
+        snapshots = {
+            s.faucet_id: s
+            for s in FaucetBalanceSnapshot.objects.filter(faucet__in=faucets)
+        }
+        new_snapshots = []
+        now = timezone.now()
+        for faucet in faucets:
+            contract_balance, wallet_balance, gas_price = balances[faucet.pk]
+            snapshot = snapshots.get(faucet.pk)
+            if snapshot is None:
+                snapshot = FaucetBalanceSnapshot(faucet=faucet)
+                new_snapshots.append(snapshot)
+            snapshot.contract_balance = contract_balance
+            snapshot.wallet_balance = wallet_balance
+            snapshot.has_enough_funds = faucet.has_enough_funds_in(contract_balance)
+            snapshot.has_enough_fees = faucet.chain.has_enough_fees_in(
+                wallet_balance, gas_price
+            )
+            snapshot.updated_at = now
+
+            # if has enough funds and enough fees, needs_funding is False
+            faucet.needs_funding = not (
+                snapshot.has_enough_funds and snapshot.has_enough_fees
+            )
+
+        with transaction.atomic():
+            FaucetBalanceSnapshot.objects.bulk_create(new_snapshots)
+            FaucetBalanceSnapshot.objects.bulk_update(
+                list(snapshots.values()),
+                [
+                    "contract_balance",
+                    "wallet_balance",
+                    "has_enough_funds",
+                    "has_enough_fees",
+                    "updated_at",
+                ],
+            )
+            Faucet.objects.bulk_update(faucets, ["needs_funding"])
 
     @staticmethod
     def process_verified_lightning_claim(gas_tap_claim_id):
@@ -253,8 +454,71 @@ class CeleryTasks:
     @staticmethod
     def process_donation_receipt(donation_receipt_pk):
         donation_receipt = DonationReceipt.objects.get(pk=donation_receipt_pk)
+        evm_fund_manager = get_fund_manager(donation_receipt.faucet)
+        receipt = evm_fund_manager.get_tx_receipt(donation_receipt.tx_hash)
+        if receipt is None and not donation_receipt.is_expired:
+            # not mined yet, the next run checks it again
+            return
+        tx = None
+        if receipt is not None and receipt["status"] == 1:
+            tx = evm_fund_manager.get_tx(donation_receipt.tx_hash)
+        CeleryTasks.verify_donation_receipt(donation_receipt, evm_fund_manager, tx)
+
+    @staticmethod
+    def update_pending_donation_receipts():
+        """
+        check the pending donations of each evm chain with one batched rpc
+        call for all of their txs and receipts
+        """
+        donation_receipts = DonationReceipt.objects.filter(
+            status=ClaimReceipt.PENDING,
+            faucet__chain__chain_type__in=[NetworkTypes.EVM, NetworkTypes.NONEVMXDC],
+        ).select_related("faucet__chain__wallet", "user_profile")
+        receipts_by_chain = {}
+        for donation_receipt in donation_receipts:
+            receipts_by_chain.setdefault(donation_receipt.faucet.chain_id, []).append(
+                donation_receipt
+            )
+
+        for chain_receipts in receipts_by_chain.values():
+            managers = {}
+            for donation_receipt in chain_receipts:
+                if donation_receipt.faucet_id not in managers:
+                    managers[donation_receipt.faucet_id] = get_fund_manager(
+                        donation_receipt.faucet
+                    )
+            client = Web3BatchClient(managers[chain_receipts[0].faucet_id].web3_utils)
+            results = client.get_transactions_with_receipts(
+                list({r.tx_hash for r in chain_receipts})
+            )
+            for donation_receipt in chain_receipts:
+                tx, receipt = results[donation_receipt.tx_hash]
+                if isinstance(tx, Exception) or isinstance(receipt, Exception):
+                    # the lookup failed, the next run checks it again
+                    continue
+                if receipt is None and not donation_receipt.is_expired:
+                    # not mined yet, the next run checks it again
+                    continue
+                if receipt is None or receipt["status"] != 1:
+                    tx = None
+                try:
+                    CeleryTasks.verify_donation_receipt(
+                        donation_receipt, managers[donation_receipt.faucet_id], tx
+                    )
+                except Exception as e:
+                    capture_exception()
+                    logging.exception(str(e))
+
+    @staticmethod
+    def verify_donation_receipt(donation_receipt, evm_fund_manager, tx):
+        """
+        tx is none if the donation tx did not succeed
+        """
         faucet = donation_receipt.faucet
-        evm_fund_manager = get_fund_manager(faucet)
+        if tx is None:
+            donation_receipt.status = ClaimReceipt.REJECTED
+            donation_receipt.save()
+            return
         try:
             donation_contract_address = DonationContract.objects.get(
                 faucet=faucet
@@ -266,52 +530,57 @@ class CeleryTasks:
             logging.error(
                 f"donation contract for faucet {faucet.chain} does not exists"
             )
-        try:
-            if not evm_fund_manager.is_tx_verified(donation_receipt.tx_hash):
-                donation_receipt.status = ClaimReceipt.REJECTED
-                donation_receipt.save()
-                return
-            user = donation_receipt.user_profile
-            tx = evm_fund_manager.get_tx(donation_receipt.tx_hash)
-            if tx.get("from").lower() not in user.wallets.annotate(
-                lower_address=Func(F("address"), function="LOWER")
-            ).values_list("lower_address", flat=True):
-                donation_receipt.status = ClaimReceipt.REJECTED
-                donation_receipt.save()
-                return
-            if (
-                Web3Utils.to_checksum_address(tx.get("to"))
-                != evm_fund_manager.get_fund_manager_checksum_address()
-                and
-                # TODO: remove fund_manager address
-                Web3Utils.to_checksum_address(tx.get("to"))
-                != Web3Utils.to_checksum_address(donation_contract_address)
-            ):
-                donation_receipt.status = ClaimReceipt.REJECTED
-                donation_receipt.save()
-                return
-            donation_receipt.value = str(evm_fund_manager.from_wei(tx.get("value")))
-            if not faucet.chain.is_testnet:
-                try:
-                    token_price = TokenPrice.objects.get(symbol=faucet.chain.symbol)
-                    donation_receipt.total_price = str(
-                        decimal.Decimal(donation_receipt.value)
-                        * decimal.Decimal(token_price.usd_price)
-                    )
-                except TokenPrice.DoesNotExist:
-                    logging.error(
-                        f"TokenPrice for Chain: "
-                        f"{faucet.chain.chain_name}"
-                        f" did not defined"
-                    )
-                    donation_receipt.status = ClaimReceipt.REJECTED
-                    donation_receipt.save()
-                    return
-            else:
-                donation_receipt.total_price = str(0)
-            donation_receipt.status = ClaimReceipt.VERIFIED
+        user = donation_receipt.user_profile
+        if tx.get("from").lower() not in user.wallets.annotate(
+            lower_address=Func(F("address"), function="LOWER")
+        ).values_list("lower_address", flat=True):
+            donation_receipt.status = ClaimReceipt.REJECTED
             donation_receipt.save()
-        except (web3.exceptions.TransactionNotFound, web3.exceptions.TimeExhausted):
+            return
+        if (
+            Web3Utils.to_checksum_address(tx.get("to"))
+            != evm_fund_manager.get_fund_manager_checksum_address()
+            and
+            # TODO: remove fund_manager address
+            Web3Utils.to_checksum_address(tx.get("to"))
+            != Web3Utils.to_checksum_address(donation_contract_address)
+        ):
             donation_receipt.status = ClaimReceipt.REJECTED
             donation_receipt.save()
             return
+        donation_receipt.value = str(evm_fund_manager.from_wei(tx.get("value")))
+        if not faucet.chain.is_testnet:
+            try:
+                token_price = TokenPrice.objects.get(symbol=faucet.chain.symbol)
+                donation_receipt.total_price = str(
+                    decimal.Decimal(donation_receipt.value)
+                    * decimal.Decimal(token_price.usd_price)
+                )
+            except TokenPrice.DoesNotExist:
+                logging.error(
+                    f"TokenPrice for Chain: "
+                    f"{faucet.chain.chain_name}"
+                    f" did not defined"
+                )
+                donation_receipt.status = ClaimReceipt.REJECTED
+                donation_receipt.save()
+                return
+        else:
+            donation_receipt.total_price = str(0)
+        donation_receipt.status = ClaimReceipt.VERIFIED
+        donation_receipt.save()
+        try:
+            record_donation(donation_receipt)
+        except Exception as e:
+            # the periodic rebuild puts the donor on the leaderboard anyway
+            capture_exception()
+            logging.exception(str(e))
+        try:
+            update_fuel_champions(donation_receipt)
+        except Exception as e:
+            capture_exception()
+            logging.exception(str(e))
+
+    @staticmethod
+    def rebuild_leaderboard():
+        rebuild_leaderboard()
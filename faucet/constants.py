@@ -1 +0,0 @@
-MEMCACHE_LIGHTNING_LOCK_KEY = "Lightning-Multi-Transfer-LOCK"
\ No newline at end of file
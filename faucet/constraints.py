@@ -1,14 +1,14 @@
 import logging
 
 import requests
+from django.core.cache import cache
 from django.db.models.functions import Lower
 
 from core.constraints import ConstraintParam, ConstraintVerification
 from core.models import Chain
-from core.utils import Web3Utils
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
 
-from .models import ClaimReceipt, DonationReceipt
+from .models import AddressFirstTransactions, ClaimReceipt, DonationReceipt
 
 
 class DonationConstraint(ConstraintVerification):
@@ -39,50 +39,71 @@ class OptimismDonationConstraint(DonationConstraint):
 
 class EvmClaimingGasConstraint(ConstraintVerification):
     _param_keys = [ConstraintParam.CHAIN]
+    _cache_timeout = 300
+
+    EXPLORER_TIMEOUT = 10  # seconds
+    MISSING_TX_TIMEOUT = 300  # seconds an address without the tx is remembered
+    TX_FIELDS = ["hash", "from", "isError", "blockNumber"]
+
+    def fetch_first_tx(self, chain, address, action):
+        response = requests.get(
+            f"{chain.explorer_api_url}/api?module=account&action={action}"
+            f"&address={address}&startblock=0&page=1&offset=1&sort=asc"
+            f"&apikey={chain.explorer_api_key}",
+            timeout=self.EXPLORER_TIMEOUT,
+        )
+        result = response.json().get("result")
+        if not isinstance(result, list):
+            raise ValueError(f"Explorer error for {action} of {address}: {result}")
+        if not result:
+            return None
+        return {key: result[0].get(key) for key in self.TX_FIELDS}
+
+    def get_first_tx(self, chain, address, field, action):
+        """
+        the first tx of the address is stored once the explorer returns it and
+        reused from then on, an address without it is asked again later
+        """
+        record = AddressFirstTransactions.objects.filter(
+            chain=chain, address=address
+        ).first()
+        if record and getattr(record, field):
+            return getattr(record, field)
+        missing_key = f"evm_first_tx_missing_{chain.pk}_{address}_{action}"
+        if cache.get(missing_key):
+            return None
+        tx = self.fetch_first_tx(chain, address, action)
+        if tx is None:
+            cache.set(missing_key, True, self.MISSING_TX_TIMEOUT)
+            return None
+        AddressFirstTransactions.objects.update_or_create(
+            chain=chain, address=address, defaults={field: tx}
+        )
+        return tx
 
     def is_observed(self, *args, **kwargs):
         chain_pk = self._param_values[ConstraintParam.CHAIN]
         chain = Chain.objects.get(pk=chain_pk)
-        w3 = Web3Utils(chain.rpc_url_private, chain.poa)
-        current_block = w3.current_block()
         user_address = self.user_profile.wallets.get(
             wallet_type=chain.chain_type
-        ).address
+        ).address.lower()
 
-        first_internal_tx = requests.get(
-            f"{chain.explorer_api_url}/api?module=account&action=txlistinternal"
-            f"&address={user_address}&start"
-            f"block=0&endblock={current_block}&page=1&offset=1&sort=asc"
-            f"&apikey={chain.explorer_api_key}"
+        # explorer errors raise, so they are not cached as a violation
+        first_internal_tx = self.get_first_tx(
+            chain, user_address, "first_internal_tx", "txlistinternal"
         )
+        if not first_internal_tx or first_internal_tx["isError"] != "0":
+            return False
         chain_fund_managers = chain.faucets.values_list(
             Lower("fund_manager_address"), flat=True
         )
-        first_internal_tx = first_internal_tx.json()
-        if first_internal_tx and first_internal_tx["status"] == "1":
-            first_internal_tx = first_internal_tx["result"][0]
-            if (
-                first_internal_tx
-                and first_internal_tx["from"] in chain_fund_managers
-                and first_internal_tx["isError"] == "0"
-            ):
-                first_tx = requests.get(
-                    f"{chain.explorer_api_url}/api?module=account&action=txlist"
-                    f"&address={user_address}&startblock=0&"
-                    f"endblock={current_block}&page=1&offset=1&sort=asc"
-                    f"&apikey={chain.explorer_api_key}"
-                )
-                first_tx = first_tx.json()
-                if first_tx:
-                    if not first_tx["result"]:
-                        return True
-                    first_tx = first_tx["result"][0]
-                    claiming_gas_tx = w3.get_transaction_by_hash(
-                        first_internal_tx["hash"]
-                    )
-                    web3_first_tx = w3.get_transaction_by_hash(first_tx["hash"])
-                    return web3_first_tx["blockNumber"] > claiming_gas_tx["blockNumber"]
-        return False
+        if first_internal_tx["from"] not in chain_fund_managers:
+            return False
+
+        first_tx = self.get_first_tx(chain, user_address, "first_tx", "txlist")
+        if not first_tx:
+            return True
+        return int(first_tx["blockNumber"]) > int(first_internal_tx["blockNumber"])
 
 
 class OptimismClaimingGasConstraint(EvmClaimingGasConstraint):
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+import aiohttp
+from solana.rpc.async_api import AsyncClient
+from solders.pubkey import Pubkey
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from core.models import NetworkTypes
+
+from .lnpay_client import LNPayClient
+
+
+def is_evm_chain(chain):
+    return chain.chain_type == NetworkTypes.EVM or int(chain.chain_id) == 500
+
+
+class SessionHTTPProvider(AsyncHTTPProvider):
+    """
+    posts with the session of a sweep, web3's own provider keeps its sessions
+    in a process wide cache that outlives the sweep
+    """
+
+    def __init__(self, endpoint_uri, session: aiohttp.ClientSession, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.session = session
+
+    async def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        async with self.session.post(
+            self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+        ) as response:
+            response.raise_for_status()
+            return self.decode_rpc_response(await response.read())
+
+
+class BalanceSweeper:
+    """
+    reads the balances of all faucets at once with async clients,
+    so a sweep takes about as long as the slowest chain. a call that fails or
+    times out counts as an empty balance, like the sync getters do
+    """
+
+    TIMEOUT = 10  # seconds per call
+    CONCURRENCY = 20
+
+    def __init__(self, faucets, timeout=None, concurrency=None):
+        # faucets must come with chain__wallet selected, no queries are made here
+        self.faucets = list(faucets)
+        self.timeout = timeout or self.TIMEOUT
+        self.concurrency = concurrency or self.CONCURRENCY
+
+    def sweep(self):
+        """
+        returns {faucet pk: (contract balance, wallet balance, gas price)}
+        """
+        return asyncio.run(self._sweep())
+
+    async def _sweep(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        chains = list({f.chain.pk: f.chain for f in self.faucets}.values())
+        async with aiohttp.ClientSession() as session:
+            self.session = session
+            chain_values, contract_balances = await asyncio.gather(
+                asyncio.gather(*[self.read_chain(chain) for chain in chains]),
+                asyncio.gather(
+                    *[
+                        self.call(self.get_manager_balance(faucet), 0, faucet.chain)
+                        for faucet in self.faucets
+                    ]
+                ),
+            )
+        chain_values = dict(zip([chain.pk for chain in chains], chain_values))
+        return {
+            faucet.pk: (contract_balance, *chain_values[faucet.chain.pk])
+            for faucet, contract_balance in zip(self.faucets, contract_balances)
+        }
+
+    async def call(self, coroutine, default, chain):
+        async with self.semaphore:
+            try:
+                return await asyncio.wait_for(coroutine, self.timeout)
+            except Exception as e:
+                logging.warning(f"Balance sweep failed for {chain.chain_name}: {e!r}")
+                return default
+
+    async def read_chain(self, chain):
+        # no gas price means the fee check fails, as in Chain.gas_price
+        return await asyncio.gather(
+            self.call(self.get_wallet_balance(chain), 0, chain),
+            self.call(self.get_gas_price(chain), chain.max_gas_price + 1, chain),
+        )
+
+    def get_web3(self, rpc_url) -> AsyncWeb3:
+        return AsyncWeb3(SessionHTTPProvider(rpc_url, self.session))
+
+    async def get_evm_balance(self, rpc_url, address):
+        w3 = self.get_web3(rpc_url)
+        return await w3.eth.get_balance(AsyncWeb3.to_checksum_address(address))
+
+    async def get_solana_balance(self, rpc_url, pubkey: Pubkey):
+        async with AsyncClient(rpc_url, timeout=self.timeout) as client:
+            return (await client.get_balance(pubkey)).value
+
+    async def get_lightning_balance(self, faucet):
+        # the lnpay client is sync, keep it off the event loop
+        return await asyncio.to_thread(LNPayClient.for_faucet(faucet).get_balance)
+
+    async def get_manager_balance(self, faucet):
+        chain = faucet.chain
+        if not chain.rpc_url_private:
+            return 0
+        if is_evm_chain(chain):
+            return await self.get_evm_balance(
+                chain.rpc_url_private, faucet.fund_manager_address
+            )
+        if chain.chain_type == NetworkTypes.SOLANA:
+            lock_account_address, _ = Pubkey.find_program_address(
+                [bytes("locker", "utf-8")],
+                Pubkey.from_string(faucet.fund_manager_address),
+            )
+            return await self.get_solana_balance(
+                chain.rpc_url_private, lock_account_address
+            )
+        if chain.chain_type == NetworkTypes.LIGHTNING:
+            return await self.get_lightning_balance(faucet)
+        return 0
+
+    async def get_wallet_balance(self, chain):
+        if not chain.rpc_url_private:
+            return 0
+        if is_evm_chain(chain):
+            return await self.get_evm_balance(
+                chain.rpc_url_private, chain.wallet.address
+            )
+        if chain.chain_type == NetworkTypes.SOLANA:
+            return await self.get_solana_balance(
+                chain.rpc_url_private, Pubkey.from_string(chain.wallet.address)
+            )
+        return 0
+
+    async def get_gas_price(self, chain):
+        if not chain.rpc_url_private or not is_evm_chain(chain):
+            return chain.max_gas_price + 1
+        w3 = self.get_web3(chain.rpc_url_private)
+        return await w3.eth.gas_price
@@ -0,0 +1,60 @@
+import math
+
+from django.db.models import Count
+
+from core.models import NetworkTypes
+from faucet.models import Faucet
+
+
+class BatchSizer:
+    """
+    sizes the next batch of a faucet. evm batches are capped by the gas
+    measured on the faucet's recent batches and the block gas limit,
+    a shallow queue is sent right away and a deep one fills whole batches
+    """
+
+    BASE_GAS = 50000
+    DEFAULT_GAS_PER_RECIPIENT = 40000
+    MAX_BLOCK_SHARE = 0.25  # a batch should not take more of a block than this
+    MAX_SIZE = 256
+    SAMPLE_SIZE = 20  # recent batches the gas per recipient is measured on
+
+    # chains that cannot be sized by gas
+    FIXED_CAPACITY = {NetworkTypes.LIGHTNING: 1, NetworkTypes.SOLANA: 32}
+
+    def __init__(self, faucet: Faucet):
+        self.faucet = faucet
+        self.chain = faucet.chain
+
+    def get_gas_per_recipient(self):
+        batches = (
+            self.faucet.batches.exclude(gas_estimate=None)
+            .annotate(recipients=Count("claims"))
+            .filter(recipients__gt=0)
+            .order_by("-pk")
+            .values_list("gas_estimate", "recipients")[: self.SAMPLE_SIZE]
+        )
+        samples = [
+            (gas_estimate - self.BASE_GAS) / recipients
+            for gas_estimate, recipients in batches
+            if gas_estimate > self.BASE_GAS
+        ]
+        if not samples:
+            return self.DEFAULT_GAS_PER_RECIPIENT
+        return sum(samples) / len(samples)
+
+    def get_capacity(self):
+        if self.chain.chain_type in self.FIXED_CAPACITY:
+            return self.FIXED_CAPACITY[self.chain.chain_type]
+        gas_budget = self.chain.block_gas_limit * self.MAX_BLOCK_SHARE - self.BASE_GAS
+        capacity = int(gas_budget / self.get_gas_per_recipient())
+        return min(max(capacity, 1), self.MAX_SIZE)
+
+    def get_size(self, queue_depth, capacity=None):
+        if capacity is None:
+            capacity = self.get_capacity()
+        if queue_depth <= 0:
+            return 0
+        # spread the queue evenly over the fewest batches that can hold it
+        batches_needed = math.ceil(queue_depth / capacity)
+        return math.ceil(queue_depth / batches_needed)
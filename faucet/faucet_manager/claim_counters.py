@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+from faucet.models import ClaimCounter, ClaimReceipt
+
+
+def get_expected_counters(since=None, **filters):
+    """
+    recount the claims from the raw claim receipts,
+    returns {(faucet_id, round_start): count}
+    """
+    receipts = ClaimReceipt.objects.filter(
+        _status__in=ClaimCounter.COUNTED_STATES, **filters
+    )
+    if since is not None:
+        receipts = receipts.filter(
+            datetime__gte=RoundCreditStrategy.get_start_of_the_round_of(since)
+        )
+    return {
+        (faucet_id, round_start): total
+        for faucet_id, round_start, total in receipts.annotate(
+            round_start=RoundCreditStrategy.get_start_of_the_round_expression(
+                "datetime"
+            )
+        )
+        .values("faucet_id", "round_start")
+        .order_by()
+        .annotate(total=Count("pk"))
+        .values_list("faucet_id", "round_start", "total")
+    }
+
+
+def get_counter_totals(since=None):
+    counters = ClaimCounter.objects.all()
+    if since is not None:
+        counters = counters.filter(
+            round_start__gte=RoundCreditStrategy.get_start_of_the_round_of(since)
+        )
+    return {
+        (faucet_id, round_start): total
+        for faucet_id, round_start, total in counters.values("faucet_id", "round_start")
+        .order_by()
+        .annotate(total=Sum("count"))
+        .values_list("faucet_id", "round_start", "total")
+    }
+
+
+def correct_counter(faucet_id, round_start):
+    """
+    recount one counter with its shards locked, a claim committed after the
+    drift was found is then counted on both sides. returns the correction
+    """
+    with transaction.atomic():
+        shards = ClaimCounter.objects.select_for_update().filter(
+            faucet_id=faucet_id, round_start=round_start
+        )
+        actual = sum(shards.values_list("count", flat=True))
+        expected = get_expected_counters(round_start, faucet_id=faucet_id).get(
+            (faucet_id, round_start), 0
+        )
+        drift = expected - actual
+        if drift:
+            ClaimCounter.add(faucet_id, round_start, drift, shard=0)
+        return drift
+
+
+def reconcile_claim_counters(since=None):
+    """
+    correct the counters (all of them, or the rounds after since) that drifted
+    from the receipts, returns a list of (faucet_id, round_start, drift)
+    """
+    expected = get_expected_counters(since)
+    actual = get_counter_totals(since)
+    drifts = []
+    for key in set(expected) | set(actual):
+        if expected.get(key, 0) == actual.get(key, 0):
+            continue
+        # the two reads above are not a snapshot, the drift is checked again
+        drift = correct_counter(*key)
+        if drift:
+            drifts.append((*key, drift))
+    return drifts
@@ -0,0 +1,104 @@
+from django.db import transaction
+
+from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+from faucet.models import ClaimLedger, ClaimReceipt
+
+
+def get_expected_ledger(since=None):
+    """
+    recompute the ledger totals from the raw claim receipts,
+    returns {(user_profile_id, chain_id, round_start): (claims_count, amount)}
+    """
+    receipts = ClaimReceipt.objects.filter(
+        user_profile__isnull=False,
+        _status__in=ClaimLedger.COUNTED_STATES + ClaimLedger.CLAIMED_STATES,
+    )
+    if since is not None:
+        receipts = receipts.filter(
+            datetime__gte=RoundCreditStrategy.get_start_of_the_round_of(since)
+        )
+
+    expected = {}
+    for r in receipts.values_list(
+        "user_profile_id", "faucet__chain_id", "datetime", "amount", "_status"
+    ).iterator():
+        user_profile_id, chain_id, _datetime, amount, status = r
+        claims_count, claimed_amount = ClaimLedger.get_delta(int(amount), None, status)
+        key = (
+            user_profile_id,
+            chain_id,
+            RoundCreditStrategy.get_start_of_the_round_of(_datetime),
+        )
+        total = expected.get(key, (0, 0))
+        expected[key] = (total[0] + claims_count, total[1] + claimed_amount)
+    return expected
+
+
+def get_ledger_entries(since=None):
+    entries = ClaimLedger.objects.all()
+    if since is not None:
+        entries = entries.filter(
+            round_start__gte=RoundCreditStrategy.get_start_of_the_round_of(since)
+        )
+    return entries
+
+
+def find_ledger_inconsistencies(since=None):
+    """
+    compare the ledger against the raw receipts, returns a list of
+    (key, ledger (claims_count, amount), expected (claims_count, amount))
+    """
+    expected = get_expected_ledger(since)
+    actual = {
+        (e.user_profile_id, e.chain_id, e.round_start): (
+            e.claims_count,
+            int(e.claimed_amount),
+        )
+        for e in get_ledger_entries(since)
+    }
+    inconsistencies = []
+    for key in set(expected) | set(actual):
+        expected_value = expected.get(key, (0, 0))
+        actual_value = actual.get(key, (0, 0))
+        if expected_value != actual_value:
+            inconsistencies.append((key, actual_value, expected_value))
+    return inconsistencies
+
+
+def fix_ledger_inconsistencies(inconsistencies):
+    with transaction.atomic():
+        for (user_profile_id, chain_id, round_start), _, expected in inconsistencies:
+            ClaimLedger.objects.update_or_create(
+                user_profile_id=user_profile_id,
+                chain_id=chain_id,
+                round_start=round_start,
+                defaults={"claims_count": expected[0], "claimed_amount": expected[1]},
+            )
+
+
+def rebuild_ledger(since=None):
+    """
+    replace the ledger rows (all of them, or the rounds after since)
+    with totals recomputed from the receipts
+    """
+    expected = get_expected_ledger(since)
+    with transaction.atomic():
+        get_ledger_entries(since).delete()
+        ClaimLedger.objects.bulk_create(
+            [
+                ClaimLedger(
+                    user_profile_id=user_profile_id,
+                    chain_id=chain_id,
+                    round_start=round_start,
+                    claims_count=claims_count,
+                    claimed_amount=claimed_amount,
+                )
+                for (
+                    user_profile_id,
+                    chain_id,
+                    round_start,
+                ), (claims_count, claimed_amount) in expected.items()
+            ],
+            batch_size=1000,
+        )
+    return len(expected)
@@ -1,9 +1,11 @@
 import abc
 import logging
 from abc import ABC
+from functools import partial
 
 import rest_framework.exceptions
 from django.db import transaction
+from django.db.models import Sum
 from django.utils import timezone
 
 from authentication.models import UserProfile
@@ -15,7 +17,8 @@ from faucet.faucet_manager.credit_strategy import (
 )
 from faucet.faucet_manager.fund_manager import EVMFundManager
 from faucet.faucet_manager.lnpay_client import LNPayClient
-from faucet.models import BrightUser, ClaimReceipt, GlobalSettings
+from faucet.models import ClaimLedger, ClaimReceipt, GlobalSettings
+from faucet.tasks import wake_up_faucet_batcher
 
 
 class ClaimManager(ABC):
@@ -44,7 +47,7 @@ class SimpleClaimManager(ClaimManager):
             self.assert_pre_claim_conditions(amount, user_profile)
             return self.create_pending_claim_receipt(
                 amount, to_address
-            )  # all pending claims will be processed periodically
+            )  # the faucet batcher is woken up once the claim is committed
 
     def assert_pre_claim_conditions(self, amount, user_profile):
         assert amount <= self.credit_strategy.get_unclaimed()
@@ -59,7 +62,7 @@ class SimpleClaimManager(ClaimManager):
         if to_address is None:
             raise rest_framework.exceptions.ParseError("wallet address is required")
 
-        return ClaimReceipt.objects.create(
+        receipt = ClaimReceipt.objects.create(
             faucet=self.credit_strategy.faucet,
             user_profile=self.credit_strategy.user_profile,
             datetime=timezone.now(),
@@ -67,6 +70,8 @@ class SimpleClaimManager(ClaimManager):
             _status=ClaimReceipt.PENDING,
             to_address=to_address,
         )
+        transaction.on_commit(partial(wake_up_faucet_batcher, receipt.faucet_id))
+        return receipt
 
     def get_credit_strategy(self) -> CreditStrategy:
         return self.credit_strategy
@@ -83,16 +88,11 @@ class LimitedChainClaimManager(SimpleClaimManager):
     @staticmethod
     def get_total_round_claims(user_profile):
         start_of_the_round = RoundCreditStrategy.get_start_of_the_round()
-        return ClaimReceipt.objects.filter(
+        aggregate = ClaimLedger.objects.filter(
             user_profile=user_profile,
-            _status__in=[
-                ClaimReceipt.PENDING,
-                ClaimReceipt.VERIFIED,
-                BrightUser.PENDING,
-                BrightUser.VERIFIED,
-            ],
-            datetime__gte=start_of_the_round,
-        ).count()
+            round_start=start_of_the_round,
+        ).aggregate(Sum("claims_count"))
+        return aggregate.get("claims_count__sum") or 0
 
     def assert_pre_claim_conditions(self, amount, user_profile):
         super().assert_pre_claim_conditions(amount, user_profile)
@@ -103,11 +103,7 @@ class LimitedChainClaimManager(SimpleClaimManager):
 class LightningClaimManger(LimitedChainClaimManager):
     def claim(self, amount, to_address):
         try:
-            lnpay_client = LNPayClient(
-                self.credit_strategy.faucet.chain.rpc_url_private,
-                self.credit_strategy.faucet.chain.wallet.main_key,
-                self.credit_strategy.faucet.fund_manager_address,
-            )
+            lnpay_client = LNPayClient.for_faucet(self.credit_strategy.faucet)
             decoded_invoice = lnpay_client.decode_invoice(to_address)
         except Exception as e:
             logging.error(e)
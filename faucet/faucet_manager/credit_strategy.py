@@ -5,10 +5,11 @@ from time import time
 
 import pytz
 from django.db.models import Sum
+from django.db.models.functions import TruncWeek
 from django.utils import timezone
 
 from authentication.models import UserProfile
-from faucet.models import ClaimReceipt, Faucet
+from faucet.models import ClaimLedger, ClaimReceipt, Faucet
 
 
 class CreditStrategy(ABC):
@@ -20,6 +21,10 @@ class CreditStrategy(ABC):
     def get_claim_receipts(self):
         pass
 
+    @abc.abstractmethod
+    def get_ledger_entries(self):
+        pass
+
     @abc.abstractmethod
     def get_claimed(self):
         pass
@@ -41,9 +46,15 @@ class SimpleCreditStrategy(CreditStrategy):
             _status=ClaimReceipt.VERIFIED,
         )
 
+    def get_ledger_entries(self):
+        return ClaimLedger.objects.filter(
+            chain=self.faucet.chain,
+            user_profile=self.user_profile,
+        )
+
     def get_claimed(self):
-        aggregate = self.get_claim_receipts().aggregate(Sum("amount"))
-        _sum = aggregate.get("amount__sum")
+        aggregate = self.get_ledger_entries().aggregate(Sum("claimed_amount"))
+        _sum = aggregate.get("claimed_amount__sum")
         if not _sum:
             return 0
         return _sum
@@ -65,11 +76,27 @@ class RoundCreditStrategy(SimpleCreditStrategy):
             datetime__gte=self.get_start_of_the_round(),
         )
 
+    def get_ledger_entries(self):
+        return ClaimLedger.objects.filter(
+            chain=self.faucet.chain,
+            user_profile=self.user_profile,
+            round_start=self.get_start_of_the_round(),
+        )
+
     @staticmethod
     def get_start_of_the_round():
         return RoundCreditStrategy._get_first_day_of_the_week()
         return RoundCreditStrategy._get_first_day_of_the_month()
 
+    @staticmethod
+    def get_start_of_the_round_of(dt):
+        return RoundCreditStrategy._get_first_day_of_the_week(int(dt.timestamp()))
+
+    @staticmethod
+    def get_start_of_the_round_expression(field):
+        # get_start_of_the_round_of, computed by the database
+        return TruncWeek(field)
+
     @staticmethod
     def get_start_of_previous_round():
         return RoundCreditStrategy._get_first_day_of_last_week()
@@ -92,8 +119,9 @@ class RoundCreditStrategy(SimpleCreditStrategy):
         return first_day_of_last_month
 
     @classmethod
-    def _get_first_day_of_the_week(cls):
-        now = int(time())
+    def _get_first_day_of_the_week(cls, now=None):
+        if now is None:
+            now = int(time())
         day = 86400  # seconds in a day
         week = 7 * day
         weeks = now // week  # number of weeks since epoch
@@ -127,6 +155,11 @@ class RoundCreditStrategy(SimpleCreditStrategy):
 
 
 class OneTimeCreditStrategy(SimpleCreditStrategy):
+    # Monday 18 December 2023
+    START_DATETIME = datetime.datetime(
+        2023, 12, 18, 0, 0, 0, 0, pytz.timezone("UTC")
+    )  # also change in views.py
+
     def __int__(self, faucet: Faucet, user_profile: UserProfile):
         self.faucet = faucet
         self.user_profile = user_profile
@@ -136,10 +169,15 @@ class OneTimeCreditStrategy(SimpleCreditStrategy):
             faucet__chain=self.faucet.chain,
             user_profile=self.user_profile,
             _status=ClaimReceipt.VERIFIED,
-            # Monday 18 December 2023
-            datetime__gte=datetime.datetime(
-                2023, 12, 18, 0, 0, 0, 0, pytz.timezone("UTC")
-            ),  # also change in views.py
+            datetime__gte=self.START_DATETIME,
+        )
+
+    def get_ledger_entries(self):
+        # the start date is a round start, so whole ledger rounds line up with it
+        return ClaimLedger.objects.filter(
+            chain=self.faucet.chain,
+            user_profile=self.user_profile,
+            round_start__gte=self.START_DATETIME,
         )
 
 
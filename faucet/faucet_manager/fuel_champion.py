@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db.models import Sum
+
+from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+from faucet.models import ClaimReceipt, DonationReceipt
+
+# the key is scoped to the round, so a new round starts with a miss
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def get_cache_key(round_start):
+    return f"gastap_fuel_champions_{int(round_start.timestamp())}"
+
+
+def compute_fuel_champions(round_start):
+    """
+    the biggest donor of each faucet in the round, from one grouped query
+    """
+    totals = (
+        DonationReceipt.objects.filter(
+            status=ClaimReceipt.VERIFIED, datetime__gt=round_start
+        )
+        .values("faucet", "user_profile", "user_profile__username")
+        .annotate(total_value=Sum("value_amount"))
+        .order_by("faucet", "-total_value", "user_profile")
+    )
+    champions = {}
+    for total in totals:
+        champions.setdefault(
+            total["faucet"],
+            {
+                "faucet_pk": total["faucet"],
+                "username": total["user_profile__username"],
+            },
+        )
+    return list(champions.values())
+
+
+def refresh_fuel_champions():
+    round_start = RoundCreditStrategy.get_start_of_the_round()
+    champions = compute_fuel_champions(round_start)
+    cache.set(get_cache_key(round_start), champions, CACHE_TIMEOUT)
+    return champions
+
+
+def get_fuel_champions():
+    champions = cache.get(get_cache_key(RoundCreditStrategy.get_start_of_the_round()))
+    if champions is None:
+        champions = refresh_fuel_champions()
+    return champions
+
+
+def update_fuel_champions(donation_receipt):
+    """
+    call it when a donation is verified, only donations of the current round
+    can change the champions
+    """
+    if donation_receipt.datetime > RoundCreditStrategy.get_start_of_the_round():
+        refresh_fuel_champions()
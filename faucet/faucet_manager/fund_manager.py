@@ -1,9 +1,8 @@
+import functools
 import logging
-import os
 import time
 
-from django.core.cache import cache
-from eth_account.signers.local import LocalAccount
+import web3.exceptions
 from solana.rpc.api import Client
 from solana.rpc.core import RPCException, RPCNoResultException
 from solana.transaction import Transaction
@@ -13,15 +12,14 @@ from solders.signature import Signature
 from solders.transaction_status import TransactionConfirmationStatus
 
 from authentication.models import NetworkTypes
-from core.utils import Web3Utils
-from faucet.constants import MEMCACHE_LIGHTNING_LOCK_KEY
+from core.utils import GasPriceOracle, SolanaClientPool, Web3BatchClient, Web3Utils
 from faucet.faucet_manager.fund_manager_abi import manager_abi
-from faucet.helpers import memcache_lock
-from faucet.models import BrightUser, Faucet, LightningConfig
+from faucet.models import BrightUser, Faucet, LightningConfig, TransactionBatch
 
 from .anchor_client import instructions
 from .anchor_client.accounts.lock_account import LockAccount
 from .lnpay_client import LNPayClient
+from .nonce_manager import NonceManager
 from .solana_client import SolanaClient
 
 
@@ -59,7 +57,11 @@ class EVMFundManager:
         )
 
     def get_gas_price(self):
-        return self.web3_utils.get_gas_price()
+        return GasPriceOracle.get(self.chain)
+
+    @property
+    def nonce_manager(self):
+        return NonceManager(self.chain, self.web3_utils)
 
     @property
     def is_gas_price_too_high(self):
@@ -82,18 +84,18 @@ class EVMFundManager:
     def transfer(self, bright_user: BrightUser, amount: int):
         return self._transfer("withdrawEth", amount, bright_user.address)
 
-    def multi_transfer(self, data):
-        return self._transfer("multiWithdrawEth", data)
+    def multi_transfer(self, data, batch: TransactionBatch = None):
+        return self._transfer("multiWithdrawEth", data, batch=batch)
 
-    def _transfer(self, tx_function_str, *args):
-        tx = self.prepare_tx_for_broadcast(tx_function_str, *args)
+    def _transfer(self, tx_function_str, *args, batch=None):
+        tx = self.prepare_tx_for_broadcast(tx_function_str, *args, batch=batch)
         try:
             self.web3_utils.send_raw_tx(tx)
             return tx["hash"].hex()
         except Exception as e:
             raise FundMangerException.RPCError(str(e))
 
-    def prepare_tx_for_broadcast(self, tx_function_str, *args):
+    def prepare_tx_for_broadcast(self, tx_function_str, *args, batch=None):
         tx_function = self.web3_utils.get_contract_function(tx_function_str)(*args)
         gas_estimation = self.web3_utils.get_gas_estimate(tx_function)
         if self.chain.chain_id == "997":
@@ -104,20 +106,48 @@ class EVMFundManager:
 
         tx_params = {
             "gas": gas_estimation,
-            "gasPrice": int(
-                self.web3_utils.get_gas_price() * self.chain.gas_multiplier
-            ),
+            "gasPrice": int(self.get_gas_price() * self.chain.gas_multiplier),
         }
+        if batch is not None:
+            tx_params["nonce"] = self.nonce_manager.get_batch_nonce(batch)
+            # measured gas is what the next batches are sized with
+            batch.gas_estimate = gas_estimation
 
         signed_tx = self.web3_utils.build_contract_txn(tx_function, **tx_params)
         return signed_tx
 
+    def get_tx_receipt(self, tx_hash):
+        """
+        the receipt of the tx, None if it is not mined yet
+        """
+        try:
+            return self.web3_utils.get_transaction_receipt(tx_hash)
+        except web3.exceptions.TransactionNotFound:
+            return None
+
     def is_tx_verified(self, tx_hash):
-        receipt = self.web3_utils.wait_for_transaction_receipt(tx_hash)
-        if receipt["status"] == 1:
+        # a tx that is not mined yet is not verified, it is checked again later
+        receipt = self.get_tx_receipt(tx_hash)
+        if receipt is not None and receipt["status"] == 1:
             return True
         return False
 
+    def get_verified_tx_hashes(self, tx_hashes):
+        """
+        check the receipts of many txs in batched rpc calls,
+        returns the set of succeeded ones
+        """
+        receipts = Web3BatchClient(self.web3_utils).get_transaction_receipts(
+            list(tx_hashes)
+        )
+        return {
+            tx_hash
+            for tx_hash, receipt in receipts.items()
+            if receipt is not None
+            and not isinstance(receipt, Exception)
+            and receipt["status"] == 1
+        }
+
     def get_tx(self, tx_hash):
         tx = self.web3_utils.get_transaction_by_hash(tx_hash)
         return tx
@@ -126,7 +156,18 @@ class EVMFundManager:
         return self.web3_utils.from_wei(value, unit)
 
 
+@functools.lru_cache(maxsize=None)
+def find_lock_account_address(program_id: Pubkey, seed: bytes) -> Pubkey:
+    lock_account_address, nonce = Pubkey.find_program_address([seed], program_id)
+    return lock_account_address
+
+
 class SolanaFundManager:
+    LOCK_ACCOUNT_TTL = 30  # seconds
+
+    # decoded lock accounts shared by the process, {address: (account, fetched at)}
+    _lock_accounts = {}
+
     def __init__(self, faucet: Faucet):
         self.faucet = faucet
         self.chain = faucet.chain
@@ -136,9 +177,7 @@ class SolanaFundManager:
     def w3(self) -> Client:
         assert self.chain.rpc_url_private is not None
         try:
-            _w3 = Client(self.chain.rpc_url_private)
-            if _w3.is_connected():
-                return _w3
+            return SolanaClientPool.get(self.chain.rpc_url_private)
         except Exception as e:
             logging.error(e)
             raise FundMangerException.RPCError(
@@ -159,17 +198,23 @@ class SolanaFundManager:
 
     @property
     def lock_account_address(self) -> Pubkey:
-        lock_account_address, nonce = Pubkey.find_program_address(
-            [self.lock_account_seed], self.program_id
-        )
-        return lock_account_address
+        return find_lock_account_address(self.program_id, self.lock_account_seed)
 
     @property
-    def lock_account(self) -> LocalAccount:
+    def lock_account(self) -> LockAccount:
+        key = str(self.lock_account_address)
+        account, fetched_at = self._lock_accounts.get(key, (None, None))
+        if fetched_at is not None and (
+            time.monotonic() - fetched_at < self.LOCK_ACCOUNT_TTL
+        ):
+            return account
+
+        account = None
         lock_account_info = self.w3.get_account_info(self.lock_account_address)
         if lock_account_info.value:
-            return LockAccount.decode(lock_account_info.value.data)
-        return None
+            account = LockAccount.decode(lock_account_info.value.data)
+        self._lock_accounts[key] = (account, time.monotonic())
+        return account
 
     @property
     def is_initialized(self):
@@ -232,29 +277,41 @@ class SolanaFundManager:
         else:
             raise Exception("The program is not initialized yet")
 
+    MAX_SIGNATURES = 256  # per get_signature_statuses call
+
+    def get_verified_tx_hashes(self, tx_hashes):
+        """
+        check the signatures in as few rpc calls as possible,
+        returns the set of confirmed ones
+        """
+        tx_hashes = list(tx_hashes)
+        verified = set()
+        for i in range(0, len(tx_hashes), self.MAX_SIGNATURES):
+            chunk = tx_hashes[i : i + self.MAX_SIGNATURES]
+            try:
+                statuses = self.w3.get_signature_statuses(
+                    [Signature.from_string(tx_hash) for tx_hash in chunk]
+                ).value
+            except RPCException:
+                logging.warning(
+                    "Solana raised the RPCException at get_signature_statuses()"
+                )
+                continue
+            except RPCNoResultException:
+                logging.warning(
+                    "Solana raised the RPCNoResultException at get_signature_statuses()"
+                )
+                continue
+            for tx_hash, status in zip(chunk, statuses):
+                if status is not None and status.confirmation_status in [
+                    TransactionConfirmationStatus.Confirmed,
+                    TransactionConfirmationStatus.Finalized,
+                ]:
+                    verified.add(tx_hash)
+        return verified
+
     def is_tx_verified(self, tx_hash):
-        try:
-            confirmation_status = (
-                self.w3.get_signature_statuses([Signature.from_string(tx_hash)])
-                .value[0]
-                .confirmation_status
-            )
-            return confirmation_status in [
-                TransactionConfirmationStatus.Confirmed,
-                TransactionConfirmationStatus.Finalized,
-            ]
-        except RPCException:
-            logging.warning(
-                "Solana raised the RPCException at get_signature_statuses()"
-            )
-            return False
-        except RPCNoResultException:
-            logging.warning(
-                "Solana raised the RPCNoResultException at get_signature_statuses()"
-            )
-            return False
-        except Exception:
-            raise
+        return tx_hash in self.get_verified_tx_hashes([tx_hash])
 
 
 class LightningFundManager:
@@ -274,51 +331,26 @@ class LightningFundManager:
 
     @property
     def lnpay_client(self):
-        return LNPayClient(
-            self.chain.rpc_url_private, self.api_key, self.faucet.fund_manager_address
-        )
-
-    def __check_max_cap_exceeds(self, amount) -> bool:
-        try:
-            config = self.config
-            active_round = int(int(time.time()) / config.period) * config.period
-            if active_round != config.current_round:
-                config.claimed_amount = 0
-                config.current_round = active_round
-                config.save()
-
-            return config.claimed_amount + amount > config.period_max_cap
-        except Exception as ex:
-            logging.error(ex)
-            return True
+        return LNPayClient.for_faucet(self.faucet)
 
     def multi_transfer(self, data):
+        """
+        pays one invoice, several can be paid at once. the amount is reserved
+        from the period cap before paying and given back if the payment fails
+        """
         client = self.lnpay_client
-        with memcache_lock(MEMCACHE_LIGHTNING_LOCK_KEY, os.getpid()) as acquired:
-            assert acquired, "Could not acquire Lightning multi-transfer lock"
-
-            item = data[0]
-            assert not self.__check_max_cap_exceeds(
-                item["amount"]
-            ), "Lightning periodic max cap exceeded"
-            try:
-                pay_result = client.pay_invoice(item["to"])
-
-                if pay_result:
-                    result = pay_result["lnTx"]["id"]
-
-                    config = self.config
-                    config.claimed_amount += item["amount"]
-                    config.save()
-
-                    cache.delete(MEMCACHE_LIGHTNING_LOCK_KEY)
-
-                    return result
-                else:
-                    raise Exception("Lightning: Could not pay the invoice")
-            except Exception as exc:
-                cache.delete(MEMCACHE_LIGHTNING_LOCK_KEY)
-                raise exc
+        item = data[0]
+        config = self.config
+        reserved_round = config.reserve(item["amount"])
+        assert reserved_round is not None, "Lightning periodic max cap exceeded"
+        try:
+            pay_result = client.pay_invoice(item["to"])
+            if not pay_result:
+                raise Exception("Lightning: Could not pay the invoice")
+        except Exception as exc:
+            config.release(item["amount"], reserved_round)
+            raise exc
+        return pay_result["lnTx"]["id"]
 
     def is_tx_verified(self, tx_hash):
         invoice_status = self.lnpay_client.get_invoice_status(tx_hash)
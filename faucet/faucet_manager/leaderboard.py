@@ -0,0 +1,130 @@
+from django.db import transaction
+from django.db.models import F, Sum
+
+from authentication.models import UserProfile
+from faucet.models import ClaimReceipt, DonationReceipt, LeaderboardEntry
+
+
+def get_verified_donations():
+    return DonationReceipt.objects.filter(status=ClaimReceipt.VERIFIED)
+
+
+def get_interacted_chains(user_profile_id):
+    return sorted(
+        set(
+            get_verified_donations()
+            .filter(user_profile_id=user_profile_id)
+            .values_list("faucet__chain", flat=True)
+        )
+    )
+
+
+def update_entry(faucet_id, user_profile, total):
+    """
+    move the user to its new total on a board, shifting the ranks of the
+    users it passed instead of ranking the whole board again. call it in a
+    transaction
+    """
+    board = LeaderboardEntry.objects.filter(faucet_id=faucet_id)
+    # the whole board is locked, in pk order, so concurrent donors shift the
+    # ranks one after the other
+    list(board.select_for_update().order_by("pk").values_list("pk", flat=True))
+    others = board.exclude(user_profile=user_profile)
+    entry = board.filter(user_profile=user_profile).first()
+    if entry is None:
+        others.filter(sum_total_price__lt=total).update(rank=F("rank") + 1)
+        entry = LeaderboardEntry(faucet_id=faucet_id, user_profile=user_profile)
+    elif total > entry.sum_total_price:
+        others.filter(
+            sum_total_price__gte=entry.sum_total_price, sum_total_price__lt=total
+        ).update(rank=F("rank") + 1)
+    elif total < entry.sum_total_price:
+        others.filter(
+            sum_total_price__gte=total, sum_total_price__lt=entry.sum_total_price
+        ).update(rank=F("rank") - 1)
+    entry.sum_total_price = total
+    entry.rank = others.filter(sum_total_price__gt=total).count() + 1
+    entry.save()
+
+
+def record_donation(donation_receipt):
+    """
+    refresh the entries of the donor on the global board and the board of the
+    faucet, call it when a donation is verified
+    """
+    user_profile = donation_receipt.user_profile
+    donations = get_verified_donations().filter(user_profile=user_profile)
+    with transaction.atomic():
+        update_entry(
+            None,
+            user_profile,
+            donations.aggregate(total=Sum("total_price_amount"))["total"] or 0,
+        )
+        update_entry(
+            donation_receipt.faucet_id,
+            user_profile,
+            donations.filter(faucet_id=donation_receipt.faucet_id).aggregate(
+                total=Sum("total_price_amount")
+            )["total"]
+            or 0,
+        )
+        LeaderboardEntry.objects.filter(user_profile=user_profile).update(
+            username=user_profile.username,
+            interacted_chains=get_interacted_chains(user_profile.pk),
+        )
+
+
+def rank_board(entries):
+    # users with the same total share a rank, like 1, 2, 2, 4
+    entries.sort(key=lambda e: e.sum_total_price, reverse=True)
+    for i, entry in enumerate(entries):
+        if i > 0 and entry.sum_total_price == entries[i - 1].sum_total_price:
+            entry.rank = entries[i - 1].rank
+        else:
+            entry.rank = i + 1
+    return entries
+
+
+def rebuild_leaderboard():
+    """
+    rebuild every board from the verified donations, corrects whatever the
+    incremental updates missed (e.g. a renamed user)
+    """
+    donations = get_verified_donations().order_by()
+    global_totals = donations.values_list("user_profile").annotate(
+        total=Sum("total_price_amount")
+    )
+    faucet_totals = donations.values_list("user_profile", "faucet").annotate(
+        total=Sum("total_price_amount")
+    )
+    chains = {}
+    for user_profile_id, chain_id in donations.values_list(
+        "user_profile", "faucet__chain"
+    ).distinct():
+        chains.setdefault(user_profile_id, set()).add(chain_id)
+    usernames = dict(
+        UserProfile.objects.filter(pk__in=chains).values_list("pk", "username")
+    )
+
+    def create_entry(user_profile_id, faucet_id, total):
+        return LeaderboardEntry(
+            user_profile_id=user_profile_id,
+            faucet_id=faucet_id,
+            username=usernames.get(user_profile_id),
+            sum_total_price=total or 0,
+            interacted_chains=sorted(chains.get(user_profile_id, [])),
+        )
+
+    boards = {None: []}
+    for user_profile_id, total in global_totals:
+        boards[None].append(create_entry(user_profile_id, None, total))
+    for user_profile_id, faucet_id, total in faucet_totals:
+        boards.setdefault(faucet_id, []).append(
+            create_entry(user_profile_id, faucet_id, total)
+        )
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        for entries in boards.values():
+            LeaderboardEntry.objects.bulk_create(rank_board(entries), batch_size=1000)
+    return sum(len(entries) for entries in boards.values())
@@ -1,40 +1,113 @@
-import logging
 import json
-from .lnpay_manager.lnpay_main import initialize
-from .lnpay_manager.wallet import LNPayWallet
-from .lnpay_manager.lntx import LNPayLnTx
-from .lnpay_manager.utility_helpers import get_request
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SDK_VERSION = "py0.1.1"
 
 
 class LNPayClient:
+    """
+    lnpay api client, the credentials live on the instance instead of module
+    globals and all clients share one pooled session, so it can be used from
+    threads (and async code through asyncio.to_thread)
+    """
+
+    TIMEOUT = (5, 30)  # connect, read seconds
+    POOL_SIZE = 10
+    # idempotent requests are retried on errors, a payment (post) only when
+    # it could not connect, so an invoice is never paid twice
+    RETRIES = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+
+    _lock = threading.Lock()
+    _sessions = {}  # api url -> session
+
     def __init__(self, api_url: str, api_key: str, wallet: str) -> None:
+        self.api_url = api_url
         self.api_key = api_key
         self.wallet_address = wallet
 
-        initialize(api_key, params={"endpoint_url": api_url})
+    @classmethod
+    def for_faucet(cls, faucet):
+        chain = faucet.chain
+        return cls(
+            chain.rpc_url_private, chain.wallet.main_key, faucet.fund_manager_address
+        )
+
+    @classmethod
+    def get_session(cls, api_url) -> requests.Session:
+        with cls._lock:
+            if api_url not in cls._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=cls.POOL_SIZE,
+                    max_retries=cls.RETRIES,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls._sessions[api_url] = session
+            return cls._sessions[api_url]
+
+    @classmethod
+    def clear(cls):
+        # a forked worker must not share the sockets of its parent
+        cls._lock = threading.Lock()
+        cls._sessions = {}
 
     @property
-    def wallet(self):
-        return LNPayWallet(self.wallet_address)
+    def headers(self):
+        return {
+            "Content-Type": "application/json",
+            "X-Api-Key": self.api_key,
+            "X-LNPay-sdk": SDK_VERSION,
+        }
+
+    def get_request(self, location) -> json:
+        r = self.get_session(self.api_url).get(
+            url=self.api_url + location, headers=self.headers, timeout=self.TIMEOUT
+        )
+        return r.json()
+
+    def post_request(self, location, params) -> json:
+        r = self.get_session(self.api_url).post(
+            url=self.api_url + location,
+            data=json.dumps(params),
+            headers=self.headers,
+            timeout=self.TIMEOUT,
+        )
+        return r.json()
 
     def pay_invoice(self, invoice: str) -> json:
         invoice_params = {"payment_request": invoice}
-        pay_result = self.wallet.pay_invoice(invoice_params)
+        pay_result = self.post_request(
+            f"wallet/{self.wallet_address}/withdraw", invoice_params
+        )
         if "lnTx" not in pay_result:
             logging.error(pay_result["message"])
             return False
         return pay_result
 
     def decode_invoice(self, invoice: str) -> json:
-        return get_request(
+        return self.get_request(
             f"node/default/payments/decodeinvoice?payment_request={invoice}"
         )
 
     def get_balance(self):
-        info = self.wallet.get_info()
+        info = self.get_request(f"wallet/{self.wallet_address}")
         return info["balance"]
 
     def get_invoice_status(self, lntx_id):
-        ln_tx = LNPayLnTx(lntx_id)
-        invoice_result = ln_tx.get_info()
-        return invoice_result
+        return self.get_request(f"lntx/{lntx_id}")
+
+
+os.register_at_fork(after_in_child=LNPayClient.clear)
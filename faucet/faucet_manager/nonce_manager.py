@@ -0,0 +1,98 @@
+import logging
+
+from django.db import transaction
+
+from faucet.models import ClaimReceipt, TransactionBatch, WalletNonce
+
+
+class NonceManager:
+    """
+    hands out the nonces of a faucet wallet from a db row instead of asking
+    the rpc for every transaction, so several batches of a chain can be in
+    flight at once
+    """
+
+    def __init__(self, chain, web3_utils):
+        self.chain = chain
+        self.web3_utils = web3_utils
+
+    @property
+    def address(self):
+        return self.web3_utils.account.address
+
+    def get_chain_nonce(self):
+        # mined transactions plus the ones waiting in the node's mempool
+        return self.web3_utils.get_transaction_count(self.address, "pending")
+
+    def get_held_nonces(self, since):
+        # nonces of batches that are still in flight
+        return set(
+            TransactionBatch.objects.filter(
+                faucet__chain=self.chain,
+                _status=ClaimReceipt.PENDING,
+                nonce__gte=since,
+            ).values_list("nonce", flat=True)
+        )
+
+    def lock_state(self) -> WalletNonce:
+        state = (
+            WalletNonce.objects.select_for_update()
+            .filter(chain=self.chain, address=self.address)
+            .first()
+        )
+        if state is not None:
+            return state
+        # first use of the wallet, or the row was lost: start from chain state
+        state, _ = WalletNonce.objects.get_or_create(
+            chain=self.chain,
+            address=self.address,
+            defaults={"next_nonce": self.get_chain_nonce()},
+        )
+        return WalletNonce.objects.select_for_update().get(pk=state.pk)
+
+    def allocate(self):
+        with transaction.atomic():
+            state = self.lock_state()
+            held = self.get_held_nonces(state.next_nonce)
+            nonce = state.next_nonce
+            while nonce in held:
+                nonce += 1
+            state.next_nonce = nonce + 1
+            state.save(update_fields=["next_nonce", "updated_at"])
+            return nonce
+
+    def get_batch_nonce(self, batch: TransactionBatch):
+        """
+        the nonce of the batch, allocated once so a retried batch
+        replaces its own transaction instead of paying twice
+        """
+        with transaction.atomic():
+            locked_batch = TransactionBatch.objects.select_for_update().get(pk=batch.pk)
+            if locked_batch.nonce is None:
+                locked_batch.nonce = self.allocate()
+                locked_batch.save(update_fields=["nonce"])
+        # the caller saves its own instance later, keep it in sync
+        batch.nonce = locked_batch.nonce
+        return batch.nonce
+
+    def reconcile(self):
+        """
+        find the nonces that were handed out but neither reached the chain nor
+        belong to an in-flight batch (e.g. the batch was rejected), and rewind
+        so the next batch fills the first gap, returns the gaps
+        """
+        chain_nonce = self.get_chain_nonce()
+        with transaction.atomic():
+            state = self.lock_state()
+            held = self.get_held_nonces(chain_nonce)
+            gaps = [n for n in range(chain_nonce, state.next_nonce) if n not in held]
+            if gaps:
+                logging.warning(
+                    f"Nonce gaps {gaps} on chain {self.chain.chain_id} "
+                    f"for {self.address}, rewinding"
+                )
+                state.next_nonce = gaps[0]
+            else:
+                state.next_nonce = max(state.next_nonce, chain_nonce)
+            state.save(update_fields=["next_nonce", "updated_at"])
+        return gaps
@@ -14,3 +14,15 @@ class FaucetFilterBackend(filters.BaseFilterBackend):
         if faucet_pk is None:
             return queryset
         return queryset.filter(faucet=get_object_or_404(Faucet, pk=faucet_pk))
+
+
+class LeaderboardFilterBackend(filters.BaseFilterBackend):
+    """
+    Filter the leaderboard entries of a faucet, or the global ones
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        faucet_pk = request.query_params.get("faucet_pk")
+        if faucet_pk is None:
+            return queryset.filter(faucet__isnull=True)
+        return queryset.filter(faucet=get_object_or_404(Faucet, pk=faucet_pk))
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from faucet.faucet_manager.claim_ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the claim ledger from the claim receipts. "
+        "Run it while claims are not being processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=lambda d: timezone.make_aware(datetime.strptime(d, "%Y-%m-%d")),
+            default=None,
+            help="only rebuild the rounds from this date (YYYY-MM-DD)",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_ledger(options["since"])
+        self.stdout.write(self.style.SUCCESS(f"{count} ledger rows rebuilt"))
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from faucet.faucet_manager.claim_ledger import (
+    find_ledger_inconsistencies,
+    fix_ledger_inconsistencies,
+)
+
+
+class Command(BaseCommand):
+    help = "Check the claim ledger against the claim receipts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=lambda d: timezone.make_aware(datetime.strptime(d, "%Y-%m-%d")),
+            default=None,
+            help="only check the rounds from this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="overwrite the inconsistent rows with the recomputed totals",
+        )
+
+    def handle(self, *args, **options):
+        inconsistencies = find_ledger_inconsistencies(options["since"])
+        for (user_profile_id, chain_id, round_start), actual, expected in sorted(
+            inconsistencies, key=lambda i: i[0][2]
+        ):
+            self.stdout.write(
+                f"user_profile={user_profile_id} chain={chain_id} "
+                f"round={round_start.isoformat()} "
+                f"ledger(count={actual[0]}, amount={actual[1]}) "
+                f"receipts(count={expected[0]}, amount={expected[1]})"
+            )
+        if not inconsistencies:
+            self.stdout.write(self.style.SUCCESS("Claim ledger is consistent"))
+            return
+        if options["fix"]:
+            fix_ledger_inconsistencies(inconsistencies)
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(inconsistencies)} ledger rows fixed")
+            )
+            return
+        raise CommandError(f"{len(inconsistencies)} inconsistent ledger rows")
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from faucet.faucet_manager.claim_counters import reconcile_claim_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Correct the claim counters against the claim receipts, "
+        "run it without --since once to fill the counters of the old rounds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=lambda d: timezone.make_aware(datetime.strptime(d, "%Y-%m-%d")),
+            default=None,
+            help="only reconcile the rounds from this date (YYYY-MM-DD)",
+        )
+
+    def handle(self, *args, **options):
+        drifts = reconcile_claim_counters(options["since"])
+        for faucet_id, round_start, drift in sorted(drifts, key=lambda d: d[1]):
+            self.stdout.write(
+                f"faucet={faucet_id} round={round_start.isoformat()} drift={drift}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(drifts)} counters corrected"))
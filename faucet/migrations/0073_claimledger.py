@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:40
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0030_auto_20240125_1045'),
+        ('core', '0005_auto_20231203_0832'),
+        ('faucet', '0072_remove_globalsettings_gastap_round_claim_limit_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaimLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round_start', models.DateTimeField()),
+                ('claims_count', models.IntegerField(default=0)),
+                ('claimed_amount', core.models.BigNumField(default=0, max_length=200)),
+                ('chain', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='claim_ledgers', to='core.chain')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='claim_ledgers', to='authentication.userprofile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='claimledger',
+            constraint=models.UniqueConstraint(fields=('user_profile', 'round_start', 'chain'), name='unique_claim_ledger_round'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:45
+
+from django.db import migrations
+
+# states are copied here so later model changes don't alter this migration
+COUNTED_STATES = ["Pending", "Verified", "0", "1"]
+CLAIMED_STATES = ["Verified"]
+
+
+def fill_claim_ledger(apps, schema_editor):
+    from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+    ClaimReceipt = apps.get_model("faucet", "ClaimReceipt")
+    ClaimLedger = apps.get_model("faucet", "ClaimLedger")
+
+    totals = {}
+    for user_profile_id, chain_id, _datetime, amount, status in (
+        ClaimReceipt.objects.filter(
+            user_profile__isnull=False, _status__in=COUNTED_STATES
+        )
+        .values_list(
+            "user_profile_id", "faucet__chain_id", "datetime", "amount", "_status"
+        )
+        .iterator()
+    ):
+        key = (
+            user_profile_id,
+            chain_id,
+            RoundCreditStrategy.get_start_of_the_round_of(_datetime),
+        )
+        claims_count, claimed_amount = totals.get(key, (0, 0))
+        if status in CLAIMED_STATES:
+            claimed_amount += int(amount)
+        totals[key] = (claims_count + 1, claimed_amount)
+
+    ClaimLedger.objects.bulk_create(
+        [
+            ClaimLedger(
+                user_profile_id=user_profile_id,
+                chain_id=chain_id,
+                round_start=round_start,
+                claims_count=claims_count,
+                claimed_amount=claimed_amount,
+            )
+            for (user_profile_id, chain_id, round_start), (
+                claims_count,
+                claimed_amount,
+            ) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0073_claimledger"),
+    ]
+
+    operations = [migrations.RunPython(fill_claim_ledger, migrations.RunPython.noop)]
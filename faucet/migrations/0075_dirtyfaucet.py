@@ -0,0 +1,37 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0074_fill_claim_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DirtyFaucet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("marked_at", models.DateTimeField()),
+                (
+                    "faucet",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dirty_mark",
+                        to="faucet.faucet",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_auto_20231203_0832"),
+        ("faucet", "0075_dirtyfaucet"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faucet",
+            name="max_inflight_batches",
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="nonce",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="WalletNonce",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("next_nonce", models.BigIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wallet_nonces",
+                        to="core.chain",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="walletnonce",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "address"), name="unique_wallet_nonce"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0076_batch_pipelining"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="checks_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="next_check_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.4 on 2026-10-16 20:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0077_batch_confirmation_tracking"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FaucetBalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "contract_balance",
+                    core.models.BigNumField(default=0, max_length=200),
+                ),
+                ("wallet_balance", core.models.BigNumField(default=0, max_length=200)),
+                ("has_enough_funds", models.BooleanField(default=False)),
+                ("has_enough_fees", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "faucet",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshot",
+                        to="faucet.faucet",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0078_faucetbalancesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="fill_ratio",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="gas_estimate",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="size_target",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
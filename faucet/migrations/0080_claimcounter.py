@@ -0,0 +1,46 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0079_batch_sizing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClaimCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round_start", models.DateTimeField()),
+                ("shard", models.PositiveSmallIntegerField(default=0)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "faucet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="claim_counter_shards",
+                        to="faucet.faucet",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="claimcounter",
+            constraint=models.UniqueConstraint(
+                fields=("faucet", "round_start", "shard"),
+                name="unique_claim_counter_shard",
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0030_auto_20240125_1045"),
+        ("faucet", "0080_claimcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "username",
+                    models.CharField(blank=True, max_length=150, null=True),
+                ),
+                ("sum_total_price", models.FloatField(default=0)),
+                ("rank", models.PositiveIntegerField(default=1)),
+                ("interacted_chains", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "faucet",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="faucet.faucet",
+                    ),
+                ),
+                (
+                    "user_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="authentication.userprofile",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardentry",
+            index=models.Index(
+                fields=["faucet", "rank", "id"], name="leaderboard_rank_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardentry",
+            index=models.Index(
+                fields=["faucet", "sum_total_price"],
+                name="leaderboard_total_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboardentry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("faucet__isnull", False)),
+                fields=("user_profile", "faucet"),
+                name="unique_faucet_leaderboard_entry",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboardentry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("faucet__isnull", True)),
+                fields=("user_profile",),
+                name="unique_global_leaderboard_entry",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("faucet", "0081_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="donationreceipt",
+            name="value_amount",
+            field=models.DecimalField(
+                blank=True, decimal_places=18, max_digits=48, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="donationreceipt",
+            name="total_price_amount",
+            field=models.DecimalField(
+                blank=True, decimal_places=18, max_digits=48, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="leaderboardentry",
+            name="sum_total_price",
+            field=models.DecimalField(decimal_places=18, default=0, max_digits=48),
+        ),
+    ]
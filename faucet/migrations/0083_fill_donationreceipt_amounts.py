@@ -0,0 +1,49 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:50
+
+import decimal
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def to_amount(text):
+    try:
+        amount = decimal.Decimal(text)
+    except (TypeError, decimal.InvalidOperation):
+        return None
+    return amount if amount.is_finite() else None
+
+
+def fill_amounts(apps, schema_editor):
+    # copies the amounts in short transactions so the table is never locked
+    # for the whole backfill
+    DonationReceipt = apps.get_model("faucet", "DonationReceipt")
+
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            receipts = list(
+                DonationReceipt.objects.select_for_update()
+                .filter(pk__gt=last_pk)
+                .order_by("pk")[:BATCH_SIZE]
+            )
+            if not receipts:
+                return
+            for receipt in receipts:
+                receipt.value_amount = to_amount(receipt.value)
+                receipt.total_price_amount = to_amount(receipt.total_price)
+            DonationReceipt.objects.bulk_update(
+                receipts, ["value_amount", "total_price_amount"]
+            )
+        last_pk = receipts[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("faucet", "0082_donationreceipt_numeric_amounts"),
+    ]
+
+    operations = [migrations.RunPython(fill_amounts, migrations.RunPython.noop)]
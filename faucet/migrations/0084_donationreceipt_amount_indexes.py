@@ -0,0 +1,85 @@
+# Generated by Django 4.0.4 on 2026-10-16 21:50
+
+import decimal
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def to_amount(text):
+    try:
+        amount = decimal.Decimal(text)
+    except (TypeError, decimal.InvalidOperation):
+        return None
+    return amount if amount.is_finite() else None
+
+
+def catch_up_amounts(apps, schema_editor):
+    # donations verified by the old code while 0083 was running
+    DonationReceipt = apps.get_model("faucet", "DonationReceipt")
+
+    receipts = list(
+        DonationReceipt.objects.filter(
+            value_amount__isnull=True, total_price_amount__isnull=True
+        ).filter(Q(value__isnull=False) | Q(total_price__isnull=False))
+    )
+    for receipt in receipts:
+        receipt.value_amount = to_amount(receipt.value)
+        receipt.total_price_amount = to_amount(receipt.total_price)
+    DonationReceipt.objects.bulk_update(
+        receipts, ["value_amount", "total_price_amount"], batch_size=1000
+    )
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    builds the index without locking the table on postgres, and as a plain
+    index on the other backends (e.g. sqlite in the tests)
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+
+class Migration(migrations.Migration):
+    # value and total_price are kept until the code reading them is gone,
+    # dropping them is left to a later migration
+    atomic = False
+
+    dependencies = [
+        ("faucet", "0083_fill_donationreceipt_amounts"),
+    ]
+
+    operations = [
+        migrations.RunPython(catch_up_amounts, migrations.RunPython.noop),
+        AddIndexConcurrentlyOnPostgres(
+            model_name="donationreceipt",
+            index=models.Index(
+                fields=["status", "faucet", "user_profile"],
+                include=["value_amount", "total_price_amount"],
+                name="donation_status_faucet_idx",
+            ),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name="donationreceipt",
+            index=models.Index(
+                fields=["status", "datetime"], name="donation_status_dt_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.4 on 2026-10-16 22:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_allowlist"),
+        ("faucet", "0084_donationreceipt_amount_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AddressFirstTransactions",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("first_internal_tx", models.JSONField(blank=True, null=True)),
+                ("first_tx", models.JSONField(blank=True, null=True)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="address_first_transactions",
+                        to="core.chain",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="addressfirsttransactions",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "address"), name="unique_address_first_transactions"
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.4 on 2026-10-17 00:10
+
+from django.db import migrations
+from django.db.models import Count, F, Sum
+
+# states are copied here so later model changes don't alter this migration
+COUNTED_STATES = ["Verified", "1"]
+
+
+def fill_claim_counters(apps, schema_editor):
+    # counts the receipts claimed before the counters were kept, a counter
+    # that was already written to only gets the difference
+    from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+    ClaimReceipt = apps.get_model("faucet", "ClaimReceipt")
+    ClaimCounter = apps.get_model("faucet", "ClaimCounter")
+
+    expected = (
+        ClaimReceipt.objects.filter(_status__in=COUNTED_STATES)
+        .annotate(
+            round_start=RoundCreditStrategy.get_start_of_the_round_expression(
+                "datetime"
+            )
+        )
+        .values("faucet_id", "round_start")
+        .order_by()
+        .annotate(total=Count("pk"))
+        .values_list("faucet_id", "round_start", "total")
+    )
+    actual = {
+        (faucet_id, round_start): total
+        for faucet_id, round_start, total in ClaimCounter.objects.values(
+            "faucet_id", "round_start"
+        )
+        .order_by()
+        .annotate(total=Sum("count"))
+        .values_list("faucet_id", "round_start", "total")
+    }
+
+    new_counters = []
+    for faucet_id, round_start, total in expected.iterator():
+        drift = total - actual.get((faucet_id, round_start), 0)
+        if not drift:
+            continue
+        if (faucet_id, round_start) not in actual:
+            new_counters.append(
+                ClaimCounter(faucet_id=faucet_id, round_start=round_start, count=drift)
+            )
+            continue
+        counter, _ = ClaimCounter.objects.get_or_create(
+            faucet_id=faucet_id, round_start=round_start, shard=0
+        )
+        ClaimCounter.objects.filter(pk=counter.pk).update(count=F("count") + drift)
+    ClaimCounter.objects.bulk_create(new_counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0085_addressfirsttransactions"),
+    ]
+
+    operations = [migrations.RunPython(fill_claim_counters, migrations.RunPython.noop)]
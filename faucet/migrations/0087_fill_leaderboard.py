@@ -0,0 +1,69 @@
+# Generated by Django 4.0.4 on 2026-10-17 00:40
+
+from django.db import migrations
+from django.db.models import Sum
+
+# copied here so later model changes don't alter this migration
+VERIFIED = "Verified"
+
+
+def rank_board(entries):
+    # users with the same total share a rank, like 1, 2, 2, 4
+    entries.sort(key=lambda e: e.sum_total_price, reverse=True)
+    for i, entry in enumerate(entries):
+        if i > 0 and entry.sum_total_price == entries[i - 1].sum_total_price:
+            entry.rank = entries[i - 1].rank
+        else:
+            entry.rank = i + 1
+    return entries
+
+
+def fill_leaderboard(apps, schema_editor):
+    # builds the boards the way rebuild_leaderboard does, so they are not
+    # empty until its first run
+    DonationReceipt = apps.get_model("faucet", "DonationReceipt")
+    LeaderboardEntry = apps.get_model("faucet", "LeaderboardEntry")
+    UserProfile = apps.get_model("authentication", "UserProfile")
+
+    donations = DonationReceipt.objects.filter(status=VERIFIED).order_by()
+    chains = {}
+    for user_profile_id, chain_id in donations.values_list(
+        "user_profile", "faucet__chain"
+    ).distinct():
+        chains.setdefault(user_profile_id, set()).add(chain_id)
+    usernames = dict(
+        UserProfile.objects.filter(pk__in=chains).values_list("pk", "username")
+    )
+
+    def create_entry(user_profile_id, faucet_id, total):
+        return LeaderboardEntry(
+            user_profile_id=user_profile_id,
+            faucet_id=faucet_id,
+            username=usernames.get(user_profile_id),
+            sum_total_price=total or 0,
+            interacted_chains=sorted(chains.get(user_profile_id, [])),
+        )
+
+    boards = {None: []}
+    for user_profile_id, total in donations.values_list("user_profile").annotate(
+        total=Sum("total_price_amount")
+    ):
+        boards[None].append(create_entry(user_profile_id, None, total))
+    for user_profile_id, faucet_id, total in donations.values_list(
+        "user_profile", "faucet"
+    ).annotate(total=Sum("total_price_amount")):
+        boards.setdefault(faucet_id, []).append(
+            create_entry(user_profile_id, faucet_id, total)
+        )
+
+    LeaderboardEntry.objects.all().delete()
+    for entries in boards.values():
+        LeaderboardEntry.objects.bulk_create(rank_board(entries), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0086_fill_claim_counters"),
+    ]
+
+    operations = [migrations.RunPython(fill_leaderboard, migrations.RunPython.noop)]
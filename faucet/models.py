@@ -1,18 +1,22 @@
+import decimal
 import logging
+import random
+import time
 import uuid
 from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db import models
-from django.db.models import Q, UniqueConstraint
-from django.db.models.functions import Lower
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Q, Sum, UniqueConstraint
+from django.db.models.functions import Coalesce, Lower
 from django.utils import timezone
 from safedelete.models import SafeDeleteModel
 
 from authentication.models import UserProfile
 from brightIDfaucet.settings import BRIGHT_ID_INTERFACE
 from core.models import AbstractGlobalSettings, BigNumField, Chain, NetworkTypes
+from core.utils import GasPriceOracle
 from faucet.faucet_manager.lnpay_client import LNPayClient
 
 
@@ -89,6 +93,69 @@ class BrightUser(models.Model):
         return BRIGHT_ID_INTERFACE.get_verification_link(str(self.context_id))
 
 
+class ClaimReceiptQuerySet(models.QuerySet):
+    def assign_batch(self, batch, limit):
+        """
+        assign up to limit unbatched receipts to the batch in a single
+        UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED),
+        receipts locked by another batcher are skipped instead of waited on
+        """
+        receipt_ids = (
+            self.filter(batch=None)
+            .order_by("pk")
+            .select_for_update(skip_locked=True)
+            .values("pk")[:limit]
+        )
+        return ClaimReceipt.objects.filter(pk__in=receipt_ids, batch=None).update(
+            batch=batch
+        )
+
+    def update_status(self, status):
+        """
+        bulk status update that keeps the claim ledger in sync,
+        use it instead of update(_status=...)
+        """
+        with transaction.atomic():
+            receipts = list(
+                self.select_for_update(of=("self",))
+                .exclude(_status=status)
+                .values(
+                    "pk",
+                    "user_profile_id",
+                    "faucet_id",
+                    "faucet__chain_id",
+                    "datetime",
+                    "amount",
+                    "_status",
+                )
+            )
+            if not receipts:
+                return 0
+            ClaimReceipt.objects.filter(pk__in=[r["pk"] for r in receipts]).update(
+                _status=status
+            )
+            ClaimLedger.record_transitions(
+                [
+                    (
+                        r["user_profile_id"],
+                        r["faucet__chain_id"],
+                        r["datetime"],
+                        int(r["amount"]),
+                        r["_status"],
+                        status,
+                    )
+                    for r in receipts
+                ]
+            )
+            ClaimCounter.record_transitions(
+                [
+                    (r["faucet_id"], r["datetime"], r["_status"], status)
+                    for r in receipts
+                ]
+            )
+            return len(receipts)
+
+
 class ClaimReceipt(models.Model):
     MAX_PENDING_DURATION = 5  # minutes
     PENDING = "Pending"
@@ -140,9 +207,38 @@ class ClaimReceipt(models.Model):
         null=True,
     )
 
+    objects = ClaimReceiptQuerySet.as_manager()
+
     def status(self):
         return self._status
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous_status = None
+            if not self._state.adding:
+                previous_status = (
+                    ClaimReceipt.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("_status", flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            ClaimLedger.record_transitions(
+                [
+                    (
+                        self.user_profile_id,
+                        self.faucet.chain_id,
+                        self.datetime,
+                        int(self.amount),
+                        previous_status,
+                        self._status,
+                    )
+                ]
+            )
+            ClaimCounter.record_transitions(
+                [(self.faucet_id, self.datetime, previous_status, self._status)]
+            )
+
     @property
     def age(self):
         return timezone.now() - self.datetime
@@ -156,15 +252,116 @@ class ClaimReceipt(models.Model):
     @staticmethod
     def claims_count():
         cached_count = cache.get("gastap_claims_count")
-        if cached_count:
+        if cached_count is not None:
             return cached_count
-        count = ClaimReceipt.objects.filter(
-            _status__in=[ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
-        ).count()
+        count = ClaimCounter.objects.aggregate(total=Sum("count"))["total"] or 0
         cache.set("gastap_claims_count", count, 600)
         return count
 
 
+class ClaimLedger(models.Model):
+    """
+    per user, per chain, per round totals of the claim receipts, kept in sync
+    with receipt status changes so the credit strategies read one row instead
+    of aggregating over ClaimReceipt
+    """
+
+    # states that count toward the round claim limit
+    COUNTED_STATES = [
+        ClaimReceipt.PENDING,
+        ClaimReceipt.VERIFIED,
+        BrightUser.PENDING,
+        BrightUser.VERIFIED,
+    ]
+    # states that count toward the claimed amount
+    CLAIMED_STATES = [ClaimReceipt.VERIFIED]
+
+    user_profile = models.ForeignKey(
+        UserProfile, related_name="claim_ledgers", on_delete=models.PROTECT
+    )
+    chain = models.ForeignKey(
+        Chain, related_name="claim_ledgers", on_delete=models.PROTECT
+    )
+    round_start = models.DateTimeField()
+
+    claims_count = models.IntegerField(default=0)
+    claimed_amount = BigNumField(default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user_profile", "round_start", "chain"],
+                name="unique_claim_ledger_round",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_profile_id} - {self.chain_id} - {self.round_start}"
+
+    @classmethod
+    def get_delta(cls, amount, old_status, new_status):
+        claims_count = int(new_status in cls.COUNTED_STATES) - int(
+            old_status in cls.COUNTED_STATES
+        )
+        claimed_amount = amount * (
+            int(new_status in cls.CLAIMED_STATES)
+            - int(old_status in cls.CLAIMED_STATES)
+        )
+        return claims_count, claimed_amount
+
+    @classmethod
+    def record_transitions(cls, transitions):
+        """
+        apply a list of
+        (user_profile_id, chain_id, datetime, amount, old_status, new_status)
+        receipt status transitions to the ledger
+        """
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        deltas = {}
+        for user_profile_id, chain_id, _datetime, amount, old, new in transitions:
+            if user_profile_id is None:
+                continue
+            claims_count, claimed_amount = cls.get_delta(amount, old, new)
+            if not claims_count and not claimed_amount:
+                continue
+            key = (
+                user_profile_id,
+                chain_id,
+                RoundCreditStrategy.get_start_of_the_round_of(_datetime),
+            )
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += claims_count
+            delta[1] += claimed_amount
+
+        for (user_profile_id, chain_id, round_start), delta in deltas.items():
+            cls.record(user_profile_id, chain_id, round_start, *delta)
+
+    @classmethod
+    def record(cls, user_profile_id, chain_id, round_start, claims_count, amount):
+        ledger, _ = cls.objects.get_or_create(
+            user_profile_id=user_profile_id, chain_id=chain_id, round_start=round_start
+        )
+        cls.objects.filter(pk=ledger.pk).update(
+            claims_count=F("claims_count") + claims_count,
+            claimed_amount=ExpressionWrapper(
+                F("claimed_amount") + amount, output_field=BigNumField()
+            ),
+        )
+
+
+class FaucetQuerySet(models.QuerySet):
+    def with_claim_counters(self):
+        """
+        annotates the claim counters of the faucets, summed over their counter
+        shards in the same query, so the faucets can be ordered by them
+        """
+        sums = ClaimCounter.get_sums("claim_counter_shards__")
+        return self.annotate(
+            **{f"annotated_{name}": Coalesce(value, 0) for name, value in sums.items()}
+        )
+
+
 class Faucet(models.Model):
     chain = models.ForeignKey(Chain, related_name="faucets", on_delete=models.PROTECT)
     gas_image_url = models.URLField(max_length=255, blank=True, null=True)
@@ -182,6 +379,10 @@ class Faucet(models.Model):
     is_active = models.BooleanField(default=True)
     show_in_gastap = models.BooleanField(default=True)
 
+    max_inflight_batches = models.PositiveSmallIntegerField(default=1)
+
+    objects = FaucetQuerySet.as_manager()
+
     def __str__(self):
         return (
             f"{self.chain.chain_name} - {self.pk} - "
@@ -190,7 +391,10 @@ class Faucet(models.Model):
 
     @property
     def has_enough_funds(self):
-        if self.get_manager_balance() > self.max_claim_amount:
+        return self.has_enough_funds_in(self.get_manager_balance())
+
+    def has_enough_funds_in(self, manager_balance):
+        if manager_balance > self.max_claim_amount:
             return True
         logging.warning(
             f"Faucet {self.pk}-{self.chain.chain_name} "
@@ -198,6 +402,18 @@ class Faucet(models.Model):
         )
         return False
 
+    @property
+    def batch_pipeline_size(self):
+        # evm batches get their own nonce and lightning invoices are paid
+        # independently, so their batches can be in flight together
+        if self.chain.chain_type in [
+            NetworkTypes.EVM,
+            NetworkTypes.NONEVMXDC,
+            NetworkTypes.LIGHTNING,
+        ]:
+            return max(self.max_inflight_batches, 1)
+        return 1
+
     @property
     def block_scan_address(self):
         address = ""
@@ -237,12 +453,7 @@ class Faucet(models.Model):
                 v = fund_manager.w3.get_balance(fund_manager.lock_account_address).value
                 return v
             elif self.chain.chain_type == NetworkTypes.LIGHTNING:
-                lnpay_client = LNPayClient(
-                    self.chain.rpc_url_private,
-                    self.chain.wallet.main_key,
-                    self.fund_manager_address,
-                )
-                return lnpay_client.get_balance()
+                return LNPayClient.for_faucet(self).get_balance()
 
             raise Exception("Invalid chain type")
         except Exception as e:
@@ -258,69 +469,227 @@ class Faucet(models.Model):
             return True
 
         try:
-            from faucet.faucet_manager.fund_manager import EVMFundManager
-
-            return EVMFundManager(self).is_gas_price_too_high
+            return GasPriceOracle.get(self.chain) > self.chain.max_gas_price
         except Exception:  # noqa: E722
             logging.exception(f"Error getting gas price for {self.chain.chain_name}")
             return True
 
+    CLAIM_COUNTERS_CACHE_KEY = "gas_tap_faucet_claim_counters_{}"
+
+    @classmethod
+    def get_claim_counters(cls, faucet_pks):
+        """
+        {faucet pk: claim counters} of many faucets, read with one cache
+        get_many and one grouped aggregate over the claim counter shards of
+        the faucets that missed it
+        """
+        keys = {pk: cls.CLAIM_COUNTERS_CACHE_KEY.format(pk) for pk in faucet_pks}
+        cached = cache.get_many(list(keys.values()))
+        counters = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+        missing = [pk for pk in faucet_pks if pk not in counters]
+        if not missing:
+            return counters
+
+        computed = {pk: dict.fromkeys(ClaimCounter.COUNTERS, 0) for pk in missing}
+        rows = (
+            ClaimCounter.objects.filter(faucet__in=missing)
+            .values("faucet")
+            .order_by()
+            .annotate(**ClaimCounter.get_sums())
+        )
+        for row in rows:
+            computed[row.pop("faucet")] = {
+                name: value or 0 for name, value in row.items()
+            }
+        for pk, value in computed.items():
+            cache.set(keys[pk], value, get_cache_time(pk))
+        counters.update(computed)
+        return counters
+
+    @property
+    def claim_counters(self):
+        if getattr(self, "_claim_counters", None) is None:
+            if hasattr(self, "annotated_total_claims"):
+                # loaded through FaucetQuerySet.with_claim_counters
+                self._claim_counters = {
+                    name: getattr(self, f"annotated_{name}")
+                    for name in ClaimCounter.COUNTERS
+                }
+            else:
+                self._claim_counters = Faucet.get_claim_counters([self.pk])[self.pk]
+        return self._claim_counters
+
     @property
     def total_claims(self):
-        cached_total_claims = cache.get(f"gas_tap_chain_total_claims_{self.pk}")
-        if cached_total_claims:
-            return cached_total_claims
-        total_claims = ClaimReceipt.objects.filter(
-            faucet=self, _status__in=[ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
-        ).count()
-        cache.set(
-            f"gas_tap_chain_total_claims_{self.pk}",
-            total_claims,
-            get_cache_time(self.pk),
-        )
-        return total_claims
+        return self.claim_counters["total_claims"]
 
     @property
     def total_claims_this_round(self):
-        cached_total_claims_this_round = cache.get(
-            f"gas_tap_chain_total_claims_this_round_{self.pk}"
-        )
-        if cached_total_claims_this_round:
-            return cached_total_claims_this_round
-        from faucet.faucet_manager.claim_manager import RoundCreditStrategy
-
-        total_claims_this_round = ClaimReceipt.objects.filter(
-            faucet=self,
-            datetime__gte=RoundCreditStrategy.get_start_of_the_round(),
-            _status__in=[ClaimReceipt.VERIFIED],
-        ).count()
-        cache.set(
-            f"gas_tap_chain_total_claims_this_round_{self.pk}",
-            total_claims_this_round,
-            get_cache_time(self.pk),
-        )
-        return total_claims_this_round
+        return self.claim_counters["total_claims_this_round"]
 
     @property
     def total_claims_since_last_round(self):
-        cached_total_claims_since_last_round = cache.get(
-            f"gas_tap_chain_total_claims_since_last_round_{self.pk}"
+        return self.claim_counters["total_claims_since_last_round"]
+
+
+class ClaimCounter(models.Model):
+    """
+    verified claims of a faucet per round, kept up to date on receipt status
+    changes so the public stats never count the receipts. a counter is split
+    over SHARDS rows that are summed on read, so concurrent updates of a busy
+    faucet do not queue on one row
+    """
+
+    SHARDS = 8
+    COUNTED_STATES = [ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
+    COUNTERS = [
+        "total_claims",
+        "total_claims_this_round",
+        "total_claims_since_last_round",
+    ]
+
+    faucet = models.ForeignKey(
+        Faucet, related_name="claim_counter_shards", on_delete=models.PROTECT
+    )
+    round_start = models.DateTimeField()
+    shard = models.PositiveSmallIntegerField(default=0)
+
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["faucet", "round_start", "shard"],
+                name="unique_claim_counter_shard",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.faucet_id} - {self.round_start} - {self.shard}"
+
+    @staticmethod
+    def get_sums(prefix=""):
+        """
+        the claim counters of a faucet as sums over its counter shards,
+        prefix is the path from the queried model to the counters
+        """
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        this_round = RoundCreditStrategy.get_start_of_the_round()
+        previous_round = RoundCreditStrategy.get_start_of_previous_round()
+        return {
+            "total_claims": Sum(f"{prefix}count"),
+            "total_claims_this_round": Sum(
+                f"{prefix}count",
+                filter=Q(**{f"{prefix}round_start__gte": this_round}),
+            ),
+            "total_claims_since_last_round": Sum(
+                f"{prefix}count",
+                filter=Q(**{f"{prefix}round_start__gte": previous_round}),
+            ),
+        }
+
+    @classmethod
+    def record_transitions(cls, transitions):
+        """
+        apply a list of (faucet_id, datetime, old_status, new_status)
+        receipt status transitions to the counters
+        """
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        deltas = {}
+        for faucet_id, _datetime, old, new in transitions:
+            delta = int(new in cls.COUNTED_STATES) - int(old in cls.COUNTED_STATES)
+            if not delta:
+                continue
+            key = (faucet_id, RoundCreditStrategy.get_start_of_the_round_of(_datetime))
+            deltas[key] = deltas.get(key, 0) + delta
+
+        for (faucet_id, round_start), delta in deltas.items():
+            if delta:
+                cls.add(faucet_id, round_start, delta)
+
+    @classmethod
+    def add(cls, faucet_id, round_start, delta, shard=None):
+        if shard is None:
+            shard = random.randrange(cls.SHARDS)
+        counter, _ = cls.objects.get_or_create(
+            faucet_id=faucet_id, round_start=round_start, shard=shard
         )
-        if cached_total_claims_since_last_round:
-            return cached_total_claims_since_last_round
-        from faucet.faucet_manager.claim_manager import RoundCreditStrategy
-
-        total_claims_since_last_round = ClaimReceipt.objects.filter(
-            faucet=self,
-            datetime__gte=RoundCreditStrategy.get_start_of_previous_round(),
-            _status__in=[ClaimReceipt.VERIFIED],
-        ).count()
-        cache.set(
-            f"gas_tap_chain_total_claims_since_last_round_{self.pk}",
-            total_claims_since_last_round,
-            get_cache_time(self.pk),
+        cls.objects.filter(pk=counter.pk).update(count=F("count") + delta)
+        cache.delete(Faucet.CLAIM_COUNTERS_CACHE_KEY.format(faucet_id))
+
+
+class FaucetBalanceSnapshot(models.Model):
+    """
+    last balances of a faucet and its chain wallet, collected in the
+    background so balance endpoints never hit the rpc
+    """
+
+    faucet = models.OneToOneField(
+        Faucet, related_name="balance_snapshot", on_delete=models.CASCADE
+    )
+    contract_balance = BigNumField(default=0)
+    wallet_balance = BigNumField(default=0)
+    has_enough_funds = models.BooleanField(default=False)
+    has_enough_fees = models.BooleanField(default=False)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.faucet_id} - {self.updated_at}"
+
+    @property
+    def age(self):
+        return timezone.now() - self.updated_at
+
+
+class DirtyFaucet(models.Model):
+    """
+    faucets that have claim receipts waiting to be batched,
+    the batcher only wakes up for these
+    """
+
+    faucet = models.OneToOneField(
+        Faucet, related_name="dirty_mark", on_delete=models.CASCADE
+    )
+    marked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.faucet_id} - {self.marked_at}"
+
+    @classmethod
+    def mark(cls, faucet_id):
+        cls.objects.update_or_create(
+            faucet_id=faucet_id, defaults={"marked_at": timezone.now()}
         )
-        return total_claims_since_last_round
+
+    @classmethod
+    def clear(cls, faucet_id, checked_at):
+        # marks made after the batcher looked at the receipts are kept
+        cls.objects.filter(faucet_id=faucet_id, marked_at__lte=checked_at).delete()
+
+
+class WalletNonce(models.Model):
+    """
+    next nonce of a faucet wallet on a chain, allocated locally so
+    batches can be sent without waiting for the previous one to be mined
+    """
+
+    chain = models.ForeignKey(
+        Chain, related_name="wallet_nonces", on_delete=models.CASCADE
+    )
+    address = models.CharField(max_length=255)
+    next_nonce = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["chain", "address"], name="unique_wallet_nonce")
+        ]
+
+    def __str__(self):
+        return f"{self.chain.chain_name} - {self.address}: {self.next_nonce}"
 
 
 class GlobalSettings(AbstractGlobalSettings):
@@ -333,6 +702,17 @@ class TransactionBatch(models.Model):
     )
     datetime = models.DateTimeField(auto_now_add=True)
     tx_hash = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    nonce = models.BigIntegerField(null=True, blank=True)
+
+    # batch sizing, size_target is the size the batcher aimed for and
+    # fill_ratio the share of the chain's batch capacity that was used
+    size_target = models.PositiveIntegerField(null=True, blank=True)
+    fill_ratio = models.FloatField(null=True, blank=True)
+    gas_estimate = models.BigIntegerField(null=True, blank=True)
+
+    # confirmation tracking, the receipt is polled instead of waited on
+    checks_count = models.PositiveIntegerField(default=0)
+    next_check_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     _status = models.CharField(
         max_length=30,
@@ -377,6 +757,17 @@ class TransactionBatch(models.Model):
     def is_expired(self):
         return self.age > timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION)
 
+    MAX_CHECK_INTERVAL = 120  # seconds
+
+    def schedule_next_check(self):
+        # about once a block for fresh txs, backing off as the tx gets older
+        block_time = self.faucet.chain.block_time
+        delay = min(
+            max(block_time, self.age.total_seconds() / 4),
+            max(block_time, self.MAX_CHECK_INTERVAL),
+        )
+        self.next_check_at = timezone.now() + timedelta(seconds=delay)
+
 
 class LightningConfig(models.Model):
     period = models.IntegerField(default=64800)
@@ -388,6 +779,33 @@ class LightningConfig(models.Model):
         self.pk = 1
         super().save(*args, **kwargs)
 
+    def get_active_round(self):
+        return int(int(time.time()) / self.period) * self.period
+
+    def reserve(self, amount):
+        """
+        add the amount to the claimed amount of the active round if it fits in
+        the cap, with conditional updates so concurrent payments can not pass
+        the cap together. returns the round of the reservation or None
+        """
+        active_round = self.get_active_round()
+        # the first payment of a round starts it over
+        LightningConfig.objects.filter(pk=self.pk).exclude(
+            current_round=active_round
+        ).update(current_round=active_round, claimed_amount=0)
+        reserved = LightningConfig.objects.filter(
+            pk=self.pk,
+            current_round=active_round,
+            claimed_amount__lte=F("period_max_cap") - amount,
+        ).update(claimed_amount=F("claimed_amount") + amount)
+        return active_round if reserved else None
+
+    def release(self, amount, reserved_round):
+        # give back a reservation whose payment failed, unless its round is over
+        LightningConfig.objects.filter(pk=self.pk, current_round=reserved_round).update(
+            claimed_amount=F("claimed_amount") - amount
+        )
+
 
 class DonationReceipt(models.Model):
     states = (
@@ -412,6 +830,13 @@ class DonationReceipt(models.Model):
     )
     value = models.CharField(max_length=255, null=True, blank=True)
     total_price = models.CharField(max_length=255, null=True, blank=True)
+    # numeric copies of value and total_price, the sums run on these
+    value_amount = models.DecimalField(
+        max_digits=48, decimal_places=18, null=True, blank=True
+    )
+    total_price_amount = models.DecimalField(
+        max_digits=48, decimal_places=18, null=True, blank=True
+    )
     datetime = models.DateTimeField(auto_now_add=True)
     status = models.CharField(
         max_length=30,
@@ -421,6 +846,37 @@ class DonationReceipt(models.Model):
 
     class Meta:
         unique_together = ("faucet", "tx_hash")
+        indexes = [
+            # covers the leaderboard and fuel champion sums
+            models.Index(
+                fields=["status", "faucet", "user_profile"],
+                include=["value_amount", "total_price_amount"],
+                name="donation_status_faucet_idx",
+            ),
+            models.Index(fields=["status", "datetime"], name="donation_status_dt_idx"),
+        ]
+
+    @staticmethod
+    def to_amount(text):
+        try:
+            amount = decimal.Decimal(str(text))
+        except decimal.InvalidOperation:
+            return None
+        return amount if amount.is_finite() else None
+
+    @property
+    def is_expired(self):
+        # a tx that is still not mined by then is taken as dropped
+        return timezone.now() - self.datetime > timedelta(
+            minutes=ClaimReceipt.MAX_PENDING_DURATION
+        )
+
+    def save(self, *args, **kwargs):
+        self.value_amount = None if self.value is None else self.to_amount(self.value)
+        self.total_price_amount = (
+            None if self.total_price is None else self.to_amount(self.total_price)
+        )
+        super().save(*args, **kwargs)
 
 
 class DonationContract(SafeDeleteModel):
@@ -447,3 +903,74 @@ class DonationContract(SafeDeleteModel):
                 name="unique_donation_contract_address",
             ),
         ]
+
+
+class LeaderboardEntry(models.Model):
+    """
+    a row of the donation leaderboard, the global one (faucet is null) or the
+    one of a faucet, with the total, rank and user info precomputed so the
+    leaderboard is read from an index instead of aggregating donations
+    """
+
+    user_profile = models.ForeignKey(
+        UserProfile, related_name="leaderboard_entries", on_delete=models.CASCADE
+    )
+    faucet = models.ForeignKey(
+        Faucet,
+        related_name="leaderboard_entries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    username = models.CharField(max_length=150, null=True, blank=True)
+    sum_total_price = models.DecimalField(max_digits=48, decimal_places=18, default=0)
+    rank = models.PositiveIntegerField(default=1)
+    interacted_chains = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user_profile", "faucet"],
+                name="unique_faucet_leaderboard_entry",
+                condition=Q(faucet__isnull=False),
+            ),
+            UniqueConstraint(
+                fields=["user_profile"],
+                name="unique_global_leaderboard_entry",
+                condition=Q(faucet__isnull=True),
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["faucet", "rank", "id"], name="leaderboard_rank_idx"),
+            models.Index(
+                fields=["faucet", "sum_total_price"], name="leaderboard_total_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.faucet_id or 'global'} - {self.rank} - {self.username}"
+
+
+class AddressFirstTransactions(models.Model):
+    """
+    the first internal tx and the first tx of an address as the explorer
+    returned them, they never change once they exist
+    """
+
+    chain = models.ForeignKey(
+        Chain, related_name="address_first_transactions", on_delete=models.CASCADE
+    )
+    address = models.CharField(max_length=255)
+    first_internal_tx = models.JSONField(null=True, blank=True)
+    first_tx = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["chain", "address"], name="unique_address_first_transactions"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.chain} - {self.address}"
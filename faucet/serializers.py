@@ -1,7 +1,13 @@
 from rest_framework import serializers
 
 from core.serializers import ChainSerializer
-from faucet.models import ClaimReceipt, DonationReceipt, Faucet, GlobalSettings
+from faucet.models import (
+    ClaimReceipt,
+    DonationReceipt,
+    Faucet,
+    FaucetBalanceSnapshot,
+    GlobalSettings,
+)
 
 
 class GlobalSettingsSerializer(serializers.ModelSerializer):
@@ -11,11 +17,19 @@ class GlobalSettingsSerializer(serializers.ModelSerializer):
 
 
 class FaucetBalanceSerializer(serializers.ModelSerializer):
+    """
+    serves the last balance snapshot of the faucet, the balances are
+    collected in the background
+    """
+
     contract_balance = serializers.SerializerMethodField()
     wallet_balance = serializers.SerializerMethodField()
     chain = ChainSerializer()
+    has_enough_funds = serializers.SerializerMethodField()
     has_enough_fees = serializers.SerializerMethodField()
     wallet_address = serializers.SerializerMethodField()
+    balance_updated_at = serializers.SerializerMethodField()
+    balance_age = serializers.SerializerMethodField()
 
     class Meta:
         model = Faucet
@@ -30,20 +44,42 @@ class FaucetBalanceSerializer(serializers.ModelSerializer):
             "fund_manager_address",
             "wallet_address",
             "block_scan_address",
+            "balance_updated_at",
+            "balance_age",
         ]
 
+    def get_snapshot(self, faucet):
+        try:
+            return faucet.balance_snapshot
+        except FaucetBalanceSnapshot.DoesNotExist:
+            return None
+
+    def get_snapshot_value(self, faucet, name):
+        snapshot = self.get_snapshot(faucet)
+        return getattr(snapshot, name) if snapshot else None
+
     def get_contract_balance(self, faucet):
-        return faucet.manager_balance
+        return self.get_snapshot_value(faucet, "contract_balance")
 
     def get_wallet_balance(self, faucet):
-        return faucet.chain.wallet_balance
+        return self.get_snapshot_value(faucet, "wallet_balance")
+
+    def get_has_enough_funds(self, faucet):
+        return self.get_snapshot_value(faucet, "has_enough_funds")
 
     def get_has_enough_fees(self, faucet):
-        return faucet.chain.has_enough_fees
+        return self.get_snapshot_value(faucet, "has_enough_fees")
 
     def get_wallet_address(self, faucet):
         return faucet.chain.wallet.address
 
+    def get_balance_updated_at(self, faucet):
+        return self.get_snapshot_value(faucet, "updated_at")
+
+    def get_balance_age(self, faucet):
+        snapshot = self.get_snapshot(faucet)
+        return snapshot.age.total_seconds() if snapshot else None
+
 
 class SmallFaucetSerializer(serializers.ModelSerializer):
     chain = ChainSerializer()
@@ -143,7 +179,7 @@ class DonationReceiptSerializer(serializers.ModelSerializer):
 
 class LeaderboardSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150, read_only=True)
-    sum_total_price = serializers.CharField(max_length=150, read_only=True)
+    sum_total_price = serializers.FloatField(read_only=True)
     interacted_chains = serializers.ListField(
         child=serializers.IntegerField(), read_only=True
     )
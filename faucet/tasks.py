@@ -3,12 +3,14 @@ import logging
 from celery import shared_task
 from django.conf import settings as django_settings
 from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
 
 from core.models import NetworkTypes, TokenPrice
 from core.utils import memcache_lock
 
-from .celery_tasks import CeleryTasks
-from .models import ClaimReceipt, DonationReceipt, Faucet, TransactionBatch
+from .celery_tasks import BULK_CONFIRMED_CHAIN_TYPES, CeleryTasks
+from .models import ClaimReceipt, DirtyFaucet, DonationReceipt, Faucet, TransactionBatch
 
 
 def passive_address_is_not_none(address):
@@ -27,6 +29,8 @@ def process_batch(self, batch_pk):
         CeleryTasks.process_batch(batch_pk)
         cache.delete(id_)
 
+    wake_up_batcher_if_batch_resolved(batch_pk)
+
 
 @shared_task
 def process_pending_batches():
@@ -52,6 +56,8 @@ def update_pending_batch_with_tx_hash(self, batch_pk):
 
         cache.delete(id_)
 
+    wake_up_batcher_if_batch_resolved(batch_pk)
+
 
 @shared_task
 def reject_expired_pending_claims():
@@ -60,25 +66,96 @@ def reject_expired_pending_claims():
 
 @shared_task
 def update_pending_batches_with_tx_hash_status():
+    # evm and solana batches are confirmed together, one round trip per chain
+    update_pending_batches_in_bulk.delay()
+
+    # only the batches whose next confirmation check is due
     batches_queryset = (
         TransactionBatch.objects.filter(_status=ClaimReceipt.PENDING)
+        .filter(Q(next_check_at=None) | Q(next_check_at__lte=timezone.now()))
         .exclude(tx_hash=None)
         .exclude(updating=True)
+        .exclude(faucet__chain__chain_type__in=BULK_CONFIRMED_CHAIN_TYPES)
     )
     for _batch in batches_queryset:
         update_pending_batch_with_tx_hash.delay(_batch.pk)
 
 
+@shared_task(bind=True)
+def update_pending_batches_in_bulk(self):
+    with memcache_lock(self.name, self.app.oid) as acquired:
+        if not acquired:
+            logging.info("Could not acquire update lock")
+            return
+
+        resolved = CeleryTasks.update_pending_batches_in_bulk()
+
+        cache.delete(self.name)
+
+    for batch_pk in resolved:
+        wake_up_batcher_if_batch_resolved(batch_pk)
+
+
 @shared_task
 def process_faucet_pending_claims(faucet_id):  # locks chain
+    # a faucet held by another batcher is skipped, the holder batches the
+    # claims that arrived meanwhile before it lets go
     CeleryTasks.process_faucet_pending_claims(faucet_id)
 
 
+def wake_up_faucet_batcher(faucet_id):
+    """
+    mark the faucet as having pending claims and wake up its batcher,
+    call it after the claim receipt is committed
+    """
+    DirtyFaucet.mark(faucet_id)
+    try:
+        process_faucet_pending_claims.delay(faucet_id)
+    except Exception as e:
+        # the periodic sweep picks the faucet up anyway
+        logging.exception(f"Could not wake up the batcher of faucet {faucet_id}: {e}")
+
+
+def wake_up_batcher_if_batch_resolved(batch_pk):
+    # the faucet batcher waits for this batch, wake it up if there is more work
+    faucet_id = (
+        TransactionBatch.objects.filter(pk=batch_pk, faucet__dirty_mark__isnull=False)
+        .exclude(_status=ClaimReceipt.PENDING)
+        .values_list("faucet_id", flat=True)
+        .first()
+    )
+    if faucet_id is not None:
+        process_faucet_pending_claims.delay(faucet_id)
+
+
+@shared_task
+def process_pending_claims():  # periodic safety net, claims wake up the batcher
+    faucet_ids = (
+        Faucet.objects.filter(is_active=True)
+        .filter(
+            Q(dirty_mark__isnull=False)
+            | Q(claims___status=ClaimReceipt.PENDING, claims__batch=None)
+        )
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    for faucet_id in faucet_ids:
+        process_faucet_pending_claims.delay(faucet_id)
+
+
+@shared_task
+def reconcile_wallet_nonces():  # periodic task
+    CeleryTasks.reconcile_wallet_nonces()
+
+
+@shared_task
+def reconcile_claim_counters():  # periodic task
+    CeleryTasks.reconcile_claim_counters()
+
+
 @shared_task
-def process_pending_claims():  # periodic task
-    faucets = Faucet.objects.filter(is_active=True)
-    for _faucet in faucets:
-        process_faucet_pending_claims.delay(_faucet.pk)
+def rebuild_leaderboard():  # periodic task
+    CeleryTasks.rebuild_leaderboard()
 
 
 @shared_task
@@ -87,10 +164,8 @@ def update_needs_funding_status_faucet(faucet_id):
 
 
 @shared_task
-def update_needs_funding_status():  # periodic task
-    faucets = Faucet.objects.filter(is_active=True)
-    for _faucet in faucets:
-        update_needs_funding_status_faucet.delay(_faucet.pk)
+def update_needs_funding_status():  # periodic task, collects balance snapshots
+    CeleryTasks.update_balance_snapshots()
 
 
 @shared_task
@@ -149,13 +224,23 @@ def process_donation_receipt(self, donation_receipt_pk):
         cache.delete(id_)
 
 
-@shared_task
-def update_donation_receipt_pending_status():
+@shared_task(bind=True)
+def update_donation_receipt_pending_status(self):
     """
     update status of pending donation receipt
     """
+    with memcache_lock(self.name, self.app.oid) as acquired:
+        if not acquired:
+            logging.info("Could not acquire update lock")
+            return
+
+        # evm donations are checked together, one round trip per chain
+        CeleryTasks.update_pending_donation_receipts()
+
+        cache.delete(self.name)
+
     pending_donation_receipts = DonationReceipt.objects.filter(
         status=ClaimReceipt.PENDING
-    )
+    ).exclude(faucet__chain__chain_type__in=[NetworkTypes.EVM, NetworkTypes.NONEVMXDC])
     for pending_donation_receipt in pending_donation_receipts:
         process_donation_receipt.delay(pending_donation_receipt.pk)
@@ -1,32 +1,94 @@
+import asyncio
 import datetime
 import json
 import os
+import threading
 import time
-from unittest.mock import patch
-
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+import web3._utils.request
+import web3.exceptions
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count, QuerySet, Sum
+from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APITestCase
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+from web3 import Web3
 
 from authentication.models import UserProfile, Wallet
 from core.models import WalletAccount
-from faucet.constants import MEMCACHE_LIGHTNING_LOCK_KEY
-from faucet.constraints import OptimismDonationConstraint
-from faucet.faucet_manager.claim_manager import ClaimManagerFactory, SimpleClaimManager
+from core.utils import Web3BatchClient
+from faucet.celery_tasks import CeleryTasks
+from faucet.constraints import (
+    EvmClaimingGasConstraint,
+    OptimismClaimingGasConstraint,
+    OptimismDonationConstraint,
+)
+from faucet.faucet_manager.balance_sweeper import BalanceSweeper
+from faucet.faucet_manager.batch_sizer import BatchSizer
+from faucet.faucet_manager.claim_counters import (
+    get_expected_counters,
+    reconcile_claim_counters,
+)
+from faucet.faucet_manager.claim_ledger import find_ledger_inconsistencies
+from faucet.faucet_manager.claim_manager import (
+    ClaimManagerFactory,
+    LimitedChainClaimManager,
+    SimpleClaimManager,
+)
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
-from faucet.faucet_manager.fund_manager import LightningFundManager
-from faucet.helpers import memcache_lock
+from faucet.faucet_manager.fuel_champion import (
+    get_cache_key,
+    get_fuel_champions,
+    update_fuel_champions,
+)
+from faucet.faucet_manager.fund_manager import (
+    EVMFundManager,
+    LightningFundManager,
+    SolanaFundManager,
+)
+from faucet.faucet_manager.leaderboard import rebuild_leaderboard, record_donation
+from faucet.faucet_manager.lnpay_client import LNPayClient
+from faucet.faucet_manager.nonce_manager import NonceManager
 from faucet.models import (
+    AddressFirstTransactions,
     Chain,
+    ClaimCounter,
+    ClaimLedger,
     ClaimReceipt,
+    DirtyFaucet,
     DonationReceipt,
     Faucet,
+    FaucetBalanceSnapshot,
     GlobalSettings,
+    LeaderboardEntry,
     LightningConfig,
     NetworkTypes,
     TransactionBatch,
+    WalletNonce,
 )
+from faucet.tasks import (
+    process_pending_claims,
+    update_pending_batches_with_tx_hash_status,
+)
+
+# for the tests that need a working cache, the test settings have none
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 address = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
 fund_manager = "0x5802f1035AbB8B191bc12Ce4668E3815e8B7Efa0"
@@ -127,6 +189,120 @@ class TestChainInfo(APITestCase):
         response = self.request_chain_list()
         self.assertEqual(response.status_code, 200)
 
+    def test_list_reads_all_claim_counters_at_once(self):
+        faucets = [create_test_faucet(self.wallet, chain_id=i) for i in range(1, 4)]
+        for i, faucet in enumerate(faucets):
+            for _ in range(i):
+                ClaimReceipt.objects.create(
+                    faucet=faucet,
+                    user_profile=self.new_user,
+                    datetime=timezone.now(),
+                    amount=100,
+                    _status=ClaimReceipt.VERIFIED,
+                )
+
+        # the faucets with their counters summed and sorted in one query
+        with self.assertNumQueries(1):
+            response = self.request_chain_list()
+
+        data = response.json()
+        self.assertEqual([f["pk"] for f in data], [f.pk for f in reversed(faucets)])
+        self.assertEqual([f["totalClaims"] for f in data], [2, 1, 0])
+        self.assertEqual([f["totalClaimsThisRound"] for f in data], [2, 1, 0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestClaimCounters(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+
+    def create_receipts(self, count, status=ClaimReceipt.PENDING):
+        for _ in range(count):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                datetime=timezone.now(),
+                amount=100,
+                _status=status,
+            )
+
+    def get_count(self):
+        return ClaimCounter.objects.aggregate(total=Sum("count"))["total"]
+
+    def test_counters_follow_status_transitions(self):
+        self.create_receipts(3)
+        receipts = ClaimReceipt.objects.filter(faucet=self.test_faucet)
+        self.assertFalse(ClaimCounter.objects.exclude(count=0).exists())
+
+        receipts.update_status(ClaimReceipt.VERIFIED)
+        self.assertEqual(self.get_count(), 3)
+        self.assertEqual(ClaimReceipt.claims_count(), 3)
+        self.assertEqual(self.test_faucet.total_claims_this_round, 3)
+
+        receipts.filter(pk=receipts.first().pk).update_status(ClaimReceipt.REJECTED)
+        self.assertEqual(self.get_count(), 2)
+        faucet = Faucet.objects.get(pk=self.test_faucet.pk)
+        self.assertEqual(faucet.total_claims_this_round, 2)
+
+    def test_counter_is_split_over_shards(self):
+        with patch("faucet.models.random.randrange", side_effect=[0, 1, 2]):
+            self.create_receipts(3, ClaimReceipt.VERIFIED)
+        self.assertEqual(
+            ClaimCounter.objects.filter(faucet=self.test_faucet).count(), 3
+        )
+        self.assertEqual(self.test_faucet.total_claims, 3)
+
+    def test_reconciler_corrects_drift(self):
+        self.create_receipts(2, ClaimReceipt.VERIFIED)
+        ClaimCounter.objects.update(count=0)
+
+        drifts = reconcile_claim_counters()
+        self.assertEqual([drift for _, _, drift in drifts], [2])
+        self.assertEqual(self.get_count(), 2)
+        self.assertEqual(reconcile_claim_counters(), [])
+
+    def test_reconciler_rechecks_drift_before_correcting(self):
+        self.create_receipts(2, ClaimReceipt.VERIFIED)
+        round_start = RoundCreditStrategy.get_start_of_the_round()
+        # counters read before the second claim landed
+        stale_totals = {(self.test_faucet.pk, round_start): 1}
+        with patch(
+            "faucet.faucet_manager.claim_counters.get_counter_totals",
+            return_value=stale_totals,
+        ):
+            self.assertEqual(reconcile_claim_counters(), [])
+        self.assertEqual(self.get_count(), 2)
+
+    def test_receipts_are_recounted_per_round(self):
+        round_start = RoundCreditStrategy.get_start_of_the_round()
+        for _datetime in [
+            round_start,
+            round_start - datetime.timedelta(seconds=1),
+            round_start + datetime.timedelta(days=6, hours=23),
+        ]:
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                datetime=_datetime,
+                amount=100,
+                _status=ClaimReceipt.VERIFIED,
+            )
+        previous_round = RoundCreditStrategy.get_start_of_the_round_of(
+            round_start - datetime.timedelta(seconds=1)
+        )
+        self.assertEqual(
+            get_expected_counters(),
+            {
+                (self.test_faucet.pk, round_start): 2,
+                (self.test_faucet.pk, previous_round): 1,
+            },
+        )
+
 
 class TestClaim(APITestCase):
     def setUp(self) -> None:
@@ -457,28 +633,100 @@ class TestClaimAPI(APITestCase):
         self.assertEqual(data[0]["pk"], c2.pk)
         self.assertEqual(data[1]["pk"], c1.pk)
 
-    def test_lightning_claim_race_condition(self):
-        with self.assertRaises(AssertionError):
-            with memcache_lock(MEMCACHE_LIGHTNING_LOCK_KEY, os.getpid()):
-                invoice = LIGHTNING_INVOICE
 
-                lightning_fund_manager = LightningFundManager(self.lightning_faucet)
-                lightning_fund_manager.multi_transfer([{"amount": 10, "data": invoice}])
+class TestLightningPayouts(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.lightning_faucet = create_test_faucet(self.wallet)
+        self.lightning_faucet.chain.chain_type = NetworkTypes.LIGHTNING
+        self.lightning_faucet.chain.save()
+        LightningConfig.objects.create(
+            period=86800,
+            period_max_cap=100,
+            current_round=int(int(time.time()) / 86800) * 86800,
+        )
+
+    def test_lightning_payments_reserve_the_period_cap(self):
+        config = LightningConfig.objects.first()
+        reserved_rounds = [config.reserve(40) for _ in range(3)]
+        self.assertIsNone(reserved_rounds[2])
+
+        config.release(40, reserved_rounds[0])
+        config.refresh_from_db()
+        self.assertEqual(config.claimed_amount, 40)
+
+        # a new round starts from zero
+        config.current_round -= config.period
+        config.save()
+        self.assertIsNotNone(config.reserve(100))
 
     def test_lightning_claim_max_cap_exceeded(self):
         lightning_fund_manager = LightningFundManager(self.lightning_faucet)
         config = lightning_fund_manager.config
         config.claimed_amount = 100
         config.save()
-        is_exceeded = (
-            lightning_fund_manager._LightningFundManager__check_max_cap_exceeds(10)
-        )
-        self.assertEqual(is_exceeded, True)
 
-        with self.assertRaises(AssertionError):
-            invoice = LIGHTNING_INVOICE
+        with patch.object(LNPayClient, "pay_invoice") as pay_invoice:
+            with self.assertRaises(AssertionError):
+                lightning_fund_manager.multi_transfer(
+                    [{"amount": 10, "to": LIGHTNING_INVOICE}]
+                )
+        pay_invoice.assert_not_called()
+
+    def test_failed_lightning_payment_releases_its_reservation(self):
+        lightning_fund_manager = LightningFundManager(self.lightning_faucet)
+        with patch.object(LNPayClient, "pay_invoice", return_value=False):
+            with self.assertRaises(Exception):
+                lightning_fund_manager.multi_transfer(
+                    [{"amount": 10, "to": LIGHTNING_INVOICE}]
+                )
+        self.assertEqual(lightning_fund_manager.config.claimed_amount, 0)
+
+        with patch.object(
+            LNPayClient, "pay_invoice", return_value={"lnTx": {"id": "lntx_1"}}
+        ):
+            tx_hash = lightning_fund_manager.multi_transfer(
+                [{"amount": 10, "to": LIGHTNING_INVOICE}]
+            )
+        self.assertEqual(tx_hash, "lntx_1")
+        self.assertEqual(lightning_fund_manager.config.claimed_amount, 10)
+
+    def test_lightning_invoices_are_paid_in_parallel_batches(self):
+        self.lightning_faucet.max_inflight_batches = 3
+        self.assertEqual(self.lightning_faucet.batch_pipeline_size, 3)
+
+
+class TestConcurrentLightningReservations(TransactionTestCase):
+    workers = 8
+
+    def setUp(self) -> None:
+        self.config = LightningConfig.objects.create(period=86800, period_max_cap=100)
 
-            lightning_fund_manager.multi_transfer([{"amount": 10, "data": invoice}])
+    def reserve(self, barrier):
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    return LightningConfig.objects.get().reserve(30)
+                except OperationalError:
+                    # sqlite locks the whole database, postgres waits on the row
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def test_parallel_payments_never_pass_the_period_cap(self):
+        barrier = threading.Barrier(self.workers)
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = [
+                executor.submit(self.reserve, barrier) for _ in range(self.workers)
+            ]
+        reserved = [f.result() for f in futures if f.result() is not None]
+
+        self.assertEqual(len(reserved), 3)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.claimed_amount, 90)
 
 
 class TestWeeklyCreditStrategy(APITestCase):
@@ -544,8 +792,845 @@ class TestWeeklyCreditStrategy(APITestCase):
         self.assertEqual(unclaimed, t_chain_max - 100)
 
 
+class TestClaimLedger(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+        self.strategy = RoundCreditStrategy(self.test_faucet, self.user_profile)
+        GlobalSettings.set("gastap_round_claim_limit", "5")
+
+    def create_pending_claim(self, amount=10, date=None):
+        return ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            amount=amount,
+            datetime=date or timezone.now(),
+        )
+
+    def get_ledger(self):
+        return ClaimLedger.objects.get(
+            user_profile=self.user_profile,
+            chain=self.test_faucet.chain,
+            round_start=RoundCreditStrategy.get_start_of_the_round(),
+        )
+
+    def test_pending_claim_counts_toward_round_limit(self):
+        self.create_pending_claim()
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.claims_count, 1)
+        self.assertEqual(int(ledger.claimed_amount), 0)
+        self.assertEqual(
+            LimitedChainClaimManager.get_total_round_claims(self.user_profile), 1
+        )
+        self.assertEqual(self.strategy.get_claimed(), 0)
+
+    def test_verified_batch_updates_ledger(self):
+        batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet, tx_hash="0x0000000000"
+        )
+        receipt = self.create_pending_claim(amount=100)
+        receipt.batch = batch
+        receipt.save()
+
+        manager = MagicMock()
+        manager.is_tx_verified.return_value = True
+        with patch("faucet.celery_tasks.get_fund_manager", return_value=manager):
+            CeleryTasks.update_pending_batch_with_tx_hash(batch.pk)
+
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.claims_count, 1)
+        self.assertEqual(int(ledger.claimed_amount), 100)
+        self.assertEqual(self.strategy.get_claimed(), 100)
+
+    def test_rejected_claim_frees_round_limit(self):
+        self.create_pending_claim(
+            date=timezone.now()
+            - datetime.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION + 1)
+        )
+        CeleryTasks.reject_expired_pending_claims()
+
+        self.assertEqual(
+            LimitedChainClaimManager.get_total_round_claims(self.user_profile), 0
+        )
+        self.client.force_authenticate(user=self.user_profile.user)
+        response = self.client.get(reverse("FAUCET:remaining-claims"))
+        self.assertEqual(response.data["total_round_claims_remaining"], 5)
+
+    def test_previous_round_claims_are_not_counted(self):
+        last_round = RoundCreditStrategy.get_start_of_the_round() - datetime.timedelta(
+            days=1
+        )
+        receipt = self.create_pending_claim(date=last_round)
+        receipt._status = ClaimReceipt.VERIFIED
+        receipt.save()
+        self.assertEqual(self.strategy.get_claimed(), 0)
+        self.assertEqual(
+            LimitedChainClaimManager.get_total_round_claims(self.user_profile), 0
+        )
+
+    def test_check_and_backfill_commands(self):
+        self.create_pending_claim()
+        self.assertEqual(find_ledger_inconsistencies(), [])
+
+        ClaimLedger.objects.update(claims_count=7)
+        self.assertEqual(len(find_ledger_inconsistencies()), 1)
+        with self.assertRaises(CommandError):
+            call_command("check_claim_ledger", stdout=StringIO())
+
+        call_command("check_claim_ledger", fix=True, stdout=StringIO())
+        self.assertEqual(self.get_ledger().claims_count, 1)
+
+        ClaimLedger.objects.all().delete()
+        call_command("backfill_claim_ledger", stdout=StringIO())
+        self.assertEqual(self.get_ledger().claims_count, 1)
+        self.assertEqual(find_ledger_inconsistencies(), [])
+
+
+class TestClaimBatching(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.idle_faucet = create_test_faucet(self.wallet, chain_id=1338)
+        self.user_profile = create_new_user()
+
+    def test_claim_wakes_up_faucet_batcher(self):
+        manager = SimpleClaimManager(
+            RoundCreditStrategy(self.test_faucet, self.user_profile)
+        )
+        with patch("faucet.tasks.process_faucet_pending_claims.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                manager.create_pending_claim_receipt(100, address)
+
+        delay.assert_called_once_with(self.test_faucet.pk)
+        self.assertTrue(DirtyFaucet.objects.filter(faucet=self.test_faucet).exists())
+
+    def test_batcher_clears_dirty_mark(self):
+        DirtyFaucet.mark(self.test_faucet.pk)
+        receipt = ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            amount=100,
+            datetime=timezone.now(),
+        )
+
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        receipt.refresh_from_db()
+        self.assertIsNotNone(receipt.batch)
+        self.assertFalse(DirtyFaucet.objects.exists())
+
+    def test_claim_marked_while_the_faucet_is_held_is_batched(self):
+        self.test_faucet.max_inflight_batches = 2
+        self.test_faucet.save()
+        receipts = [
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                amount=100,
+                datetime=timezone.now(),
+            )
+        ]
+        DirtyFaucet.mark(self.test_faucet.pk)
+        clear = DirtyFaucet.clear
+
+        def claim_before_the_faucet_is_released(faucet_id, checked_at):
+            if len(receipts) == 1:
+                # its wake up finds the faucet locked and is skipped
+                receipts.append(
+                    ClaimReceipt.objects.create(
+                        faucet=self.test_faucet,
+                        user_profile=self.user_profile,
+                        amount=100,
+                        datetime=timezone.now(),
+                    )
+                )
+                DirtyFaucet.mark(faucet_id)
+            clear(faucet_id, checked_at)
+
+        with patch.object(
+            DirtyFaucet, "clear", side_effect=claim_before_the_faucet_is_released
+        ):
+            self.assertTrue(
+                CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+            )
+
+        for receipt in receipts:
+            receipt.refresh_from_db()
+            self.assertIsNotNone(receipt.batch)
+        self.assertFalse(DirtyFaucet.objects.exists())
+
+    def test_newer_dirty_mark_is_kept(self):
+        checked_at = timezone.now()
+        DirtyFaucet.mark(self.test_faucet.pk)
+        DirtyFaucet.clear(self.test_faucet.pk, checked_at)
+        self.assertTrue(DirtyFaucet.objects.exists())
+
+    def test_sweep_only_wakes_up_faucets_with_work(self):
+        ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            amount=100,
+            datetime=timezone.now(),
+        )
+        with patch("faucet.tasks.process_faucet_pending_claims.delay") as delay:
+            process_pending_claims()
+
+        delay.assert_called_once_with(self.test_faucet.pk)
+
+    def test_batch_is_formed_in_one_statement(self):
+        for _ in range(40):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                amount=100,
+                datetime=timezone.now(),
+            )
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet)
+        with self.assertNumQueries(1):
+            ClaimReceipt.objects.filter(faucet=self.test_faucet).assign_batch(batch, 32)
+        self.assertEqual(ClaimReceipt.objects.filter(batch=None).count(), 8)
+
+    def test_batcher_skips_locked_rows(self):
+        ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            amount=100,
+            datetime=timezone.now(),
+        )
+        with patch.object(
+            QuerySet,
+            "select_for_update",
+            autospec=True,
+            side_effect=QuerySet.select_for_update,
+        ) as select_for_update:
+            CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        # the faucet and its receipts are both locked without waiting
+        self.assertEqual(select_for_update.call_count, 2)
+        for call in select_for_update.call_args_list:
+            self.assertEqual(call.kwargs, {"skip_locked": True})
+
+
+class TestNonceManager(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+        self.web3_utils = MagicMock()
+        self.web3_utils.account.address = fund_manager
+        self.web3_utils.get_transaction_count.return_value = 7
+        self.nonce_manager = NonceManager(self.test_faucet.chain, self.web3_utils)
+
+    def create_batch(self):
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet)
+        self.nonce_manager.get_batch_nonce(batch)
+        batch.refresh_from_db()
+        return batch
+
+    def test_nonces_are_allocated_locally(self):
+        self.assertEqual(self.nonce_manager.allocate(), 7)
+        self.assertEqual(self.nonce_manager.allocate(), 8)
+        self.web3_utils.get_transaction_count.assert_called_once()
+
+    def test_batch_keeps_its_nonce(self):
+        batch = self.create_batch()
+        self.assertEqual(self.nonce_manager.get_batch_nonce(batch), batch.nonce)
+        self.assertEqual(WalletNonce.objects.get().next_nonce, 8)
+
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet)
+        self.nonce_manager.get_batch_nonce(batch)
+        batch.tx_hash = "0x0000000000"
+        batch.save()
+        batch.refresh_from_db()
+        self.assertEqual(batch.nonce, 8)
+
+    def test_reconcile_fills_gap_of_rejected_batch(self):
+        first, second, third = [self.create_batch() for _ in range(3)]
+        second._status = ClaimReceipt.REJECTED
+        second.save()
+
+        self.assertEqual(self.nonce_manager.reconcile(), [second.nonce])
+        self.assertEqual(self.create_batch().nonce, second.nonce)
+        # the nonce of the in-flight third batch is skipped
+        self.assertEqual(self.nonce_manager.allocate(), third.nonce + 1)
+
+    def test_batcher_keeps_pipeline_full(self):
+        self.test_faucet.max_inflight_batches = 3
+        self.test_faucet.save()
+        # room for 32 recipients per batch
+        self.test_faucet.chain.block_gas_limit = 5320000
+        self.test_faucet.chain.save()
+        DirtyFaucet.mark(self.test_faucet.pk)
+        for _ in range(100):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                amount=100,
+                datetime=timezone.now(),
+            )
+
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        # the queue is spread over 4 even batches, 3 of them fit in the pipeline
+        self.assertEqual(self.test_faucet.batches.count(), 3)
+        self.assertEqual(ClaimReceipt.objects.filter(batch=None).count(), 25)
+        batch = self.test_faucet.batches.first()
+        self.assertEqual(batch.size_target, 25)
+        self.assertAlmostEqual(batch.fill_ratio, 25 / 32)
+        self.assertTrue(DirtyFaucet.objects.exists())
+
+
+class TestBatchSizer(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.sizer = BatchSizer(self.test_faucet)
+
+    def test_capacity_follows_measured_gas(self):
+        default_capacity = self.sizer.get_capacity()
+
+        batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet,
+            gas_estimate=BatchSizer.BASE_GAS + 2 * 80000,
+        )
+        for _ in range(2):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                amount=100,
+                datetime=timezone.now(),
+                batch=batch,
+            )
+
+        self.assertEqual(self.sizer.get_gas_per_recipient(), 80000)
+        self.assertLess(self.sizer.get_capacity(), default_capacity)
+
+        self.test_faucet.chain.block_gas_limit = 1
+        self.assertEqual(self.sizer.get_capacity(), 1)
+
+    def test_queue_depth_sets_batch_size(self):
+        # a shallow queue goes out at once, a deep one is spread evenly
+        self.assertEqual(self.sizer.get_size(5, capacity=32), 5)
+        self.assertEqual(self.sizer.get_size(32, capacity=32), 32)
+        self.assertEqual(self.sizer.get_size(40, capacity=32), 20)
+        self.assertEqual(self.sizer.get_size(1000, capacity=32), 32)
+
+    def test_lightning_pays_one_invoice_per_batch(self):
+        self.test_faucet.chain.chain_type = NetworkTypes.LIGHTNING
+        self.assertEqual(self.sizer.get_size(10), 1)
+
+
+class TestSolanaLockAccountCache(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.test_faucet.fund_manager_address = str(Pubkey.default())
+        self.client = MagicMock()
+        self.pool_patcher = patch(
+            "faucet.faucet_manager.fund_manager.SolanaClientPool.get",
+            return_value=self.client,
+        )
+        self.pool_patcher.start()
+        self.decode_patcher = patch(
+            "faucet.faucet_manager.fund_manager.LockAccount.decode",
+            return_value=MagicMock(initialized=True),
+        )
+        self.decode_patcher.start()
+        SolanaFundManager._lock_accounts.clear()
+
+    def tearDown(self):
+        self.pool_patcher.stop()
+        self.decode_patcher.stop()
+        SolanaFundManager._lock_accounts.clear()
+
+    def test_lock_account_is_fetched_once(self):
+        manager = SolanaFundManager(self.test_faucet)
+        self.assertTrue(manager.is_initialized)
+        manager.operator
+        manager.owner
+        SolanaFundManager(self.test_faucet).lock_account
+        self.client.get_account_info.assert_called_once()
+
+
+class TestBatchConfirmationTracker(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet, tx_hash="0x0000000000"
+        )
+
+    def check_batch(self, verified=False):
+        manager = MagicMock()
+        manager.is_tx_verified.return_value = verified
+        with patch("faucet.celery_tasks.get_fund_manager", return_value=manager):
+            CeleryTasks.update_pending_batch_with_tx_hash(self.batch.pk)
+        self.batch.refresh_from_db()
+
+    def test_unmined_tx_is_checked_again_later(self):
+        self.check_batch()
+
+        self.assertEqual(self.batch._status, ClaimReceipt.PENDING)
+        self.assertEqual(self.batch.checks_count, 1)
+        self.assertGreater(self.batch.next_check_at, timezone.now())
+        with (
+            patch("faucet.tasks.update_pending_batch_with_tx_hash.delay") as delay,
+            patch("faucet.tasks.update_pending_batches_in_bulk.delay"),
+        ):
+            update_pending_batches_with_tx_hash_status()
+        delay.assert_not_called()
+
+        self.check_batch(verified=True)
+        self.assertEqual(self.batch._status, ClaimReceipt.VERIFIED)
+
+    def test_checks_back_off_with_tx_age(self):
+        self.batch.schedule_next_check()
+        fresh_delay = self.batch.next_check_at - timezone.now()
+        self.assertLessEqual(
+            fresh_delay.total_seconds(), self.test_faucet.chain.block_time
+        )
+
+        self.batch.datetime = timezone.now() - datetime.timedelta(hours=1)
+        self.batch.schedule_next_check()
+        old_delay = self.batch.next_check_at - timezone.now()
+        self.assertGreater(old_delay, fresh_delay)
+        self.assertLessEqual(
+            old_delay.total_seconds(), TransactionBatch.MAX_CHECK_INTERVAL
+        )
+
+    def test_evm_receipt_is_not_waited_on(self):
+        manager = MagicMock()
+        manager.web3_utils.get_transaction_receipt.side_effect = (
+            web3.exceptions.TransactionNotFound("not found")
+        )
+        self.assertIsNone(EVMFundManager.get_tx_receipt(manager, "0x0000000000"))
+        manager.web3_utils.wait_for_transaction_receipt.assert_not_called()
+
+        manager.get_tx_receipt.return_value = None
+        self.assertFalse(EVMFundManager.is_tx_verified(manager, "0x0000000000"))
+
+
+class TestSolanaBatchConfirmation(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.test_faucet.chain.chain_type = NetworkTypes.SOLANA
+        self.test_faucet.chain.save()
+        self.signatures = [str(Signature.new_unique()) for _ in range(3)]
+        self.batches = [
+            TransactionBatch.objects.create(faucet=self.test_faucet, tx_hash=s)
+            for s in self.signatures
+        ]
+        self.user_profile = create_new_user()
+        self.claim = ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            datetime=timezone.now(),
+            amount=100,
+            batch=self.batches[0],
+        )
+
+    def test_signature_statuses_are_fetched_in_one_call(self):
+        confirmed = MagicMock(
+            confirmation_status=TransactionConfirmationStatus.Confirmed
+        )
+        client = MagicMock()
+        client.get_signature_statuses.return_value.value = [confirmed, None, None]
+        self.batches[1].datetime = timezone.now() - datetime.timedelta(days=1)
+        self.batches[1].save()
+
+        with patch(
+            "faucet.faucet_manager.fund_manager.SolanaClientPool.get",
+            return_value=client,
+        ):
+            resolved = CeleryTasks.update_pending_batches_in_bulk()
+
+        client.get_signature_statuses.assert_called_once()
+        self.assertEqual(set(resolved), {self.batches[0].pk, self.batches[1].pk})
+        for batch in self.batches:
+            batch.refresh_from_db()
+        self.assertEqual(self.batches[0]._status, ClaimReceipt.VERIFIED)
+        self.assertEqual(self.batches[1]._status, ClaimReceipt.REJECTED)
+        self.assertEqual(self.batches[2]._status, ClaimReceipt.PENDING)
+        self.assertIsNotNone(self.batches[2].next_check_at)
+        self.claim.refresh_from_db()
+        self.assertEqual(self.claim._status, ClaimReceipt.VERIFIED)
+
+    def test_bulk_confirmed_batches_skip_per_batch_tasks(self):
+        with (
+            patch("faucet.tasks.update_pending_batch_with_tx_hash.delay") as delay,
+            patch("faucet.tasks.update_pending_batches_in_bulk.delay") as bulk_delay,
+        ):
+            update_pending_batches_with_tx_hash_status()
+        delay.assert_not_called()
+        bulk_delay.assert_called_once()
+
+
+class TestBatchedReceiptLookups(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.test_faucet.chain.is_testnet = True
+        self.test_faucet.chain.save()
+        self.user_profile = create_new_user()
+        Wallet.objects.create(
+            user_profile=self.user_profile,
+            wallet_type=NetworkTypes.EVM,
+            address=address,
+        )
+        self.manager = MagicMock()
+        self.manager.web3_utils.w3 = Web3()
+        self.manager.get_fund_manager_checksum_address.return_value = fund_manager
+        self.manager.from_wei.return_value = 1
+
+    def respond(self, results):
+        self.payloads = []
+
+        def post(client, payload):
+            self.payloads.append(payload)
+            return [
+                {"jsonrpc": "2.0", "id": call["id"], **results(call)}
+                for call in payload
+            ]
+
+        return patch.object(Web3BatchClient, "post", post)
+
+    def test_evm_batches_are_verified_with_one_request(self):
+        hashes = ["0x" + f"{i:064x}" for i in range(3)]
+        statuses = {hashes[0]: {"status": "0x1"}, hashes[1]: {"status": "0x0"}}
+
+        with self.respond(lambda call: {"result": statuses.get(call["params"][0])}):
+            verified = EVMFundManager.get_verified_tx_hashes(self.manager, hashes)
+        self.assertEqual(verified, {hashes[0]})
+        self.assertEqual(len(self.payloads), 1)
+
+    def test_pending_donations_are_checked_in_bulk(self):
+        receipts = [
+            DonationReceipt.objects.create(
+                user_profile=self.user_profile,
+                faucet=self.test_faucet,
+                tx_hash="0x" + f"{i:064x}",
+            )
+            for i in range(3)
+        ]
+
+        def results(call):
+            tx_hash = call["params"][0]
+            if tx_hash == receipts[2].tx_hash:
+                return {"error": {"code": -32005, "message": "rate limited"}}
+            if call["method"] == "eth_getTransactionReceipt":
+                ok = tx_hash == receipts[0].tx_hash
+                return {"result": {"status": "0x1" if ok else "0x0"}}
+            return {"result": {"from": address, "to": fund_manager, "value": "0x1"}}
+
+        with (
+            patch("faucet.celery_tasks.get_fund_manager", return_value=self.manager),
+            self.respond(results),
+        ):
+            CeleryTasks.update_pending_donation_receipts()
+
+        # txs and receipts of all donations in one round trip
+        self.assertEqual(len(self.payloads), 1)
+        self.assertEqual(len(self.payloads[0]), 6)
+        for receipt in receipts:
+            receipt.refresh_from_db()
+        self.assertEqual(receipts[0].status, ClaimReceipt.VERIFIED)
+        self.assertEqual(receipts[1].status, ClaimReceipt.REJECTED)
+        # a failed lookup is checked again on the next run
+        self.assertEqual(receipts[2].status, ClaimReceipt.PENDING)
+
+    def test_unmined_donations_are_left_pending(self):
+        donation = DonationReceipt.objects.create(
+            user_profile=self.user_profile,
+            faucet=self.test_faucet,
+            tx_hash="0x" + f"{0:064x}",
+        )
+
+        def results(call):
+            if call["method"] == "eth_getTransactionReceipt":
+                return {"result": None}
+            return {"result": {"from": address, "to": fund_manager, "value": "0x1"}}
+
+        with (
+            patch("faucet.celery_tasks.get_fund_manager", return_value=self.manager),
+            self.respond(results),
+        ):
+            CeleryTasks.update_pending_donation_receipts()
+            donation.refresh_from_db()
+            self.assertEqual(donation.status, ClaimReceipt.PENDING)
+
+            DonationReceipt.objects.filter(pk=donation.pk).update(
+                datetime=timezone.now()
+                - datetime.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION + 1)
+            )
+            CeleryTasks.update_pending_donation_receipts()
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, ClaimReceipt.REJECTED)
+
+    def test_unmined_donation_is_left_pending(self):
+        donation = DonationReceipt.objects.create(
+            user_profile=self.user_profile,
+            faucet=self.test_faucet,
+            tx_hash="0x" + f"{0:064x}",
+        )
+        self.manager.get_tx_receipt.return_value = None
+
+        with patch("faucet.celery_tasks.get_fund_manager", return_value=self.manager):
+            CeleryTasks.process_donation_receipt(donation.pk)
+            donation.refresh_from_db()
+            self.assertEqual(donation.status, ClaimReceipt.PENDING)
+
+            # a tx that is never mined is rejected once the donation expires
+            DonationReceipt.objects.filter(pk=donation.pk).update(
+                datetime=timezone.now()
+                - datetime.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION + 1)
+            )
+            CeleryTasks.process_donation_receipt(donation.pk)
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, ClaimReceipt.REJECTED)
+        self.manager.get_tx.assert_not_called()
+
+
+class TestLNPayClient(APITestCase):
+    def tearDown(self):
+        LNPayClient.clear()
+
+    def test_clients_keep_their_own_credentials(self):
+        clients = [
+            LNPayClient(LIGHTNING_RPC_URL, f"pak_{i}", f"wak_{i}") for i in range(2)
+        ]
+        session = LNPayClient.get_session(LIGHTNING_RPC_URL)
+        for client in clients:
+            self.assertIs(LNPayClient.get_session(client.api_url), session)
+
+        with patch.object(session, "get") as get:
+            get.return_value.json.return_value = {"balance": 10}
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                balances = list(executor.map(lambda c: c.get_balance(), clients))
+
+        self.assertEqual(balances, [10, 10])
+        sent = {
+            call.kwargs["url"]: call.kwargs["headers"]["X-Api-Key"]
+            for call in get.call_args_list
+        }
+        self.assertEqual(
+            sent,
+            {
+                LIGHTNING_RPC_URL + "wallet/wak_0": "pak_0",
+                LIGHTNING_RPC_URL + "wallet/wak_1": "pak_1",
+            },
+        )
+        self.assertTrue(all(call.kwargs["timeout"] for call in get.call_args_list))
+
+    def test_payments_are_not_retried(self):
+        adapter = LNPayClient.get_session(LIGHTNING_RPC_URL).get_adapter(
+            LIGHTNING_RPC_URL
+        )
+        self.assertFalse(adapter.max_retries.is_retry("POST", 503))
+        self.assertTrue(adapter.max_retries.is_retry("GET", 503))
+
+
+class TestBalanceSnapshot(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.second_faucet = Faucet.objects.create(
+            chain=self.test_faucet.chain,
+            max_claim_amount=t_chain_max,
+            fund_manager_address=fund_manager,
+        )
+
+    def sweep(self, manager_delay=0, timeout=BalanceSweeper.TIMEOUT):
+        calls = []
+
+        async def get_balance(sweeper, obj):
+            calls.append(obj)
+            await asyncio.sleep(manager_delay)
+            return int(1e18)
+
+        async def get_gas_price(sweeper, chain):
+            return 1
+
+        with (
+            patch.object(BalanceSweeper, "get_manager_balance", get_balance),
+            patch.object(BalanceSweeper, "get_wallet_balance", get_balance),
+            patch.object(BalanceSweeper, "get_gas_price", get_gas_price),
+            patch.object(BalanceSweeper, "TIMEOUT", timeout),
+        ):
+            CeleryTasks.update_balance_snapshots()
+        return calls
+
+    def test_collector_reads_wallet_once_per_chain(self):
+        calls = self.sweep()
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls.count(self.test_faucet.chain), 1)
+        self.assertEqual(FaucetBalanceSnapshot.objects.count(), 2)
+        self.test_faucet.refresh_from_db()
+        self.assertFalse(self.test_faucet.needs_funding)
+
+        # the next sweep updates the same snapshots
+        self.sweep()
+        self.assertEqual(FaucetBalanceSnapshot.objects.count(), 2)
+
+    def test_faucets_are_swept_in_parallel(self):
+        start = time.monotonic()
+        self.sweep(manager_delay=0.2)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_hung_rpc_counts_as_empty_balance(self):
+        self.sweep(manager_delay=1, timeout=0.05)
+
+        snapshot = FaucetBalanceSnapshot.objects.get(faucet=self.test_faucet)
+        self.assertEqual(int(snapshot.contract_balance), 0)
+        self.test_faucet.refresh_from_db()
+        self.assertTrue(self.test_faucet.needs_funding)
+
+    def test_sweep_session_is_not_cached_by_web3(self):
+        async def rpc(request):
+            body = await request.json()
+            return web.json_response(
+                {"jsonrpc": "2.0", "id": body["id"], "result": "0x5"}
+            )
+
+        async def read_gas_price():
+            app = web.Application()
+            app.router.add_post("/", rpc)
+            async with TestServer(app) as server, aiohttp.ClientSession() as session:
+                sweeper = BalanceSweeper([])
+                sweeper.session = session
+                return await sweeper.get_web3(str(server.make_url("/"))).eth.gas_price
+
+        cached_sessions = len(web3._utils.request._async_session_cache)
+        self.assertEqual(asyncio.run(read_gas_price()), 5)
+        self.assertEqual(len(web3._utils.request._async_session_cache), cached_sessions)
+
+    @patch("faucet.models.Faucet.get_manager_balance", side_effect=AssertionError)
+    @patch("core.models.Chain.get_wallet_balance", side_effect=AssertionError)
+    def test_balance_view_serves_snapshot(self, *args):
+        FaucetBalanceSnapshot.objects.create(
+            faucet=self.test_faucet,
+            contract_balance=100,
+            wallet_balance=200,
+            has_enough_funds=False,
+            has_enough_fees=True,
+            updated_at=timezone.now() - datetime.timedelta(seconds=30),
+        )
+        endpoint = reverse(
+            "FAUCET:faucet-balance", kwargs={"faucet_pk": self.test_faucet.pk}
+        )
+
+        response = self.client.get(endpoint)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response.data["contract_balance"]), 100)
+        self.assertEqual(int(response.data["wallet_balance"]), 200)
+        self.assertFalse(response.data["has_enough_funds"])
+        self.assertGreaterEqual(response.data["balance_age"], 30)
+
+
+@skipUnless(connection.vendor == "postgresql", "SKIP LOCKED needs postgres")
+class TestConcurrentClaimBatching(TransactionTestCase):
+    workers = 4
+
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+        for _ in range(50):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                amount=100,
+                datetime=timezone.now(),
+            )
+
+    def assign_batch(self):
+        with transaction.atomic():
+            batch = TransactionBatch.objects.create(faucet=self.test_faucet)
+            if ClaimReceipt.objects.filter(faucet=self.test_faucet).assign_batch(
+                batch, 8
+            ):
+                return True
+            batch.delete()
+            return False
+
+    def assign_batches(self, barrier):
+        try:
+            barrier.wait()
+            while self.assign_batch():
+                pass
+        finally:
+            connection.close()
+
+    def test_no_receipt_lands_in_two_batches(self):
+        barrier = threading.Barrier(self.workers)
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = [
+                executor.submit(self.assign_batches, barrier)
+                for _ in range(self.workers)
+            ]
+        for f in futures:
+            f.result()
+
+        self.assertFalse(ClaimReceipt.objects.filter(batch=None).exists())
+        batch_sizes = TransactionBatch.objects.annotate(
+            receipts_count=Count("claims")
+        ).values_list("receipts_count", flat=True)
+        self.assertEqual(sum(batch_sizes), 50)
+        self.assertTrue(all(0 < size <= 8 for size in batch_sizes))
+
+    def test_locked_faucet_is_skipped(self):
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_faucet():
+            try:
+                with transaction.atomic():
+                    Faucet.objects.select_for_update().get(pk=self.test_faucet.pk)
+                    locked.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(1) as executor:
+            holder = executor.submit(hold_faucet)
+            self.assertTrue(locked.wait(5))
+            try:
+                self.assertFalse(
+                    CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+                )
+            finally:
+                release.set()
+            holder.result()
+
+        self.assertEqual(ClaimReceipt.objects.filter(batch=None).count(), 50)
+        self.assertTrue(CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class TestConstraints(APITestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.wallet = WalletAccount.objects.create(
             name="Test Wallet", private_key=test_wallet_key
         )
@@ -594,6 +1679,51 @@ class TestConstraints(APITestCase):
         )
         self.assertTrue(constraint.is_observed())
 
+    @patch("faucet.constraints.requests.get")
+    def test_claiming_gas_first_txs_are_stored(self, get_mock: MagicMock):
+        def explorer(url, timeout):
+            self.assertEqual(timeout, EvmClaimingGasConstraint.EXPLORER_TIMEOUT)
+            tx = {
+                "hash": "0x1",
+                "from": "0xb3a97684eb67182baa7994b226e6315196d8b364",
+                "isError": "0",
+                "blockNumber": "10",
+            }
+            if "action=txlist&" in url:
+                tx = {**tx, "hash": "0x2", "blockNumber": "12"}
+            response = {"status": "1", "result": [tx]}
+            return MagicMock(json=MagicMock(return_value=response))
+
+        get_mock.side_effect = explorer
+        constraint = OptimismClaimingGasConstraint(self.user_profile)
+        self.assertTrue(constraint.is_observed())
+        self.assertEqual(get_mock.call_count, 2)
+
+        self.assertTrue(OptimismClaimingGasConstraint(self.user_profile).is_observed())
+        self.assertEqual(get_mock.call_count, 2)
+        record = AddressFirstTransactions.objects.get(chain=self.optimism_chain)
+        self.assertEqual(record.first_tx["hash"], "0x2")
+
+    @patch("faucet.constraints.requests.get")
+    def test_claiming_gas_missing_tx_is_remembered(self, get_mock: MagicMock):
+        get_mock.return_value = MagicMock(
+            json=MagicMock(return_value={"status": "0", "result": []})
+        )
+        self.assertFalse(OptimismClaimingGasConstraint(self.user_profile).is_observed())
+        self.assertFalse(OptimismClaimingGasConstraint(self.user_profile).is_observed())
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertFalse(AddressFirstTransactions.objects.exists())
+
+    @patch("faucet.constraints.requests.get")
+    def test_claiming_gas_explorer_errors_are_not_cached(self, get_mock: MagicMock):
+        get_mock.return_value = MagicMock(
+            json=MagicMock(return_value={"status": "0", "result": "Rate limit"})
+        )
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                OptimismClaimingGasConstraint(self.user_profile).is_observed_cached()
+        self.assertEqual(get_mock.call_count, 2)
+
     # def test_optimism_claiming_gas_contraint(self):
     #     constraint = OptimismClaimingGasConstraint(self.user_profile)
     #     self.assertTrue(constraint.is_observed())
@@ -605,8 +1735,150 @@ class TestConstraints(APITestCase):
     #     self.assertFalse(constraint.is_observed())
 
 
+class TestLeaderboard(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+        self.other_user = create_new_user("0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F3")
+        self.client.force_authenticate(user=self.user_profile.user)
+
+    def donate(self, user_profile, tx_hash, total_price):
+        donation = DonationReceipt.objects.create(
+            user_profile=user_profile,
+            tx_hash=tx_hash,
+            faucet=self.test_faucet,
+            value=total_price,
+            total_price=total_price,
+            status=ClaimReceipt.VERIFIED,
+        )
+        record_donation(donation)
+        return donation
+
+    def get_ranks(self, faucet=None):
+        return dict(
+            LeaderboardEntry.objects.filter(faucet=faucet).values_list(
+                "user_profile", "rank"
+            )
+        )
+
+    def test_ranks_are_updated_incrementally(self):
+        self.donate(self.user_profile, "0x0", 10)
+        self.donate(self.other_user, "0x1", 20)
+        self.assertEqual(
+            self.get_ranks(), {self.other_user.pk: 1, self.user_profile.pk: 2}
+        )
+
+        self.donate(self.user_profile, "0x2", 15)
+        self.assertEqual(
+            self.get_ranks(), {self.user_profile.pk: 1, self.other_user.pk: 2}
+        )
+        self.assertEqual(self.get_ranks(self.test_faucet), self.get_ranks())
+        entry = LeaderboardEntry.objects.get(
+            faucet__isnull=True, user_profile=self.user_profile
+        )
+        self.assertEqual(entry.sum_total_price, 25)
+        self.assertEqual(entry.interacted_chains, [self.test_faucet.chain_id])
+
+    def test_rebuild_matches_incremental_updates(self):
+        self.donate(self.user_profile, "0x0", 10)
+        self.donate(self.other_user, "0x1", 10)
+        ranks = self.get_ranks()
+        self.assertEqual(ranks, {self.user_profile.pk: 1, self.other_user.pk: 1})
+
+        self.assertEqual(rebuild_leaderboard(), 4)
+        self.assertEqual(self.get_ranks(), ranks)
+
+    def test_totals_are_exact(self):
+        self.donate(self.user_profile, "0x0", Decimal("0.1"))
+        self.donate(self.user_profile, "0x1", Decimal("0.2"))
+        entry = LeaderboardEntry.objects.get(
+            faucet__isnull=True, user_profile=self.user_profile
+        )
+        self.assertEqual(entry.sum_total_price, Decimal("0.3"))
+
+    def test_leaderboard_views(self):
+        self.donate(self.user_profile, "0x0", 10)
+        self.donate(self.other_user, "0x1", 20)
+
+        res = self.client.get(reverse("FAUCET:gas-tap-leaderboard"))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [r["username"] for r in res.data["results"]],
+            [self.other_user.username, self.user_profile.username],
+        )
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(res.json()["results"][0]["sumTotalPrice"], 20.0)
+
+        res = self.client.get(
+            reverse("FAUCET:gas-tap-leaderboard-cursor"), {"page_size": 1}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r["rank"] for r in res.data["results"]], [1])
+        res = self.client.get(res.data["next"])
+        self.assertEqual([r["rank"] for r in res.data["results"]], [2])
+
+        res = self.client.get(
+            reverse("FAUCET:user-gas-tap-leaderboard"),
+            {"faucet_pk": self.test_faucet.pk},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["rank"], 2)
+
+
+@skipUnless(connection.vendor == "postgresql", "sqlite serializes every writer")
+class TestConcurrentLeaderboardUpdates(TransactionTestCase):
+    workers = 6
+
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.donations = [
+            DonationReceipt.objects.create(
+                user_profile=create_new_user("0x" + f"{i:040x}"),
+                tx_hash=f"0x{i}",
+                faucet=self.test_faucet,
+                total_price=i,
+                status=ClaimReceipt.VERIFIED,
+            )
+            for i in range(1, self.workers + 1)
+        ]
+
+    def record(self, barrier, donation):
+        try:
+            barrier.wait()
+            record_donation(donation)
+        finally:
+            connection.close()
+
+    def test_concurrent_donors_get_distinct_ranks(self):
+        barrier = threading.Barrier(self.workers)
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = [
+                executor.submit(self.record, barrier, donation)
+                for donation in self.donations
+            ]
+        for f in futures:
+            f.result()
+
+        for faucet in [None, self.test_faucet]:
+            ranks = LeaderboardEntry.objects.filter(faucet=faucet).order_by(
+                "-sum_total_price"
+            )
+            self.assertEqual(
+                list(ranks.values_list("rank", flat=True)),
+                list(range(1, self.workers + 1)),
+            )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class TestFuelChampion(APITestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.wallet = WalletAccount.objects.create(
             name="Test Wallet", private_key=test_wallet_key
         )
@@ -624,7 +1896,7 @@ class TestFuelChampion(APITestCase):
         self.client.force_authenticate(user=self.user_profile.user)
 
     def test_get_unverified_fuel_champion(self):
-        cache.delete("FuelChampionQuerySet")
+        cache.delete(get_cache_key(RoundCreditStrategy.get_start_of_the_round()))
         endpoint = reverse("FAUCET:gas-tap-fuel-champion")
         DonationReceipt.objects.create(
             user_profile=self.user_profile,
@@ -637,7 +1909,7 @@ class TestFuelChampion(APITestCase):
         self.assertEqual(len(res.data), 0)
 
     def test_get_verified_fuel_champion(self):
-        cache.delete("FuelChampionQuerySet")
+        cache.delete(get_cache_key(RoundCreditStrategy.get_start_of_the_round()))
         endpoint = reverse("FAUCET:gas-tap-fuel-champion")
         DonationReceipt.objects.create(
             user_profile=self.user_profile,
@@ -651,7 +1923,7 @@ class TestFuelChampion(APITestCase):
         self.assertEqual(len(res.data), 1)
 
     def test_get_fuel_champion_when_two_person_had_donation(self):
-        cache.delete("FuelChampionQuerySet")
+        cache.delete(get_cache_key(RoundCreditStrategy.get_start_of_the_round()))
         endpoint = reverse("FAUCET:gas-tap-fuel-champion")
         DonationReceipt.objects.create(
             user_profile=self.user_profile,
@@ -679,3 +1951,28 @@ class TestFuelChampion(APITestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[-1].get("username", 0), self.user_profile.username)
+
+    def test_champions_are_served_from_cache(self):
+        cache.delete(get_cache_key(RoundCreditStrategy.get_start_of_the_round()))
+        self.assertEqual(get_fuel_champions(), [])
+        donation = DonationReceipt.objects.create(
+            user_profile=self.user_profile,
+            tx_hash="0x0",
+            faucet=self.test_faucet,
+            value=10,
+            status=ClaimReceipt.VERIFIED,
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_fuel_champions(), [])
+
+        update_fuel_champions(donation)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_fuel_champions(),
+                [
+                    {
+                        "faucet_pk": self.test_faucet.pk,
+                        "username": self.user_profile.username,
+                    }
+                ],
+            )
@@ -12,6 +12,7 @@ from faucet.views import (
     GetTotalRoundClaimsRemainingView,
     GlobalSettingsView,
     LastClaimView,
+    LeaderboardCursorView,
     LeaderboardView,
     ListClaims,
     ListOneTimeClaims,
@@ -67,6 +68,11 @@ urlpatterns = [
     ),
     path("user/donation/", DonationReceiptView.as_view(), name="donation-receipt"),
     path("leaderboard/", LeaderboardView.as_view(), name="gas-tap-leaderboard"),
+    path(
+        "leaderboard/cursor/",
+        LeaderboardCursorView.as_view(),
+        name="gas-tap-leaderboard-cursor",
+    ),
     path(
         "fuel-champion/",
         FuelChampionView.as_view(),
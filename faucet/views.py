@@ -5,10 +5,6 @@ import os
 import pytz
 import rest_framework.exceptions
 from django.conf import settings
-from django.contrib.postgres.expressions import ArraySubquery
-from django.core.cache import cache
-from django.db.models import F, FloatField, OuterRef, Subquery, Sum
-from django.db.models.functions import Cast
 from django.http import FileResponse, Http404, HttpResponse
 from django.urls import reverse
 from rest_framework.generics import (
@@ -23,15 +19,22 @@ from rest_framework.views import APIView
 
 from authentication.models import UserProfile
 from core.filters import IsOwnerFilterBackend
-from core.paginations import StandardResultsSetPagination
+from core.paginations import RankCursorPagination, StandardResultsSetPagination
 from core.validators import address_validator
 from faucet.faucet_manager.claim_manager import (
     ClaimManagerFactory,
     LimitedChainClaimManager,
 )
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
-from faucet.filters import FaucetFilterBackend
-from faucet.models import ClaimReceipt, DonationReceipt, Faucet, GlobalSettings
+from faucet.faucet_manager.fuel_champion import get_fuel_champions
+from faucet.filters import FaucetFilterBackend, LeaderboardFilterBackend
+from faucet.models import (
+    ClaimReceipt,
+    DonationReceipt,
+    Faucet,
+    GlobalSettings,
+    LeaderboardEntry,
+)
 from faucet.serializers import (
     DonationReceiptSerializer,
     FaucetBalanceSerializer,
@@ -135,12 +138,12 @@ class FaucetListView(ListAPIView):
     serializer_class = FaucetSerializer
 
     def get_queryset(self):
-        queryset = Faucet.objects.filter(is_active=True, show_in_gastap=True)
-
-        sorted_queryset = sorted(
-            queryset, key=lambda obj: obj.total_claims_since_last_round, reverse=True
+        return (
+            Faucet.objects.filter(is_active=True, show_in_gastap=True)
+            .select_related("chain")
+            .with_claim_counters()
+            .order_by("-annotated_total_claims_since_last_round", "pk")
         )
-        return sorted_queryset
 
 
 class SmallFaucetListView(ListAPIView):
@@ -229,7 +232,9 @@ class FaucetBalanceView(RetrieveAPIView):
         faucet_pk = self.kwargs.get("faucet_pk", None)
         if faucet_pk is None:
             raise Http404("Faucet ID not provided")
-        return Faucet.objects.get(pk=faucet_pk)
+        return Faucet.objects.select_related("chain__wallet", "balance_snapshot").get(
+            pk=faucet_pk
+        )
 
 
 class DonationReceiptView(ListCreateAPIView):
@@ -251,9 +256,9 @@ class DonationReceiptView(ListCreateAPIView):
 
 
 class UserLeaderboardView(RetrieveAPIView):
-    filter_backends = [FaucetFilterBackend]
+    filter_backends = [LeaderboardFilterBackend]
     permission_classes = [IsAuthenticated]
-    queryset = DonationReceipt.objects.all()
+    queryset = LeaderboardEntry.objects.all()
     serializer_class = LeaderboardSerializer
 
     def get_user(self) -> UserProfile:
@@ -261,101 +266,30 @@ class UserLeaderboardView(RetrieveAPIView):
 
     def get_object(self):
         queryset = self.filter_queryset(self.get_queryset())
-        queryset = (
-            queryset.filter(status=ClaimReceipt.VERIFIED)
-            .annotate(total_price_float=Cast("total_price", FloatField()))
-            .values("user_profile")
-            .annotate(sum_total_price=Sum("total_price_float"))
-        )
-        user_obj = get_object_or_404(queryset, user_profile=self.get_user().pk)
-        user_rank = (
-            queryset.filter(sum_total_price__gt=user_obj.get("sum_total_price")).count()
-            + 1
-        )
-        user_obj["rank"] = user_rank
-        user_obj["username"] = self.get_user().username
-        interacted_chains = list(
-            DonationReceipt.objects.filter(user_profile=self.get_user())
-            .filter(status=ClaimReceipt.VERIFIED)
-            .values_list("faucet__chain", flat=True)  # TODO fixme
-            .distinct()
-        )
-        user_obj["interacted_chains"] = interacted_chains
-
-        return user_obj
+        return get_object_or_404(queryset, user_profile=self.get_user())
 
 
 class LeaderboardView(ListAPIView):
     serializer_class = LeaderboardSerializer
     pagination_class = StandardResultsSetPagination
-    queryset = DonationReceipt.objects.all()
-    filter_backends = [FaucetFilterBackend]
+    queryset = LeaderboardEntry.objects.order_by("rank", "id")
+    filter_backends = [LeaderboardFilterBackend]
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        donation_receipt = (
-            queryset.filter(status=ClaimReceipt.VERIFIED)
-            .annotate(total_price_float=Cast("total_price", FloatField()))
-            .values("user_profile")
-            .annotate(sum_total_price=Sum("total_price_float"))
-            .order_by("-sum_total_price")
-        )
-        subquery_interacted_chains = (
-            DonationReceipt.objects.filter(user_profile=OuterRef("user_profile"))
-            .filter(status=ClaimReceipt.VERIFIED)
-            .values_list("faucet__chain", flat=True)
-            .distinct()
-        )
-        queryset = donation_receipt.annotate(
-            interacted_chains=ArraySubquery(subquery_interacted_chains)
-        )
-        subquery_username = UserProfile.objects.filter(
-            pk=OuterRef("user_profile")
-        ).values("username")
-        queryset = queryset.annotate(username=Subquery(subquery_username))
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+class LeaderboardCursorView(LeaderboardView):
+    """
+    the leaderboard paged with a cursor instead of page numbers, deep pages
+    cost the same as the first one
+    """
+
+    pagination_class = RankCursorPagination
 
 
 class FuelChampionView(ListAPIView):
     serializer_class = FuelChampionSerializer
 
     def get_queryset(self):
-        queryset = cache.get("FuelChampionQuerySet")
-        if queryset is not None:
-            return queryset
-        round_datetime = RoundCreditStrategy.get_start_of_the_round()
-        subquery_user_profile = (
-            DonationReceipt.objects.filter(status=ClaimReceipt.VERIFIED)
-            .filter(datetime__gt=round_datetime)
-            .filter(faucet=OuterRef("faucet"))
-            .annotate(float_value=Cast("value", FloatField()))
-            .values("user_profile", "faucet")
-            .annotate(value=Sum("float_value"))
-            .order_by("-value")
-            .values("user_profile")[:1]
-        )
-        username_subquery = UserProfile.objects.filter(
-            pk=OuterRef("user_profile")
-        ).values("username")
-        queryset = (
-            DonationReceipt.objects.values("faucet", "user_profile")
-            .annotate(max_user_profile=Subquery(subquery_user_profile))
-            .filter(max_user_profile__isnull=False)
-            .filter(user_profile=F("max_user_profile"))
-            .annotate(faucet_pk=F("faucet"))
-            .annotate(username=username_subquery)
-            .values("faucet_pk", "username")
-            .distinct()
-        )
-
-        cache.set("FuelChampionQuerySet", queryset, timeout=120)
-        return queryset
+        return get_fuel_champions()
 
 
 def artwork_video(request):
@@ -4,9 +4,11 @@ import time
 import requests
 from celery import shared_task
 from django.utils import timezone
+from web3.exceptions import TransactionNotFound
 
 from brightIDfaucet.settings import DEPLOYMENT_ENV
 from core.helpers import memcache_lock
+from core.utils import Web3BatchClient, Web3Utils
 
 from .models import Raffle
 from .utils import PrizetapContractClient, VRFClientContractClient
@@ -159,6 +161,25 @@ def request_random_words(raffle: Raffle):
         raffle.save()
 
 
+def get_raffle_receipts(raffles):
+    """
+    {tx hash: receipt} of the raffles, one batched rpc call per chain
+    """
+    raffles_by_chain = {}
+    for raffle in raffles:
+        raffles_by_chain.setdefault(raffle.chain_id, []).append(raffle)
+    receipts = {}
+    for chain_raffles in raffles_by_chain.values():
+        chain = chain_raffles[0].chain
+        client = Web3BatchClient(Web3Utils(chain.rpc_url_private, chain.poa))
+        receipts.update(
+            client.get_transaction_receipts(
+                list({raffle.tx_hash for raffle in chain_raffles})
+            )
+        )
+    return receipts
+
+
 @shared_task(bind=True)
 def set_raffle_ids(self):
     id = f"{self.name}-LOCK"
@@ -174,14 +195,17 @@ def set_raffle_ids(self):
             .order_by("id")
         )
         if raffles_queryset.count() > 0:
+            receipts = get_raffle_receipts(raffles_queryset)
             for raffle in raffles_queryset:
                 try:
                     print(f"Setting the raffle {raffle.name} raffleId")
                     contract_client = PrizetapContractClient(raffle)
 
-                    receipt = contract_client.web3_utils.get_transaction_receipt(
-                        raffle.tx_hash
-                    )
+                    receipt = receipts[raffle.tx_hash]
+                    if isinstance(receipt, Exception):
+                        raise receipt
+                    if receipt is None:
+                        raise TransactionNotFound(f"Raffle {raffle.pk} tx not found")
                     log = contract_client.get_raffle_created_log(receipt)
 
                     raffle.raffleId = log["args"]["raffleId"]
@@ -3,7 +3,7 @@ import json
 from rest_framework.exceptions import PermissionDenied
 
 from authentication.models import UserProfile
-from core.constraints import ConstraintVerification, get_constraint
+from core.constraints import ConstraintEvaluator
 
 from .models import Raffle, RaffleEntry
 
@@ -22,21 +22,12 @@ class RaffleEnrollmentValidator:
             param_values = json.loads(self.raffle.constraint_params)
         except Exception:
             param_values = {}
-        for c in self.raffle.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(
-                self.user_profile
-            )
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            if str(c.pk) in self.raffle.reversed_constraints_list:
-                if constraint.is_observed():
-                    raise PermissionDenied(constraint.response)
-            else:
-                if not constraint.is_observed():
-                    raise PermissionDenied(constraint.response)
+        ConstraintEvaluator(
+            self.user_profile,
+            self.raffle.constraints.all(),
+            param_values,
+            self.raffle.reversed_constraints_list,
+        ).check()
 
     def check_user_owns_wallet(self, user_wallet_address):
         if not self.user_profile.owns_wallet(user_wallet_address):
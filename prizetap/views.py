@@ -11,7 +11,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.constraints import ConstraintVerification, get_constraint
+from core.constraints import ConstraintEvaluator
 from core.models import Chain
 from core.serializers import ChainSerializer
 from core.swagger import ConstraintProviderSrializerInspector
@@ -170,24 +170,16 @@ class GetRaffleConstraintsView(APIView):
         reversed_constraints = raffle.reversed_constraints_list
         response_constraints = []
 
-        for c in raffle.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(user_profile)
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            is_verified = False
-            if str(c.pk) in reversed_constraints:
-                if not constraint.is_observed():
-                    is_verified = True
-            else:
-                if constraint.is_observed():
-                    is_verified = True
+        constraints = list(raffle.constraints.all())
+        results = ConstraintEvaluator(
+            user_profile, constraints, param_values, reversed_constraints
+        ).evaluate()
+
+        for c in constraints:
             response_constraints.append(
                 {
                     **ConstraintSerializer(c).data,
-                    "is_verified": is_verified,
+                    "is_verified": results[c.pk],
                     "is_reversed": True if str(c.pk) in reversed_constraints else False,
                 }
             )
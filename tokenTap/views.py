@@ -1,7 +1,9 @@
 import json
 import logging
+from functools import partial
 
 import rest_framework.exceptions
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from drf_yasg import openapi
@@ -14,11 +16,12 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.constraints import ConstraintVerification, get_constraint
+from core.constraints import ConstraintEvaluator
 from core.models import Chain, NetworkTypes
 from core.serializers import ChainSerializer
 from core.swagger import ConstraintProviderSrializerInspector
 from faucet.models import ClaimReceipt, Faucet
+from faucet.tasks import wake_up_faucet_batcher
 from tokenTap.models import Constraint, TokenDistribution, TokenDistributionClaim
 from tokenTap.serializers import (
     ConstraintSerializer,
@@ -66,19 +69,12 @@ class TokenDistributionClaimView(CreateAPIView):
             param_values = json.loads(token_distribution.constraint_params)
         except Exception:
             param_values = {}
-        for c in token_distribution.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(user_profile)
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            if str(c.pk) in token_distribution.reversed_constraints_list:
-                if constraint.is_observed(token_distribution=token_distribution):
-                    raise PermissionDenied(constraint.response)
-            else:
-                if not constraint.is_observed(token_distribution=token_distribution):
-                    raise PermissionDenied(constraint.response)
+        ConstraintEvaluator(
+            user_profile,
+            token_distribution.constraints.all(),
+            param_values,
+            token_distribution.reversed_constraints_list,
+        ).check(token_distribution=token_distribution)
 
     def check_user_credit(self, user_profile):
         if not has_credit_left(user_profile):
@@ -177,7 +173,7 @@ class TokenDistributionClaimView(CreateAPIView):
                 user_wallet_address=user_wallet_address,
                 token_distribution=token_distribution,
             )
-            ClaimReceipt.objects.create(
+            receipt = ClaimReceipt.objects.create(
                 faucet=Faucet.objects.get(chain__chain_type=NetworkTypes.LIGHTNING),
                 user_profile=user_profile,
                 datetime=timezone.now(),
@@ -185,6 +181,7 @@ class TokenDistributionClaimView(CreateAPIView):
                 _status=ClaimReceipt.PENDING,
                 to_address=user_wallet_address,
             )
+            transaction.on_commit(partial(wake_up_faucet_batcher, receipt.faucet_id))
 
         return Response(
             {
@@ -210,24 +207,16 @@ class GetTokenDistributionConstraintsView(APIView):
         reversed_constraints = td.reversed_constraints_list
         response_constraints = []
 
-        for c in td.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(user_profile)
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            is_verified = False
-            if str(c.pk) in reversed_constraints:
-                if not constraint.is_observed(token_distribution=td):
-                    is_verified = True
-            else:
-                if constraint.is_observed(token_distribution=td):
-                    is_verified = True
+        constraints = list(td.constraints.all())
+        results = ConstraintEvaluator(
+            user_profile, constraints, param_values, reversed_constraints
+        ).evaluate(token_distribution=td)
+
+        for c in constraints:
             response_constraints.append(
                 {
                     **ConstraintSerializer(c).data,
-                    "is_verified": is_verified,
+                    "is_verified": results[c.pk],
                     "is_reversed": True if str(c.pk) in reversed_constraints else False,
                 }
             )